@@ -1,6 +1,6 @@
 """
 命令行接口类
-提供 split 和 list-fields 命令
+提供 split、plan 和 list-fields 命令
 """
 
 import fire
@@ -24,7 +24,18 @@ class CLI:
               max_rows=None,
               output=DEFAULT_OUTPUT_DIR,
               recursive=False,
-              encoding=DEFAULT_ENCODING):
+              encoding=DEFAULT_ENCODING,
+              chunksize=None,
+              raw=False,
+              workers=None,
+              jobs=None,
+              spill_buckets=None,
+              scratch_dir=None,
+              use_index=False,
+              memory_limit=None,
+              hash_buckets=None,
+              max_bytes=None,
+              parts=None):
         """
         拆分CSV文件
 
@@ -39,6 +50,20 @@ class CLI:
             output: 输出目录
             recursive: 是否递归处理子文件夹
             encoding: 文件编码 (auto/utf-8/gbk等)
+            chunksize: 流式读取的块大小（行数），None 表示一次性读入整个文件
+            raw: 按原始字节写出：按行数拆分时不解析 CSV；按字段拆分时只解析拆分字段，数据行原样复制（输出保持原文件编码和格式）
+            workers: 按字段拆分时的并行进程数，None 表示单进程
+            jobs: 同时处理的文件数（进程数），None 表示逐个处理
+            spill_buckets: 外部溢写分区的桶数，拆分字段取值极多时使用，None 表示不使用
+            scratch_dir: 临时文件目录，None 表示在输出目录下创建
+            use_index: 与 --raw 一起按字段拆分时使用分区索引（保存在输入文件旁），之后改变 max_rows 或输出目录再次拆分时跳过解析
+            memory_limit: 内存预算（如 "2GB"、"512MB"），自动选择一次性读入、流式读取或外部溢写及块大小；
+                          同时处理多个文件 (--jobs) 时平分预算
+            hash_buckets: 哈希分桶的桶数：按拆分字段值的哈希把行分配到固定数量的文件（_bucket007.csv），
+                          同一取值的行在同一文件中；None 表示按字段唯一值拆分
+            max_bytes: 单文件最大大小（如 "100MB"），按写出的字节数滚动到下一个 _partN 文件；
+                       可与 max_rows 同时使用，先达到者生效。按行数拆分模式只设置 max_bytes 时不限制行数
+            parts: 只按行数拆分时均分的文件数：快速统计行数后切成 N 个连续文件，各文件行数最多相差 1
 
         Examples:
             # 只按行数拆分（默认50万行）
@@ -58,20 +83,71 @@ class CLI:
 
             # 批量处理文件夹
             python csv_splitter.py split --input ./data/ --split-fields "订单日期" --recursive
+
+            # 超大文件流式拆分（每次读入 20 万行）
+            python csv_splitter.py split --input big.csv --split-fields "省份,订单日期" --time-period M --chunksize 200000
+
+            # 按行数拆分，直接复制原始字节
+            python csv_splitter.py split --input big.csv --max-rows 1000000 --raw
+
+            # 宽表按字段拆分，只解析拆分字段，数据行原样复制
+            python csv_splitter.py split --input wide.csv --split-fields "省份" --raw
+
+            # 使用分区索引，之后改变 --max-rows 重新拆分时不再解析拆分字段
+            python csv_splitter.py split --input wide.csv --split-fields "省份" --raw --use-index
+
+            # 限制内存占用不超过 2GB，自动选择读取方式
+            python csv_splitter.py split --input big.csv --split-fields "省份,订单日期" --time-period M --memory-limit 2GB
+
+            # 每个文件不超过 100MB（便于上传或邮件发送）
+            python csv_splitter.py split --input big.csv --max-bytes 100MB
+
+            # 均分为 16 个文件（供 16 个线程并行导入）
+            python csv_splitter.py split --input big.csv --parts 16 --raw
+
+            # 按客户ID哈希分成 16 个文件，同一客户的行在同一文件中
+            python csv_splitter.py split --input big.csv --split-fields "客户ID" --hash-buckets 16
+
+            # 8 个进程并行按字段拆分
+            python csv_splitter.py split --input big.csv --split-fields "省份" --workers 8
+
+            # 文件夹中的文件 8 个一起并行拆分
+            python csv_splitter.py split --input ./data/ --split-fields "省份" --jobs 8
+
+            # 按取值极多的字段拆分，先溢写到 64 个临时桶
+            python csv_splitter.py split --input big.csv --split-fields "用户ID" --spill-buckets 64 --scratch-dir /tmp
         """
         self._print_header()
 
         # 判断拆分模式
         is_rows_only_mode = split_fields is None
 
-        # 按行数拆分模式：必须设置 max_rows
+        # 解析内存预算和单文件大小
+        try:
+            memory_limit = FileUtils.parse_size(memory_limit) if memory_limit else None
+            max_bytes = FileUtils.parse_size(max_bytes) if max_bytes else None
+        except ValueError as e:
+            print(f"❌ 错误: 无效的大小参数: {e}")
+            return
+
+        if parts is not None and (not is_rows_only_mode or int(parts) < 1):
+            print("❌ 错误: 均分文件数只用于按行数拆分（不指定 --split-fields），且必须为正整数")
+            return
+        parts = int(parts) if parts else None
+
+        # 按行数拆分模式：必须设置 max_rows、max_bytes 或 parts
         if is_rows_only_mode:
-            actual_max_rows = self._parse_max_rows(max_rows) if max_rows is not None else DEFAULT_MAX_ROWS
-            self._print_config_rows_only(input, actual_max_rows, output, recursive)
+            if parts:
+                actual_max_rows = None
+            elif max_rows is not None:
+                actual_max_rows = self._parse_max_rows(max_rows)
+            else:
+                actual_max_rows = None if max_bytes else DEFAULT_MAX_ROWS
+            self._print_config_rows_only(input, actual_max_rows, output, recursive, max_bytes, parts)
         else:
             # 按字段拆分模式
             actual_max_rows = self._parse_max_rows(max_rows)
-            self._print_config(input, split_fields, time_period, actual_max_rows, output, recursive)
+            self._print_config(input, split_fields, time_period, actual_max_rows, output, recursive, max_bytes)
 
             # 验证时间周期（仅在指定了时间周期时才验证）
             if time_period and time_period.strip() and not DateUtils.validate_time_period(time_period):
@@ -84,6 +160,10 @@ class CLI:
             fields = self._parse_fields(split_fields)
             print(f"解析后的字段: {fields}\n")
 
+        if hash_buckets is not None and (is_rows_only_mode or int(hash_buckets) < 1):
+            print("❌ 错误: 哈希分桶需要指定 --split-fields，且桶数必须为正整数")
+            return
+
         # 获取文件列表
         csv_files = FileUtils.get_csv_files(input, recursive)
 
@@ -94,7 +174,21 @@ class CLI:
         print(f"找到 {len(csv_files)} 个CSV文件\n")
 
         # 初始化拆分器
-        splitter = CSVSplitter(max_rows=actual_max_rows, output_dir=output, encoding=encoding)
+        splitter = CSVSplitter(
+            max_rows=actual_max_rows,
+            output_dir=output,
+            encoding=encoding,
+            chunksize=int(chunksize) if chunksize else None,
+            raw=bool(raw),
+            workers=int(workers) if workers else None,
+            spill_buckets=int(spill_buckets) if spill_buckets else None,
+            scratch_dir=scratch_dir,
+            use_index=bool(use_index),
+            memory_limit=memory_limit,
+            hash_buckets=int(hash_buckets) if hash_buckets else None,
+            max_bytes=max_bytes,
+            parts=parts,
+        )
 
         # 准备输出目录
         if not FileUtils.prepare_output_dir(output, ask_user=True):
@@ -102,18 +196,132 @@ class CLI:
             return
 
         # 处理每个文件
-        if is_rows_only_mode:
-            # 只按行数拆分模式
-            for csv_file in csv_files:
-                splitter.split_by_rows_only(csv_file)
-        else:
-            # 按字段拆分模式
-            for csv_file in csv_files:
-                splitter.split_single_file(csv_file, fields, time_period)
+        splitter.split_files(
+            csv_files,
+            None if is_rows_only_mode else fields,
+            time_period,
+            jobs=int(jobs) if jobs else None,
+        )
 
         # 打印摘要
         splitter.print_summary()
 
+    def plan(self,
+             input,
+             split_fields=None,
+             time_period=None,
+             max_rows=None,
+             output=DEFAULT_OUTPUT_DIR,
+             recursive=False,
+             encoding=DEFAULT_ENCODING,
+             chunksize=None,
+             spill_buckets=None,
+             scratch_dir=None,
+             max_bytes=None,
+             hash_buckets=None,
+             parts=None):
+        """
+        生成拆分计划（试运行，不写出任何文件）
+
+        只读取拆分字段，报告各分区行数、估算大小、max_rows / max_bytes 产生的 _partN 文件数、
+        内存和磁盘需求，以及文件数过多的提示。参数含义与 split 命令相同。
+
+        Args:
+            input: 输入文件或文件夹路径
+            split_fields: 拆分字段，多个字段用逗号分隔；None 表示只按行数拆分
+            time_period: 时间周期 (Y=年, H=半年, Q=季度, M=月, HM=半月, D=日)
+            max_rows: 单文件最大行数
+            output: 输出目录（用于检查磁盘空间）
+            recursive: 是否递归处理子文件夹
+            encoding: 文件编码 (auto/utf-8/gbk等)
+            chunksize: 流式读取的块大小（行数），用于估算流式读取的内存占用
+            spill_buckets: 外部溢写分区的桶数，设置时磁盘需求包含临时桶文件
+            scratch_dir: 临时文件目录
+            max_bytes: 单文件最大大小（如 "100MB"）
+            hash_buckets: 哈希分桶的桶数，设置时报告各桶（_bucket007）的行数和文件数
+            parts: 只按行数拆分时均分的文件数
+
+        Examples:
+            python csv_splitter.py plan --input big.csv --split-fields "省份,订单日期" --time-period M --max-rows 500000
+
+            # 查看按客户ID哈希分成 16 个文件时各文件的行数
+            python csv_splitter.py plan --input big.csv --split-fields "客户ID" --hash-buckets 16
+
+            # 查看均分为 16 个文件时的计划
+            python csv_splitter.py plan --input big.csv --parts 16
+        """
+        self._print_header()
+
+        try:
+            max_bytes = FileUtils.parse_size(max_bytes) if max_bytes else None
+        except ValueError as e:
+            print(f"❌ 错误: 无效的大小参数: {e}")
+            return
+
+        is_rows_only_mode = split_fields is None
+        if parts is not None and (not is_rows_only_mode or int(parts) < 1):
+            print("❌ 错误: 均分文件数只用于按行数拆分（不指定 --split-fields），且必须为正整数")
+            return
+        parts = int(parts) if parts else None
+
+        if is_rows_only_mode:
+            if parts:
+                actual_max_rows = None
+            elif max_rows is not None:
+                actual_max_rows = self._parse_max_rows(max_rows)
+            else:
+                actual_max_rows = None if max_bytes else DEFAULT_MAX_ROWS
+            fields = None
+        else:
+            actual_max_rows = self._parse_max_rows(max_rows)
+            if time_period and time_period.strip() and not DateUtils.validate_time_period(time_period):
+                print(f"❌ 错误: 无效的时间周期 '{time_period}'")
+                print(f"   支持的周期: {', '.join(TIME_PERIODS.keys())}")
+                return
+            fields = self._parse_fields(split_fields)
+
+        if hash_buckets is not None and (is_rows_only_mode or int(hash_buckets) < 1):
+            print("❌ 错误: 哈希分桶需要指定 --split-fields，且桶数必须为正整数")
+            return
+
+        csv_files = FileUtils.get_csv_files(input, recursive)
+        if not csv_files:
+            print(f"❌ 错误: 在 '{input}' 中未找到CSV文件")
+            return
+
+        splitter = CSVSplitter(
+            max_rows=actual_max_rows,
+            output_dir=output,
+            encoding=encoding,
+            chunksize=int(chunksize) if chunksize else None,
+            spill_buckets=int(spill_buckets) if spill_buckets else None,
+            scratch_dir=scratch_dir,
+            max_bytes=max_bytes,
+            hash_buckets=int(hash_buckets) if hash_buckets else None,
+            parts=parts,
+        )
+        results = []
+        for file_path in csv_files:
+            try:
+                result = splitter.plan(file_path, fields, time_period)
+            except Exception as e:
+                print(f"❌ 错误: {file_path}: {str(e)}")
+                continue
+            if result is None:
+                print(f"  ⚠️  {file_path}: 没有有效的拆分字段")
+            else:
+                results.append(result)
+
+        if len(results) > 1:
+            disk_required = sum(result['disk_required'] for result in results)
+            disk_free = results[0]['disk_free']
+            print(f"\n{'=' * 60}")
+            print(f"合计: {len(results)} 个文件，"
+                  f"{sum(result['total_rows'] for result in results):,} 行，"
+                  f"{sum(result['output_files'] for result in results):,} 个输出文件")
+            print(f"磁盘空间: 需要约 {FileUtils.format_file_size(disk_required)}，"
+                  f"可用 {FileUtils.format_file_size(disk_free)} {'✅' if disk_required <= disk_free else '❌'}")
+
     def list_fields(self, file, encoding=DEFAULT_ENCODING):
         """
         列出CSV文件的所有字段
@@ -159,7 +367,7 @@ class CLI:
         print("\n🚀 CSV 智能拆分工具 v2.0")
         print(f"{'=' * 60}")
 
-    def _print_config(self, input, split_fields, time_period, max_rows, output, recursive):
+    def _print_config(self, input, split_fields, time_period, max_rows, output, recursive, max_bytes=None):
         """打印配置信息"""
         print(f"输入路径: {input}")
         print(f"拆分字段: {split_fields}")
@@ -176,16 +384,25 @@ class CLI:
             print(f"行数拆分: ✅ 默认 {DEFAULT_MAX_ROWS:,} 行")
         else:
             print(f"行数拆分: ✅ 每 {int(max_rows):,} 行")
+        if max_bytes:
+            print(f"大小拆分: ✅ 每 {FileUtils.format_file_size(max_bytes)}")
 
         print(f"输出目录: {output}")
         print(f"递归处理: {'是' if recursive else '否'}")
         print(f"{'=' * 60}")
 
-    def _print_config_rows_only(self, input, max_rows, output, recursive):
+    def _print_config_rows_only(self, input, max_rows, output, recursive, max_bytes=None, parts=None):
         """打印只按行数拆分的配置信息"""
         print(f"输入路径: {input}")
         print("拆分模式: 按行数拆分")
-        print(f"行数限制: ✅ 每 {max_rows:,} 行")
+        if parts:
+            print(f"行数限制: ✅ 均分为 {parts} 个文件")
+        elif max_rows is None:
+            print("行数限制: ❌ 不限制")
+        else:
+            print(f"行数限制: ✅ 每 {max_rows:,} 行")
+        if max_bytes:
+            print(f"大小限制: ✅ 每 {FileUtils.format_file_size(max_bytes)}")
         print(f"输出目录: {output}")
         print(f"递归处理: {'是' if recursive else '否'}")
         print(f"{'=' * 60}")
@@ -57,12 +57,15 @@ class CSVSplitterApp(QApplication):
         # 应用状态
         self.state = {
             'file_path': None,
-            'split_type': 'field',  # 拆分类型: 'field' 或 'rows'
+            'split_type': 'field',  # 拆分类型: 'field'、'rows' 或 'hash'
             'fields': [],
             'date_fields': [],  # 日期字段列表
             'non_date_fields': [],  # 非日期字段列表
             'time_period': None,  # 默认 None，由用户选择决定
             'max_rows': 500000,  # 默认 50 万行
+            'hash_buckets': 16,  # 哈希分桶拆分的桶数
+            'max_bytes': None,  # 单文件最大字节数（按行数拆分模式），None 表示不限制
+            'jobs': None,  # 文件夹模式同时处理的文件数，None 表示逐个处理
             'output_dir': './split_data',
             'preview_data': None,
         }
@@ -108,12 +111,15 @@ class CSVSplitterApp(QApplication):
         """重置应用状态"""
         self.state = {
             'file_path': None,
-            'split_type': 'field',  # 拆分类型: 'field' 或 'rows'
+            'split_type': 'field',  # 拆分类型: 'field'、'rows' 或 'hash'
             'fields': [],
             'date_fields': [],  # 日期字段列表
             'non_date_fields': [],  # 非日期字段列表
             'time_period': None,  # 默认 None，由用户选择决定
             'max_rows': 500000,  # 默认 50 万行
+            'hash_buckets': 16,  # 哈希分桶拆分的桶数
+            'max_bytes': None,  # 单文件最大字节数（按行数拆分模式），None 表示不限制
+            'jobs': None,  # 文件夹模式同时处理的文件数，None 表示逐个处理
             'output_dir': './split_data',
             'preview_data': None,
         }
@@ -9,6 +9,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
+from ..workers.row_count_worker import RowCountWorker
+
 
 class BasePage(QWidget):
     """基础页面类"""
@@ -29,6 +31,8 @@ class BasePage(QWidget):
 
         self.app = app
         self.main_window = main_window
+        # 正在运行的行数统计线程（保持引用直到结束）
+        self._row_count_workers = []
         self._setup_ui()
 
     def _setup_ui(self):
@@ -244,6 +248,23 @@ class BasePage(QWidget):
         # 导航到下一页
         self.app.navigate_next()
 
+    def _count_rows_async(self, file_path, on_counted, on_error=None):
+        """
+        在后台线程中统计文件行数
+
+        Args:
+            file_path: 文件路径
+            on_counted: 统计完成回调 (file_path, row_count) -> None
+            on_error: 统计失败回调 (file_path, error_message) -> None
+        """
+        worker = RowCountWorker(file_path)
+        worker.counted.connect(on_counted)
+        if on_error is not None:
+            worker.error.connect(on_error)
+        worker.finished.connect(lambda: self._row_count_workers.remove(worker))
+        self._row_count_workers.append(worker)
+        worker.start()
+
     def on_activated(self):
         """页面激活时调用（子类可覆盖）"""
         pass
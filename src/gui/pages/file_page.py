@@ -3,13 +3,14 @@
 允许用户选择要拆分的 CSV 文件
 """
 
+import os
 import sys
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QLineEdit, QFileDialog, QGroupBox, QRadioButton,
-    QButtonGroup
+    QButtonGroup, QSpinBox
 )
 
 from .base_page import BasePage
@@ -89,6 +90,20 @@ class FilePage(BasePage):
         self.recursive_checkbox.setChecked(False)
         card_layout.addWidget(self.recursive_checkbox)
 
+        # 同时处理的文件数（仅文件夹模式）
+        self.jobs_widget = QWidget()
+        jobs_layout = QHBoxLayout(self.jobs_widget)
+        jobs_layout.setContentsMargins(0, 0, 0, 0)
+        jobs_layout.addWidget(QLabel('同时处理文件数:'))
+        self.jobs_spin = QSpinBox()
+        self.jobs_spin.setRange(1, os.cpu_count() or 1)
+        self.jobs_spin.setValue(1)
+        self.jobs_spin.setToolTip('多个进程同时处理不同文件，大文件优先；1 表示逐个处理')
+        jobs_layout.addWidget(self.jobs_spin)
+        jobs_layout.addStretch(1)
+        self.jobs_widget.setVisible(False)
+        card_layout.addWidget(self.jobs_widget)
+
         # 文件信息
         self.file_info_label = QLabel('')
         self.file_info_label.setWordWrap(True)
@@ -130,8 +145,19 @@ class FilePage(BasePage):
         rows_desc.setStyleSheet('color: #7f8c8d; font-size: 12px; margin-left: 20px;')
         type_layout.addWidget(rows_desc)
 
+        # 哈希分桶拆分选项
+        self.hash_split_radio = QRadioButton('哈希分桶拆分')
+        self.hash_split_radio.setToolTip('按字段值的哈希拆分为固定数量的文件，同一取值的行在同一文件中')
+        type_layout.addWidget(self.hash_split_radio)
+
+        # 哈希分桶拆分说明
+        hash_desc = QLabel('  按字段值的哈希拆分为固定数量的文件，同一取值的行在同一文件中，适合按客户ID等分片')
+        hash_desc.setStyleSheet('color: #7f8c8d; font-size: 12px; margin-left: 20px;')
+        type_layout.addWidget(hash_desc)
+
         self.split_type_button_group.addButton(self.field_split_radio, 0)
         self.split_type_button_group.addButton(self.rows_split_radio, 1)
+        self.split_type_button_group.addButton(self.hash_split_radio, 2)
 
         type_group.setLayout(type_layout)
         card_layout.addWidget(type_group)
@@ -146,6 +172,7 @@ class FilePage(BasePage):
         """模式改变处理"""
         is_folder = self.folder_radio.isChecked()
         self.recursive_checkbox.setVisible(is_folder)
+        self.jobs_widget.setVisible(is_folder)
         self.browse_btn.setText('选择文件夹...' if is_folder else '浏览...')
         self.path_input.setPlaceholderText(
             '选择文件夹...' if is_folder else '选择 CSV 文件...'
@@ -192,14 +219,24 @@ class FilePage(BasePage):
 
             # 尝试读取文件获取字段数（使用自动编码检测）
             df = FileUtils.read_csv_with_encoding(file_path, encoding='auto', nrows=0)
-            row_count = len(df.columns)
+            self._file_info = f'文件大小: {size_str} | 字段数: {len(df.columns)}'
+            self.file_info_label.setText(f'{self._file_info} | 行数: 统计中...')
 
-            self.file_info_label.setText(
-                f'文件大小: {size_str} | 字段数: {row_count}'
-            )
+            # 行数在后台线程中统计，大文件不阻塞界面
+            self._count_rows_async(file_path, self._on_rows_counted, self._on_rows_count_failed)
         except Exception as e:
             self.file_info_label.setText(f'文件信息: 无法读取 - {str(e)}')
 
+    def _on_rows_counted(self, file_path, row_count):
+        """行数统计完成（期间换了文件时忽略）"""
+        if file_path == self.app.get_state('file_path'):
+            self.file_info_label.setText(f'{self._file_info} | 行数: {row_count:,}')
+
+    def _on_rows_count_failed(self, file_path, message):
+        """行数统计失败"""
+        if file_path == self.app.get_state('file_path'):
+            self.file_info_label.setText(f'{self._file_info} | 行数: 无法统计 - {message}')
+
     def _set_folder_path(self, folder_path):
         """设置文件夹路径"""
         self.path_input.setText(folder_path)
@@ -220,11 +257,14 @@ class FilePage(BasePage):
         file_path = self.app.get_state('file_path')
         if file_path:
             self.path_input.setText(file_path)
+        self.jobs_spin.setValue(self.app.get_state('jobs') or 1)
 
         # 恢复拆分类型选择
         split_type = self.app.get_state('split_type', 'field')
         if split_type == 'rows':
             self.rows_split_radio.setChecked(True)
+        elif split_type == 'hash':
+            self.hash_split_radio.setChecked(True)
         else:
             self.field_split_radio.setChecked(True)
 
@@ -250,12 +290,18 @@ class FilePage(BasePage):
     def collect_data(self):
         """收集页面数据"""
         # 获取拆分类型
-        split_type = 'rows' if self.rows_split_radio.isChecked() else 'field'
+        if self.rows_split_radio.isChecked():
+            split_type = 'rows'
+        elif self.hash_split_radio.isChecked():
+            split_type = 'hash'
+        else:
+            split_type = 'field'
 
         data = {
             'file_path': self.path_input.text(),
             'is_folder': self.folder_radio.isChecked(),
             'recursive': self.recursive_checkbox.isChecked(),
+            'jobs': self.jobs_spin.value() if self.folder_radio.isChecked() and self.jobs_spin.value() > 1 else None,
             'split_type': split_type,
         }
 
@@ -263,6 +309,7 @@ class FilePage(BasePage):
         self.app.set_state('file_path', data['file_path'])
         self.app.set_state('is_folder', data['is_folder'])
         self.app.set_state('recursive', data['recursive'])
+        self.app.set_state('jobs', data['jobs'])
         self.app.set_state('split_type', data['split_type'])
 
         return data
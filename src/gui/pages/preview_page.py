@@ -186,27 +186,31 @@ class PreviewPage(BasePage):
 
         # 文件信息
         if is_folder:
-            self.file_info_label.setText(f'{file_path} (文件夹' + (' - 递归' if recursive else '') + ')')
+            jobs = self.app.get_state('jobs')
+            self.file_info_label.setText(
+                f'{file_path} (文件夹' + (' - 递归' if recursive else '') + (f' - {jobs} 个文件并行' if jobs else '') + ')'
+            )
         else:
             self.file_info_label.setText(file_path)
 
-        # 文件统计（获取文件大小和行数）
-        try:
-            file_size = FileUtils.format_file_size(Path(file_path).stat().st_size)
-            df = FileUtils.read_csv_with_encoding(file_path, encoding='auto', nrows=0)
-            total_rows = len(df)
-            self.file_stats_label.setText(f'大小: {file_size} | 总行数: {total_rows:,}')
-        except Exception:
+        # 文件统计（文件大小；总行数在后台线程中统计，同一文件只扫描一次）
+        if is_folder or not file_path or not Path(file_path).is_file():
             self.file_stats_label.setText('无法获取文件信息')
+        else:
+            self._file_size = FileUtils.format_file_size(Path(file_path).stat().st_size)
+            self.file_stats_label.setText(f'大小: {self._file_size} | 总行数: 统计中...')
+            self._count_rows_async(file_path, self._on_rows_counted, self._on_rows_count_failed)
 
         # 拆分类型
         if split_type == 'rows':
             self.split_type_label.setText('按行数拆分')
+        elif split_type == 'hash':
+            self.split_type_label.setText(f"哈希分桶拆分（{self.app.get_state('hash_buckets')} 个桶）")
         else:
             self.split_type_label.setText('按字段拆分')
 
-        # 拆分字段（仅按字段拆分时显示）
-        if split_type == 'field' and fields:
+        # 拆分字段（按字段拆分、哈希分桶拆分时显示）
+        if split_type in ('field', 'hash') and fields:
             self.fields_info_label.setText(', '.join(fields))
             self.fields_info_label.parent().setVisible(True)
         else:
@@ -222,11 +226,14 @@ class PreviewPage(BasePage):
             self.period_info_label.setText('-')
             self.period_info_label.parent().setVisible(False)
 
-        # 行数限制
+        # 行数和大小限制
+        max_bytes = self.app.get_state('max_bytes')
+        limits = []
         if max_rows:
-            self.size_info_label.setText(f'每 {max_rows:,} 行')
-        else:
-            self.size_info_label.setText('不限制')
+            limits.append(f'每 {max_rows:,} 行')
+        if max_bytes:
+            limits.append(f'每 {FileUtils.format_file_size(max_bytes)}')
+        self.size_info_label.setText('，'.join(limits) if limits else '不限制')
 
         # 输出目录
         self.output_info_label.setText(str(Path(output_dir).absolute()))
@@ -237,6 +244,16 @@ class PreviewPage(BasePage):
         # 生成策略说明
         self._generate_strategy_description()
 
+    def _on_rows_counted(self, file_path, row_count):
+        """行数统计完成（期间换了文件时忽略）"""
+        if file_path == self.app.get_state('file_path'):
+            self.file_stats_label.setText(f'大小: {self._file_size} | 总行数: {row_count:,}')
+
+    def _on_rows_count_failed(self, file_path, message):
+        """行数统计失败"""
+        if file_path == self.app.get_state('file_path'):
+            self.file_stats_label.setText(f'大小: {self._file_size} | 总行数: 无法统计')
+
     def _generate_strategy_description(self):
         """生成策略说明"""
         split_type = self.app.get_state('split_type', 'field')
@@ -253,6 +270,14 @@ class PreviewPage(BasePage):
                 strategy.append(f"• 按行数拆分，每 {max_rows:,} 行一个文件")
             else:
                 strategy.append("• 按行数拆分")
+            max_bytes = self.app.get_state('max_bytes')
+            if max_bytes:
+                strategy.append(f"• 单个文件不超过 {FileUtils.format_file_size(max_bytes)}（含表头）")
+        elif split_type == 'hash':
+            # 哈希分桶拆分
+            hash_buckets = self.app.get_state('hash_buckets')
+            strategy.append(f"• 按「{'、'.join(fields)}」的哈希值分配到 {hash_buckets} 个文件")
+            strategy.append("• 同一取值的所有行在同一个文件中")
         else:
             # 按字段拆分
             if len(fields) == 1:
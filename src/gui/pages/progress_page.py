@@ -164,6 +164,9 @@ class ProgressPage(BasePage):
             'encoding': 'auto',  # 固定为自动检测
             'is_folder': self.app.get_state('is_folder', False),
             'recursive': self.app.get_state('recursive', False),
+            'jobs': self.app.get_state('jobs'),  # 并行处理的文件数，None 表示逐个处理
+            'hash_buckets': self.app.get_state('hash_buckets'),  # 哈希分桶拆分的桶数
+            'max_bytes': self.app.get_state('max_bytes'),  # 单文件最大字节数，None 表示不限制
         }
 
         # 创建并启动工作线程
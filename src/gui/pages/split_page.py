@@ -1,7 +1,7 @@
 """
 拆分设置页面
 配置时间周期和行数限制
-支持三种模式的动态显示
+支持四种模式的动态显示
 """
 
 import sys
@@ -9,7 +9,7 @@ from pathlib import Path
 
 from PyQt6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QComboBox, QSpinBox, QWidget, QRadioButton,
+    QComboBox, QSpinBox, QWidget, QRadioButton, QCheckBox,
     QLineEdit, QFileDialog, QGridLayout
 )
 
@@ -55,6 +55,15 @@ class SplitPage(BasePage):
         rows_card = self._create_rows_only_card()
         self.settings_layout.addWidget(rows_card)
 
+    def _setup_hash_mode(self):
+        """设置哈希分桶拆分模式"""
+        # 清空现有内容
+        self._clear_settings_layout()
+
+        # 创建哈希分桶卡片
+        hash_card = self._create_hash_card()
+        self.settings_layout.addWidget(hash_card)
+
     def _setup_field_without_date_mode(self):
         """设置按字段拆分 + 无日期字段模式"""
         # 清空现有内容
@@ -115,12 +124,26 @@ class SplitPage(BasePage):
         self.rows_max_rows_spin.setMinimumHeight(35)
         card_layout.addWidget(self.rows_max_rows_spin)
 
+        # 单文件大小限制（可选，与行数限制先达到者生效）
+        self.rows_limit_bytes_checkbox = QCheckBox('同时限制单文件大小')
+        self.rows_limit_bytes_checkbox.toggled.connect(self._on_bytes_toggled)
+        card_layout.addWidget(self.rows_limit_bytes_checkbox)
+
+        self.rows_max_mb_spin = QSpinBox()
+        self.rows_max_mb_spin.setRange(1, 1024 * 1024)
+        self.rows_max_mb_spin.setValue(100)
+        self.rows_max_mb_spin.setSuffix(' MB')
+        self.rows_max_mb_spin.setMinimumHeight(35)
+        self.rows_max_mb_spin.setEnabled(False)
+        card_layout.addWidget(self.rows_max_mb_spin)
+
         # 说明
         info_text = """
         <div style="color: #7f8c8d; font-size: 12px; padding: 8px; background-color: #f8f9fa; border-radius: 4px;">
         <b>说明：</b><br>
         • 大文件将被拆分成多个小文件<br>
         • 每个文件最多包含指定行数<br>
+        • 限制大小时，文件达到指定大小（含表头）即换到下一个文件<br>
         • 文件命名：原文件名_part1.csv、原文件名_part2.csv...
         </div>
         """
@@ -130,6 +153,44 @@ class SplitPage(BasePage):
 
         return self._create_card('按行数拆分', card_content)
 
+    def _create_hash_card(self):
+        """创建哈希分桶拆分卡片"""
+        card_content = QWidget()
+        card_layout = QVBoxLayout(card_content)
+        card_layout.setSpacing(12)
+
+        # 标题
+        title_label = QLabel('哈希分桶设置')
+        title_label.setStyleSheet('font-weight: bold; font-size: 14px;')
+        card_layout.addWidget(title_label)
+
+        # 桶数输入
+        buckets_label = QLabel('桶数（输出文件数）:')
+        buckets_label.setStyleSheet('font-weight: bold; margin-top: 5px;')
+        card_layout.addWidget(buckets_label)
+
+        self.hash_buckets_spin = QSpinBox()
+        self.hash_buckets_spin.setRange(1, 10000)
+        self.hash_buckets_spin.setValue(16)
+        self.hash_buckets_spin.setSuffix(' 个')
+        self.hash_buckets_spin.setMinimumHeight(35)
+        card_layout.addWidget(self.hash_buckets_spin)
+
+        # 说明
+        info_text = """
+        <div style="color: #7f8c8d; font-size: 12px; padding: 8px; background-color: #f8f9fa; border-radius: 4px;">
+        <b>说明：</b><br>
+        • 按所选字段值的哈希把行分配到固定数量的文件<br>
+        • 同一取值的所有行落在同一个文件中，各文件行数大致均衡<br>
+        • 文件命名：原文件名_bucket000.csv、原文件名_bucket001.csv...
+        </div>
+        """
+        info_label = QLabel(info_text)
+        info_label.setWordWrap(True)
+        card_layout.addWidget(info_label)
+
+        return self._create_card('哈希分桶拆分', card_content)
+
     def _create_time_period(self):
         """创建时间周期设置"""
         card_content = QWidget()
@@ -293,6 +354,10 @@ class SplitPage(BasePage):
         """行数限制切换"""
         self.max_rows_spin.setEnabled(checked)
 
+    def _on_bytes_toggled(self, checked):
+        """单文件大小限制切换"""
+        self.rows_max_mb_spin.setEnabled(checked)
+
     def _on_simple_limit_toggled(self):
         """简化版行数限制切换"""
         self.simple_max_rows_spin.setEnabled(self.simple_limit_radio.isChecked())
@@ -321,6 +386,10 @@ class SplitPage(BasePage):
             # 按行数拆分模式
             self._setup_rows_only_mode()
             self._restore_rows_only_data()
+        elif split_type == 'hash':
+            # 哈希分桶拆分模式
+            self._setup_hash_mode()
+            self._restore_hash_data()
         else:
             # 按字段拆分模式
             # 检查用户选择的字段中是否包含日期字段
@@ -346,6 +415,19 @@ class SplitPage(BasePage):
             # 如果没有设置过，使用默认值
             self.rows_max_rows_spin.setValue(500000)
 
+        max_bytes = self.app.get_state('max_bytes')
+        if max_bytes:
+            self.rows_max_mb_spin.setValue(max(max_bytes // (1024 * 1024), 1))
+        self.rows_limit_bytes_checkbox.setChecked(bool(max_bytes))
+
+        output_dir = self.app.get_state('output_dir')
+        if output_dir:
+            self.output_dir_input.setText(output_dir)
+
+    def _restore_hash_data(self):
+        """恢复哈希分桶拆分模式的数据"""
+        self.hash_buckets_spin.setValue(self.app.get_state('hash_buckets') or 16)
+
         output_dir = self.app.get_state('output_dir')
         if output_dir:
             self.output_dir_input.setText(output_dir)
@@ -412,6 +494,17 @@ class SplitPage(BasePage):
             # 按行数拆分模式
             max_rows = self.rows_max_rows_spin.value()
             time_period = None
+            if self.rows_limit_bytes_checkbox.isChecked():
+                max_bytes = self.rows_max_mb_spin.value() * 1024 * 1024
+            else:
+                max_bytes = None
+            self.app.set_state('max_bytes', max_bytes)
+        elif split_type == 'hash':
+            # 哈希分桶拆分模式：不按时间周期和行数拆分
+            max_rows = None
+            time_period = None
+            self.app.set_state('hash_buckets', self.hash_buckets_spin.value())
+            self.app.set_state('max_bytes', None)
         else:
             # 按字段拆分模式 - 根据 UI 控件判断当前模式
             if hasattr(self, 'enable_time_checkbox'):
@@ -436,6 +529,7 @@ class SplitPage(BasePage):
                 # 默认情况
                 max_rows = None
                 time_period = None
+            self.app.set_state('max_bytes', None)
 
         # 输出目录
         output_dir = self.output_dir_input.text().strip()
@@ -449,6 +543,8 @@ class SplitPage(BasePage):
             'time_period': time_period,
             'max_rows': max_rows,
             'output_dir': output_dir,
+            'hash_buckets': self.app.get_state('hash_buckets'),
+            'max_bytes': self.app.get_state('max_bytes'),
         }
 
     def get_next_page(self):
@@ -0,0 +1,38 @@
+"""
+行数统计工作线程
+在后台线程中按原始字节统计 CSV 文件的行数，避免大文件阻塞界面
+"""
+
+from PyQt6.QtCore import QThread, pyqtSignal
+import sys
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from src.utils.file_utils import FileUtils
+
+
+class RowCountWorker(QThread):
+    """行数统计工作线程"""
+
+    # 信号定义
+    counted = pyqtSignal(str, int)  # (file_path, row_count)
+    error = pyqtSignal(str, str)  # (file_path, error_message)
+
+    def __init__(self, file_path):
+        """
+        初始化工作线程
+
+        Args:
+            file_path: 要统计的文件路径
+        """
+        super().__init__()
+        self.file_path = file_path
+
+    def run(self):
+        """统计行数（结果按文件缓存，同一文件再次统计时立即返回）"""
+        try:
+            self.counted.emit(self.file_path, FileUtils.count_rows(self.file_path))
+        except Exception as e:
+            self.error.emit(self.file_path, str(e))
@@ -47,9 +47,13 @@ class SplitWorker(QThread):
             encoding = 'auto'  # 固定为自动检测
             is_folder = self.config.get('is_folder', False)
             recursive = self.config.get('recursive', False)
+            jobs = self.config.get('jobs')
+            hash_buckets = self.config.get('hash_buckets') if split_type == 'hash' else None
+            max_bytes = self.config.get('max_bytes') if split_type == 'rows' else None
 
             # 调试：输出拆分类型
-            self.log.emit(f'拆分类型: {"按行数拆分" if split_type == "rows" else "按字段拆分"}')
+            split_type_names = {'rows': '按行数拆分', 'hash': f'哈希分桶拆分（{hash_buckets} 个桶）'}
+            self.log.emit(f'拆分类型: {split_type_names.get(split_type, "按字段拆分")}')
             if time_period:
                 self.log.emit(f'时间周期设置: {time_period}')
 
@@ -65,7 +69,9 @@ class SplitWorker(QThread):
                 max_rows=max_rows,
                 output_dir=output_dir,
                 encoding=encoding,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                hash_buckets=hash_buckets,
+                max_bytes=max_bytes,
             )
 
             # 获取文件列表
@@ -86,23 +92,34 @@ class SplitWorker(QThread):
             # 处理每个文件
             total_files = len(csv_files)
 
-            for i, csv_file in enumerate(csv_files):
-                if self.is_cancelled:
-                    break
-
-                file_path_str = str(csv_file)
-                self.log.emit(f'\n处理文件 [{i + 1}/{total_files}]: {csv_file.name}')
-
-                # 发送文件进度
-                self.progress.emit(i + 1, total_files, 0, 100, f'处理 {csv_file.name}...')
-
-                # 根据拆分类型选择拆分方法
-                if split_type == 'rows':
-                    # 只按行数拆分
-                    splitter.split_by_rows_only(file_path_str)
-                else:
-                    # 按字段拆分
-                    splitter.split_single_file(file_path_str, fields, time_period)
+            if jobs and jobs > 1 and total_files > 1:
+                # 多进程并行处理，单文件进度由拆分器转发到 progress_callback
+                self.log.emit(f'并行处理: {jobs} 个进程')
+                splitter.split_files(
+                    csv_files,
+                    None if split_type == 'rows' else fields,
+                    time_period,
+                    jobs=jobs,
+                    should_stop=lambda: self.is_cancelled,
+                )
+            else:
+                for i, csv_file in enumerate(csv_files):
+                    if self.is_cancelled:
+                        break
+
+                    file_path_str = str(csv_file)
+                    self.log.emit(f'\n处理文件 [{i + 1}/{total_files}]: {csv_file.name}')
+
+                    # 发送文件进度
+                    self.progress.emit(i + 1, total_files, 0, 100, f'处理 {csv_file.name}...')
+
+                    # 根据拆分类型选择拆分方法
+                    if split_type == 'rows':
+                        # 只按行数拆分
+                        splitter.split_by_rows_only(file_path_str)
+                    else:
+                        # 按字段拆分
+                        splitter.split_single_file(file_path_str, fields, time_period)
 
             # 发送完成信号 - 使用 splitter 记录的文件列表
             result = {
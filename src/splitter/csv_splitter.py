@@ -3,17 +3,47 @@ CSV 拆分核心类
 提供按字段、时间周期拆分CSV文件的核心功能
 """
 
+import contextlib
+import io
+import multiprocessing
 import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+import pandas as pd
 from tqdm import tqdm
 from ..utils.date_utils import DateUtils
 from ..utils.file_utils import FileUtils
-from ..utils.constants import TIME_PERIOD_DESCRIPTIONS
+from ..utils.record_utils import RecordUtils
+from ..utils.constants import (
+    TIME_PERIOD_DESCRIPTIONS,
+    DATE_DETECTION_SAMPLE_SIZE,
+    SPILL_CHUNKSIZE,
+    STREAM_DTYPES,
+    SPILL_PERIOD_COLUMN,
+    RAW_GATHER_BYTES,
+    WRITER_BUFFER_BYTES,
+    WRITER_MAX_OPEN_FILES,
+    PLAN_CHUNKSIZE,
+    PLAN_SAMPLE_ROWS,
+    PLAN_MAX_OUTPUT_FILES,
+    PLAN_REPORT_LIMIT,
+    MEMORY_PEAK_FACTOR,
+    MEMORY_BASE_OVERHEAD,
+    MEMORY_MIN_CHUNKSIZE,
+    SPILL_CARDINALITY_RATIO,
+)
+from .partition_writer import PartitionWriter
+from .partition_index import PartitionIndex
 
 
 class CSVSplitter:
     """CSV 拆分核心类"""
 
-    def __init__(self, max_rows=None, output_dir='./split_data', encoding='auto', progress_callback=None):
+    def __init__(self, max_rows=None, output_dir='./split_data', encoding='auto', progress_callback=None,
+                 chunksize=None, raw=False, workers=None, spill_buckets=None, scratch_dir=None,
+                 use_index=False, memory_limit=None, hash_buckets=None, max_bytes=None, parts=None):
         """
         初始化拆分器
 
@@ -26,11 +56,58 @@ class CSVSplitter:
             progress_callback: 进度回调函数 (current, total, message) -> None
                 - None: 不使用回调（CLI模式，使用tqdm）
                 - 函数: GUI模式，通过回调发送进度更新
+            chunksize: 流式读取的块大小（行数）
+                - None: 一次性读入整个文件
+                - 整数: 按块流式读取并追加写入各分区，内存占用只与块大小相关；
+                        拆分前先流式推断一遍各列类型，写出的格式与一次性读入时一致
+            raw: 是否按原始字节写出
+                - False: 解析为 DataFrame 后重新写出
+                - True: 只按行数拆分时不解析，直接复制表头和记录的原始字节；
+                  按字段拆分时只解析拆分字段，各行按原始字节复制到所属分区。输出保持原文件的编码和格式
+            workers: 按字段拆分时的并行进程数
+                - None 或 1: 单进程
+                - 整数: 把文件按记录边界切分为字节区间，由多个进程并行解析和分区
+            spill_buckets: 外部溢写分区的桶数（用于取值极多的拆分字段）
+                - None: 不使用
+                - 整数: 先按拆分字段的哈希把行溢写到固定数量的临时桶文件，再逐桶在内存中拆分
+            scratch_dir: 临时文件目录，None 表示在输出目录下创建
+            use_index: 原始行直通按字段拆分时是否使用分区索引
+                - False: 每次都重新解析拆分字段
+                - True: 输入文件旁有匹配的索引时直接复用，跳过解析和字段分类；否则构建后保存到输入文件旁
+            memory_limit: 内存预算（字节）
+                - None: 不限制
+                - 整数: 未指定 chunksize / spill_buckets / workers / raw 时，按采样估算的行宽为每个文件
+                  选择一次性读入、流式读取或外部溢写，并确定块大小和写出缓冲，使内存峰值不超过预算
+                  （不含 Python 解释器和 pandas 自身占用的内存）
+            hash_buckets: 哈希分桶的桶数
+                - None: 按字段唯一值拆分
+                - 整数: 按拆分字段值的哈希把行分配到固定数量的文件（_bucket007.csv），同一取值的行在同一文件中
+            max_bytes: 单文件最大字节数（含表头）
+                - None: 不按大小拆分
+                - 整数: 按写出的字节数滚动到下一个 _partN 文件，可与 max_rows 同时使用（先达到者生效）
+            parts: 只按行数拆分时均分的文件数
+                - None: 按 max_rows / max_bytes 拆分
+                - 整数: 先按原始字节快速统计行数（按文件缓存），再切成 parts 个连续文件，
+                  各文件行数最多相差 1；设置后忽略 max_rows 和 max_bytes
         """
         self.max_rows = max_rows
         self.output_dir = output_dir
         self.encoding = encoding
         self.progress_callback = progress_callback
+        self.chunksize = chunksize
+        self.raw = raw
+        self.workers = workers
+        self.spill_buckets = spill_buckets
+        self.scratch_dir = scratch_dir
+        self.use_index = use_index
+        self.memory_limit = memory_limit
+        self.hash_buckets = hash_buckets
+        self.max_bytes = max_bytes
+        self.parts = parts
+        # 流式分区写入时所有分区缓冲区的总字节预算
+        self.writer_buffer_bytes = WRITER_BUFFER_BYTES
+        # 字段分类时推断出的日期格式 {field: [format_name, ...]}，供日期转换复用
+        self.date_formats = {}
         self._reset_stats()
 
     def _reset_stats(self):
@@ -69,6 +146,7 @@ class CSVSplitter:
         """
         date_fields = []
         non_date_fields = []
+        self.date_formats = {}
 
         for field in split_fields:
             if field not in df.columns:
@@ -77,13 +155,58 @@ class CSVSplitter:
 
             if DateUtils.is_date_column(df[field]):
                 date_fields.append(field)
-                print(f"  ✓ '{field}' 识别为 📅 日期字段")
+                self.date_formats[field] = DateUtils.infer_date_formats(df[field])
+                print(f"  ✓ '{field}' 识别为 📅 日期字段 ({', '.join(self.date_formats[field])})")
             else:
                 non_date_fields.append(field)
                 print(f"  ✓ '{field}' 识别为 📝 普通字段")
 
         return date_fields, non_date_fields
 
+    @staticmethod
+    def _infer_category_values(series):
+        """
+        按 read_csv 的类型推断规则还原分类字段的类别值
+
+        以 category 类型读入时类别值都是字符串；可转为数值的字段还原为数值
+        （含空值的整数字段为浮点），使文件名和输出内容与默认类型读入时一致。
+
+        Args:
+            series: category 类型的 Series
+
+        Returns:
+            Series: 类别值类型还原后的 category Series
+        """
+        categories = series.cat.categories
+        try:
+            values = pd.to_numeric(categories)
+        except (ValueError, TypeError):
+            return series
+        if series.isna().any() and pd.api.types.is_integer_dtype(values):
+            values = values.astype(float)
+        # 如 '7' 和 '07' 还原后相同，map 会合并为同一类别
+        return series.map(dict(zip(categories, values))).astype('category')
+
+    @staticmethod
+    def _factorize_groups(series):
+        """
+        一次性分解字段值，得到每个唯一值对应的行位置
+
+        只对字段做一次 factorize 和一次稳定排序，代替逐个唯一值的布尔过滤。
+        空值被丢弃；唯一值按首次出现顺序排列，组内保持原始行序。
+
+        Args:
+            series: pandas Series
+
+        Returns:
+            list: [(value, positions), ...]，positions 为行位置数组
+        """
+        codes, uniques = pd.factorize(series, sort=False)
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        bounds = np.concatenate(([0], np.cumsum(counts))) + np.count_nonzero(codes < 0)
+        return [(uniques[i], order[bounds[i]:bounds[i + 1]]) for i in range(len(uniques))]
+
     def _split_by_size(self, df, base_name, suffix=''):
         """
         按行数拆分大文件
@@ -96,6 +219,9 @@ class CSVSplitter:
         Returns:
             list: [(file_name, row_count), ...]
         """
+        if self.max_bytes is not None:
+            return self._split_by_bytes(df, base_name, suffix)
+
         output_files = []
         total_rows = len(df)
 
@@ -127,113 +253,113 @@ class CSVSplitter:
 
         return output_files
 
-    def _split_multi_non_date_fields(self, df, base_name, fields, current_suffix='', level=0):
+    def _split_by_bytes(self, df, base_name, suffix=''):
         """
-        递归按多个非日期字段级联拆分
-
-        示例：fields = ['省份', '城市']
-        - 第1层：按'省份'拆分 → 广东、浙江、江苏...
-        - 第2层：每个省份下按'城市'拆分 → 广东_深圳、广东_广州...
+        按单文件最大字节数（和行数）拆分：整个分区只序列化一次，按记录边界切分字节
 
         Args:
             df: DataFrame
             base_name: 基础文件名
-            fields: 字段列表
-            current_suffix: 当前后缀
-            level: 当前层级
+            suffix: 文件名后缀
 
         Returns:
             list: [(file_name, row_count), ...]
         """
-        output_files = []
-
-        if level >= len(fields):
-            # 递归终止：保存文件
-            return self._split_by_size(df, base_name, current_suffix)
-
-        current_field = fields[level]
-        unique_values = df[current_field].dropna().unique()
-
-        indent = "  " * (level + 2)
-        print(f"{indent}第{level + 1}层 ('{current_field}'): 找到 {len(unique_values)} 个唯一值")
-
-        for value in tqdm(unique_values, desc=f"{indent}拆分中", leave=False):
-            sub_df = df[df[current_field] == value]
-            safe_value = FileUtils.safe_filename(value)
-            new_suffix = f"{current_suffix}_{safe_value}"
-
-            # 递归处理下一层
-            files = self._split_multi_non_date_fields(
-                sub_df, base_name, fields, new_suffix, level + 1
-            )
-            output_files.extend(files)
+        FileUtils.ensure_output_dir(self.output_dir)
+        # 与 FileUtils.write_csv 相同：BOM 只随表头写入
+        header = df.head(0).to_csv(index=False).encode('utf-8-sig')
+        data = df.to_csv(index=False, header=False).encode('utf-8')
+        ends, _ = RecordUtils.find_record_ends(data, 0, len(data))
+        starts = np.concatenate(([0], ends[:-1]))
+        parts = RecordUtils.plan_parts(ends - starts, len(header), self.max_rows, self.max_bytes)
 
+        output_files = []
+        for i, (start, stop) in enumerate(parts):
+            if len(parts) == 1:
+                file_name = f"{base_name}{suffix}.csv"
+            else:
+                file_name = f"{base_name}{suffix}_part{i + 1}.csv"
+            with open(os.path.join(self.output_dir, file_name), 'wb') as dst:
+                dst.write(header)
+                if stop > start:
+                    dst.write(data[starts[start]:ends[stop - 1]])
+            output_files.append((file_name, stop - start))
+
+        self.stats['output_file_list'].extend(output_files)
+        self.stats['output_files'] += len(output_files)
         return output_files
 
-    def _split_multi_fields_with_date(self, df, base_name, non_date_fields, date_field, period_type):
+    def _split_by_composite_key(self, df, base_name, key_fields, period_keys=None):
         """
-        多非日期字段 + 1个日期字段的级联拆分
+        多字段级联拆分：由全部拆分字段（及时间周期）构造组合键，一次分组后直接写出每个叶子分区
 
-        示例：['省份', '城市'] + '订单日期'
-        - 第1层：按'省份'拆分
-        - 第2层：按'城市'拆分
-        - 第3层：按'订单日期'时间周期拆分
+        示例：['省份', '城市'] + '订单日期'(M) → sample_广东_深圳_2024-01.csv
+
+        每层的前缀编码按首次出现顺序分配，按 (第1层前缀, 第2层前缀, ...) 排序即得到与逐层
+        级联相同的输出顺序；同一叶子下时间周期按标签排序，日期为空的数据排在最后（_NULL）。
+        任一拆分字段为空的行被丢弃。
 
         Args:
             df: DataFrame
             base_name: 基础文件名
-            non_date_fields: 非日期字段列表
-            date_field: 日期字段名
-            period_type: 时间周期类型
+            key_fields: 按唯一值拆分的字段列表
+            period_keys: 预先计算的时间周期分组键（日期为空时为 NaN），None 表示不按时间周期拆分
 
         Returns:
             list: [(file_name, row_count), ...]
         """
         output_files = []
+        num_rows = len(df)
+
+        # 逐层组合前缀编码（只在前面各层都非空的行上分配）
+        alive = np.ones(num_rows, dtype=bool)
+        prefix = np.zeros(num_rows, dtype=np.int64)
+        level_codes = []
+        level_values = []
+        sort_keys = []
+        for field in key_fields:
+            codes, uniques = pd.factorize(df[field], sort=False)
+            level_codes.append(codes)
+            level_values.append(uniques)
+            alive &= codes >= 0
+            combined = prefix[alive] * max(len(uniques), 1) + codes[alive]
+            prefix = np.full(num_rows, -1, dtype=np.int64)
+            prefix[alive] = pd.factorize(combined, sort=False)[0]
+            sort_keys.append(prefix)
+
+        # 时间周期编码：标签升序，日期为空排在最后
+        if period_keys is not None:
+            period_codes, period_labels = pd.factorize(period_keys.to_numpy(), sort=True)
+            period_codes[period_codes < 0] = len(period_labels)
+            sort_keys.append(period_codes)
+
+        positions = np.flatnonzero(alive)
+        order = positions[np.lexsort([positions] + [key[positions] for key in reversed(sort_keys)])]
+
+        # 叶子分区边界：最后一层前缀或时间周期发生变化的位置
+        leaf_keys = sort_keys[-2:] if period_keys is not None else sort_keys[-1:]
+        changed = np.zeros(len(order), dtype=bool)
+        if len(order) > 0:
+            changed[0] = True
+            for key in leaf_keys:
+                changed[1:] |= key[order][1:] != key[order][:-1]
+        bounds = np.append(np.flatnonzero(changed), len(order))
+
+        print(f"     组合键分组: 找到 {len(bounds) - 1} 个分区")
+
+        for start, end in tqdm(zip(bounds[:-1], bounds[1:]), total=len(bounds) - 1, desc="     拆分中"):
+            first_row = order[start]
+            suffix = ''.join(
+                f"_{FileUtils.safe_filename(values[codes[first_row]])}"
+                for codes, values in zip(level_codes, level_values)
+            )
+            if period_keys is not None:
+                code = period_codes[first_row]
+                suffix += f"_{period_labels[code]}" if code < len(period_labels) else "_NULL"
 
-        def recursive_split(sub_df, suffix, field_index):
-            """递归拆分辅助函数"""
-            if field_index >= len(non_date_fields):
-                # 所有非日期字段处理完毕，按日期拆分
-                sub_df[date_field] = DateUtils.convert_to_datetime(sub_df[date_field])
-                sub_df_valid = sub_df.dropna(subset=[date_field])
-
-                if len(sub_df_valid) > 0:
-                    # 应用时间周期过滤
-                    period_keys = DateUtils.apply_period_filter(sub_df_valid[date_field], period_type)
-                    grouped = sub_df_valid.groupby(period_keys)
-
-                    for period_label, period_df in grouped:
-                        final_suffix = f"{suffix}_{period_label}"
-                        files = self._split_by_size(period_df, base_name, final_suffix)
-                        output_files.extend(files)
-
-                # 处理日期为空的数据
-                sub_df_null = sub_df[sub_df[date_field].isna()]
-                if len(sub_df_null) > 0:
-                    final_suffix = f"{suffix}_NULL"
-                    files = self._split_by_size(sub_df_null, base_name, final_suffix)
-                    output_files.extend(files)
-
-                return
-
-            # 按当前字段拆分
-            current_field = non_date_fields[field_index]
-            unique_values = sub_df[current_field].dropna().unique()
-
-            indent = "  " * (field_index + 2)
-            print(f"{indent}第{field_index + 1}层 ('{current_field}'): {len(unique_values)} 个值")
-
-            for value in tqdm(unique_values, desc=f"{indent}拆分", leave=False):
-                value_df = sub_df[sub_df[current_field] == value]
-                safe_value = FileUtils.safe_filename(value)
-                new_suffix = f"{suffix}_{safe_value}"
-
-                # 递归下一层
-                recursive_split(value_df, new_suffix, field_index + 1)
+            files = self._split_by_size(df.iloc[order[start:end]], base_name, suffix)
+            output_files.extend(files)
 
-        # 开始递归拆分
-        recursive_split(df, '', 0)
         return output_files
 
     def _split_by_non_date(self, df, base_name, field):
@@ -249,12 +375,12 @@ class CSVSplitter:
             list: [(file_name, row_count), ...]
         """
         output_files = []
-        unique_values = df[field].dropna().unique()
+        groups = self._factorize_groups(df[field])
 
-        print(f"     找到 {len(unique_values)} 个唯一值")
+        print(f"     找到 {len(groups)} 个唯一值")
 
-        for value in tqdm(unique_values, desc="     拆分中"):
-            sub_df = df[df[field] == value]
+        for value, positions in tqdm(groups, desc="     拆分中"):
+            sub_df = df.iloc[positions]
             safe_value = FileUtils.safe_filename(value)
             suffix = f"_{safe_value}"
 
@@ -263,32 +389,27 @@ class CSVSplitter:
 
         return output_files
 
-    def _split_by_date(self, df, base_name, date_field, period_type):
+    def _split_by_date(self, df, base_name, period_keys):
         """
         按日期字段拆分
 
         Args:
             df: DataFrame
             base_name: 基础文件名
-            date_field: 日期字段名
-            period_type: 时间周期类型
+            period_keys: 预先计算的时间周期分组键（日期为空时为 NaN）
 
         Returns:
             list: [(file_name, row_count), ...]
         """
         output_files = []
+        valid = period_keys.notna()
 
-        # 转换日期
-        df[date_field] = DateUtils.convert_to_datetime(df[date_field])
-        df_valid = df.dropna(subset=[date_field])
-
-        if len(df_valid) == 0:
+        if not valid.any():
             print("     ⚠️  警告: 没有有效的日期值")
             return output_files
 
         # 按周期分组
-        period_keys = DateUtils.apply_period_filter(df_valid[date_field], period_type)
-        grouped = df_valid.groupby(period_keys)
+        grouped = df[valid].groupby(period_keys[valid])
         print(f"     找到 {len(grouped)} 个时间周期")
 
         for period_label, period_df in tqdm(grouped, desc="     拆分中"):
@@ -297,7 +418,7 @@ class CSVSplitter:
             output_files.extend(files)
 
         # 处理日期为空的数据
-        df_null = df[df[date_field].isna()]
+        df_null = df[~valid]
         if len(df_null) > 0:
             print(f"     发现 {len(df_null)} 行日期为空的数据")
             suffix = "_NULL"
@@ -306,7 +427,7 @@ class CSVSplitter:
 
         return output_files
 
-    def _split_by_non_date_and_date(self, df, base_name, non_date_field, date_field, period_type):
+    def _split_by_non_date_and_date(self, df, base_name, non_date_field, period_keys):
         """
         组合拆分：1个非日期字段 + 1个日期字段
 
@@ -314,26 +435,23 @@ class CSVSplitter:
             df: DataFrame
             base_name: 基础文件名
             non_date_field: 非日期字段名
-            date_field: 日期字段名
-            period_type: 时间周期类型
+            period_keys: 预先计算的时间周期分组键（日期为空时为 NaN）
 
         Returns:
             list: [(file_name, row_count), ...]
         """
         output_files = []
-        unique_values = df[non_date_field].dropna().unique()
+        groups = self._factorize_groups(df[non_date_field])
 
-        print(f"     第一层拆分: 找到 {len(unique_values)} 个 '{non_date_field}' 值")
+        print(f"     第一层拆分: 找到 {len(groups)} 个 '{non_date_field}' 值")
 
-        for value in tqdm(unique_values, desc="     第一层拆分"):
-            sub_df = df[df[non_date_field] == value].copy()
+        for value, positions in tqdm(groups, desc="     第一层拆分"):
+            sub_df = df.iloc[positions]
+            sub_keys = period_keys.iloc[positions]
+            valid = sub_keys.notna()
             safe_value = FileUtils.safe_filename(value)
 
-            # 转换日期
-            sub_df[date_field] = DateUtils.convert_to_datetime(sub_df[date_field])
-            sub_df_valid = sub_df.dropna(subset=[date_field])
-
-            if len(sub_df_valid) == 0:
+            if not valid.any():
                 # 如果没有有效日期，直接保存
                 suffix = f"_{safe_value}"
                 files = self._split_by_size(sub_df, base_name, suffix)
@@ -341,8 +459,7 @@ class CSVSplitter:
                 continue
 
             # 按日期周期分组
-            period_keys = DateUtils.apply_period_filter(sub_df_valid[date_field], period_type)
-            grouped = sub_df_valid.groupby(period_keys)
+            grouped = sub_df[valid].groupby(sub_keys[valid])
 
             for period_label, period_df in grouped:
                 suffix = f"_{safe_value}_{period_label}"
@@ -350,7 +467,7 @@ class CSVSplitter:
                 output_files.extend(files)
 
             # 处理该值下日期为空的数据
-            sub_df_null = sub_df[sub_df[date_field].isna()]
+            sub_df_null = sub_df[~valid]
             if len(sub_df_null) > 0:
                 suffix = f"_{safe_value}_NULL"
                 files = self._split_by_size(sub_df_null, base_name, suffix)
@@ -358,48 +475,1292 @@ class CSVSplitter:
 
         return output_files
 
-    def split_by_rows_only(self, file_path):
+    def _plan_split(self, date_fields, non_date_fields, time_period):
         """
-        只按行数拆分CSV文件（不按字段拆分）
+        根据字段分类和时间周期确定拆分策略
+
+        Args:
+            date_fields: 日期字段列表
+            non_date_fields: 非日期字段列表
+            time_period: 时间周期，None 表示不按周期拆分
+
+        Returns:
+            tuple: (key_fields, date_field, period)
+                - key_fields: 按唯一值逐层拆分的字段列表
+                - date_field: 按时间周期拆分的日期字段，None 表示不按周期拆分
+                - period: 时间周期类型
+        """
+        if len(non_date_fields) >= 2:
+            # 多个非日期字段：级联拆分
+            print(f"\n  拆分策略: 级联拆分 {len(non_date_fields)} 个字段: {non_date_fields}")
+            if date_fields and time_period:
+                # 有时间周期设置时，添加日期字段拆分
+                print(f"  附加时间字段: '{date_fields[0]}' ({TIME_PERIOD_DESCRIPTIONS.get(time_period, time_period)})")
+                return list(non_date_fields), date_fields[0], time_period
+            if date_fields:
+                # 无时间周期设置时，将日期字段当作普通字段级联拆分
+                print(f"  附加字段: {date_fields}（按唯一值拆分）")
+                return non_date_fields + date_fields, None, None
+            return list(non_date_fields), None, None
+
+        if non_date_fields and date_fields:
+            # 1个非日期字段 + 1个日期字段
+            if time_period:
+                # 有时间周期设置：组合拆分
+                print(f"\n  拆分策略: 按 '{non_date_fields[0]}' + '{date_fields[0]}' ({TIME_PERIOD_DESCRIPTIONS.get(time_period, time_period)})")
+                return [non_date_fields[0]], date_fields[0], time_period
+            # 无时间周期设置：级联按唯一值拆分
+            print(f"\n  拆分策略: 级联拆分 '{non_date_fields[0]}' + '{date_fields[0]}'（按唯一值）")
+            return [non_date_fields[0], date_fields[0]], None, None
+
+        if non_date_fields:
+            # 仅按非日期字段拆分
+            print(f"\n  拆分策略: 按 '{non_date_fields[0]}'")
+            return [non_date_fields[0]], None, None
+
+        # 仅按日期字段拆分
+        if time_period:
+            print(f"\n  拆分策略: 按 '{date_fields[0]}' ({TIME_PERIOD_DESCRIPTIONS.get(time_period, time_period)})")
+            return [], date_fields[0], time_period
+        # 无时间周期设置，按日期唯一值拆分
+        print(f"\n  拆分策略: 按 '{date_fields[0]}'（按唯一值）")
+        return [date_fields[0]], None, None
+
+    def _compute_period_keys(self, df, date_field, period_type):
+        """
+        把日期字段转换为 datetime（原地写回 df）并计算时间周期分组键
+
+        每个文件只转换、计算一次，各拆分策略复用同一结果；
+        解析时使用字段分类阶段推断出的日期格式，并且只解析唯一值。
+
+        Args:
+            df: DataFrame
+            date_field: 日期字段名
+            period_type: 时间周期类型
+
+        Returns:
+            Series: 与 df 行对齐的周期分组键，日期为空的行为 NaN
+        """
+        dates, period_keys = DateUtils.convert_with_period_keys(
+            df[date_field], period_type, self.date_formats.get(date_field)
+        )
+        df[date_field] = dates
+        return period_keys
+
+    def _split_by_plan(self, df, base_name, key_fields, period_keys=None):
+        """
+        按拆分策略对整个 DataFrame 执行拆分
+
+        Args:
+            df: DataFrame
+            base_name: 基础文件名
+            key_fields: 按唯一值拆分的字段列表
+            period_keys: 预先计算的时间周期分组键，None 表示不按周期拆分
+
+        Returns:
+            list: [(file_name, row_count), ...]
+        """
+        if len(key_fields) >= 2:
+            return self._split_by_composite_key(df, base_name, key_fields, period_keys)
+
+        if period_keys is None:
+            return self._split_by_non_date(df, base_name, key_fields[0])
+        if key_fields:
+            return self._split_by_non_date_and_date(df, base_name, key_fields[0], period_keys)
+        return self._split_by_date(df, base_name, period_keys)
+
+    def _read_chunks(self, file_path, **kwargs):
+        """
+        按块读取CSV文件
 
         Args:
             file_path: 文件路径
+            **kwargs: 传递给 pandas.read_csv 的其他参数
+
+        Returns:
+            TextFileReader: 逐块产出 DataFrame 的迭代器
         """
-        print(f"\n{'=' * 60}")
-        print(f"处理文件: {file_path}")
-        print(f"{'=' * 60}")
-        print("  拆分模式: 按行数拆分")
+        return FileUtils.read_csv_with_encoding(
+            file_path, encoding=self._resolve_encoding(file_path), chunksize=self.chunksize, **kwargs
+        )
 
-        # 发送进度：开始处理
-        self._emit_progress(0, 100, f"开始处理: {file_path}")
+    def _column_types(self, file_path, split_fields=(), columns=None):
+        """
+        流式读取一遍文件，得到各列在整个文件一次性读入时的类型（拆分字段按文本规则归类）
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表（按原始文本读入）
+            columns: 要统计的列名列表，None 表示全部列
+
+        Returns:
+            dict: {列名: 类型}，见 FileUtils.column_types
+        """
+        return FileUtils.infer_column_types(
+            file_path, self._resolve_encoding(file_path), columns=columns, text_columns=split_fields,
+            chunksize=self.chunksize or SPILL_CHUNKSIZE
+        )
+
+    @staticmethod
+    def _stream_dtypes(column_types, text_fields=()):
+        """
+        流式读取时各列的 dtype：text_fields 按原始文本读取，其余列固定为整个文件的类型
+
+        各块独立推断类型时，整数列只在含空值的块中变为浮点，写出的格式与一次性读入不一致；
+        固定浮点、布尔对象和文本列即可，整数和布尔列在各块中的推断结果本来就相同。
+
+        Args:
+            column_types: _column_types 的结果
+            text_fields: 按原始文本读取的字段列表
+
+        Returns:
+            dict: 传给 read_csv 的 dtype
+        """
+        dtype = {field: str for field in text_fields}
+        for column, kind in column_types.items():
+            if column not in dtype and kind in STREAM_DTYPES:
+                dtype[column] = STREAM_DTYPES[kind]
+        return dtype
+
+    @staticmethod
+    def _restore_split_values(df, column_types, split_fields):
+        """
+        把按原始文本读入的拆分字段还原为整个文件的类型（原地修改 df）
+
+        与 _infer_category_values 的规则一致：可转为数值的字段还原为数值，整个文件中含空值的整数字段为浮点，
+        使各块生成的文件名和输出内容与一次性读入时一致。
+
+        Args:
+            df: 数据块 DataFrame
+            column_types: _column_types 的结果
+            split_fields: 拆分字段列表
+        """
+        for field in split_fields:
+            kind = column_types.get(field)
+            if field not in df.columns or kind not in ('int', 'float'):
+                continue
+            codes, uniques = pd.factorize(df[field])
+            values = pd.to_numeric(uniques).to_numpy(dtype=float if kind == 'float' else None)
+            restored = values[codes]
+            if kind == 'float':
+                restored[codes < 0] = np.nan
+            df[field] = restored
+
+    def _resolve_encoding(self, file_path):
+        """确定文件编码（'auto' 时自动检测，检测失败按 utf-8 处理）"""
+        if self.encoding == 'auto':
+            return FileUtils.detect_encoding(file_path) or 'utf-8'
+        return self.encoding
+
+    def _chunk_partitions(self, chunk, key_fields, date_field, period):
+        """
+        计算一个数据块中各行所属的分区
+
+        与一次性拆分的规则一致：任一拆分字段为空的行被丢弃，
+        日期无法解析的行归入 _NULL 分区。
+
+        Args:
+            chunk: 数据块 DataFrame（日期字段会被原地转换为 datetime）
+            key_fields: 按唯一值拆分的字段列表
+            date_field: 日期字段名，None 表示不按周期拆分
+            period: 时间周期类型
 
+        Yields:
+            tuple: (key_values, has_valid_date, sub_df)
+        """
+        keys = [chunk[field] for field in key_fields]
+        if date_field is not None:
+            keys.append(self._compute_period_keys(chunk, date_field, period).fillna('NULL'))
+
+        for key_values, sub_df in chunk.groupby(keys, sort=False, dropna=True):
+            if not isinstance(key_values, tuple):
+                key_values = (key_values,)
+            yield key_values, date_field is not None and key_values[-1] != 'NULL', sub_df
+
+    def _date_part_rows(self):
+        """
+        一次性拆分时日期列按多少行一起格式化：按 max_rows 切分时每个输出文件单独写出，
+        按 max_bytes 切分或不切分时整个分区一起写出（返回 None）
+        """
+        return self.max_rows if self.max_bytes is None else None
+
+    @staticmethod
+    def _add_date_levels(date_levels, counts, key_values, levels, part_rows):
+        """
+        累计一个分区中一批行的日期精度级别，按输出文件取最大值
+
+        Args:
+            date_levels: {key_values: [各输出文件的级别, ...]}（原地更新）
+            counts: {key_values: 已累计的行数}（原地更新）
+            key_values: 分区键值元组
+            levels: 这批行按原始行序的级别数组，见 DateUtils.datetime_levels
+            part_rows: 每个输出文件的行数，None 表示整个分区一个文件
+        """
+        start = counts.get(key_values, 0)
+        counts[key_values] = start + len(levels)
+        file_levels = date_levels.setdefault(key_values, [])
+        if len(levels) == 0:
+            return
+        if part_rows is None:
+            first_part, bounds = 0, [0]
+        else:
+            first_part = start // part_rows
+            last_part = (start + len(levels) - 1) // part_rows
+            bounds = np.maximum(np.arange(first_part, last_part + 1) * part_rows - start, 0)
+        for part, level in enumerate(np.maximum.reduceat(levels, bounds), start=first_part):
+            if part == len(file_levels):
+                file_levels.append(int(level))
+            else:
+                file_levels[part] = max(file_levels[part], int(level))
+
+    @staticmethod
+    def _format_partition_dates(sub_df, date_field, date_levels, positions, key_values, part_rows):
+        """
+        按各行所在输出文件的精度级别把日期列格式化为文本
+
+        分块写出时 pandas 按每次写出的值选择日期格式，同一文件的各块可能得到不同的格式；
+        统一按整个输出文件的级别格式化后与一次性拆分写出的文本一致。
+
+        Args:
+            sub_df: 一个分区的一批行
+            date_field: 日期字段名
+            date_levels: {key_values: [各输出文件的级别, ...]}，不含的分区全部只有日期
+            positions: {key_values: 该分区已写出的行数}（原地更新）
+            key_values: 分区键值元组
+            part_rows: 每个输出文件的行数，None 表示整个分区一个文件
+
+        Returns:
+            DataFrame: 日期列已格式化的 sub_df
+        """
+        start = positions.get(key_values, 0)
+        positions[key_values] = start + len(sub_df)
+        file_levels = date_levels.get(key_values)
+        if not file_levels or not len(sub_df):
+            return sub_df
+
+        dates = sub_df[date_field]
+        if part_rows is None:
+            pieces = [DateUtils.format_datetimes(dates, file_levels[0])]
+        else:
+            pieces = []
+            for part in range(start // part_rows, (start + len(sub_df) - 1) // part_rows + 1):
+                begin = max(part * part_rows - start, 0)
+                end = (part + 1) * part_rows - start
+                pieces.append(DateUtils.format_datetimes(dates.iloc[begin:end], file_levels[part]))
+        sub_df = sub_df.copy()
+        sub_df[date_field] = pd.concat(pieces) if len(pieces) > 1 else pieces[0]
+        return sub_df
+
+    def _scan_date_levels(self, file_path, split_fields, column_types, plan):
+        """
+        预先流式读取一遍拆分字段，统计每个输出文件中日期值的精度级别
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表
+            column_types: _column_types 的结果
+            plan: _plan_split 的结果
+
+        Returns:
+            dict: {key_values: [各输出文件的级别, ...]}，只含带时间的分区
+        """
+        key_fields, date_field, _ = plan
+        part_rows = self._date_part_rows()
+        date_levels, counts = {}, {}
+        reader = self._read_chunks(file_path, usecols=key_fields + [date_field],
+                                   dtype={field: str for field in split_fields})
+        with reader:
+            for chunk in reader:
+                self._restore_split_values(chunk, column_types, split_fields)
+                for key_values, _, sub_df in self._chunk_partitions(chunk, *plan):
+                    self._add_date_levels(date_levels, counts, key_values,
+                                          DateUtils.datetime_levels(sub_df[date_field]), part_rows)
+        return {key: levels for key, levels in date_levels.items() if max(levels, default=0) > 0}
+
+    def _split_single_file_chunked(self, file_path, split_fields, time_period):
+        """
+        流式拆分单个文件：逐块读取，把每块的行路由到对应分区文件
+
+        字段分类基于第一个数据块。先流式推断整个文件的列类型：拆分字段按原始文本读取后
+        还原为整个文件的类型，其余列按该类型固定，使文件名和写出的格式与一次性读入时一致。
+        按日期拆分时再预读一遍拆分字段，按各输出文件的日期精度统一格式化日期列。
+        输出文件按分区首次出现的顺序记录。
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表
+            time_period: 时间周期
+
+        Returns:
+            list: [(file_name, row_count), ...]；None 表示没有有效字段
+        """
+        self._emit_progress(5, 100, "推断列类型...")
+        column_types = self._column_types(file_path, split_fields)
+        self._emit_progress(10, 100, "流式读取文件...")
+        print(f"  读取模式: 流式（每块 {self.chunksize:,} 行）")
+        self._print_split_settings(time_period)
+
+        reader = self._read_chunks(file_path, dtype=self._stream_dtypes(column_types, split_fields))
+        self.stats['total_files'] += 1
+        writer = PartitionWriter(self.output_dir, FileUtils.get_file_stem(file_path), self.max_rows,
+                                     buffer_bytes=self.writer_buffer_bytes, max_bytes=self.max_bytes)
+        plan = None
+        valid_prefixes = set()
+        total_rows = 0
+        # 按日期拆分时各输出文件的日期精度，以及各分区已写出的行数
+        date_levels, positions = {}, {}
+        part_rows = self._date_part_rows()
+
+        with reader:
+            for chunk in reader:
+                self._restore_split_values(chunk, column_types, split_fields)
+                if plan is None:
+                    print(f"  字段数: {len(chunk.columns)}")
+                    self._emit_progress(20, 100, "分析字段...")
+                    date_fields, non_date_fields = self._classify_fields(chunk, split_fields)
+                    if not date_fields and not non_date_fields:
+                        return None
+                    plan = self._plan_split(date_fields, non_date_fields, time_period)
+                    date_field = plan[1]
+                    if date_field is not None:
+                        self._emit_progress(25, 100, "统计日期精度...")
+                        date_levels = self._scan_date_levels(file_path, split_fields, column_types, plan)
+                    self._emit_progress(30, 100, "开始拆分...")
+
+                total_rows += len(chunk)
+                self.stats['total_rows'] += len(chunk)
+                for key_values, has_valid_date, sub_df in self._chunk_partitions(chunk, *plan):
+                    if date_levels:
+                        sub_df = self._format_partition_dates(sub_df, date_field, date_levels, positions,
+                                                              key_values, part_rows)
+                    suffix = self._partition_suffix(key_values, has_valid_date, valid_prefixes)
+                    writer.write(suffix, sub_df)
+                print(f"     已处理 {total_rows:,} 行")
+
+        print(f"  总行数: {total_rows:,}")
+        return self._close_partitions(writer, plan, valid_prefixes)
+
+    @staticmethod
+    def _partition_suffix(key_values, has_valid_date, valid_prefixes):
+        """
+        生成分区文件名后缀，并记录含有效日期的前缀
+
+        Args:
+            key_values: 分区键值元组
+            has_valid_date: 该分区日期是否有效
+            valid_prefixes: 含有效日期的前缀集合（原地更新）
+
+        Returns:
+            str: 文件名后缀
+        """
+        suffix = ''.join(f"_{FileUtils.safe_filename(v)}" for v in key_values)
+        if has_valid_date:
+            valid_prefixes.add(suffix[:suffix.rindex('_')])
+        return suffix
+
+    @staticmethod
+    def _final_suffix(suffix, plan, valid_prefixes):
+        """
+        与一次性拆分一致：单个普通字段 + 日期拆分时，某个值下全部日期为空的分区不带 _NULL 后缀
+
+        Args:
+            suffix: 分区文件名后缀
+            plan: _plan_split 的结果
+            valid_prefixes: 含有效日期的前缀集合
+
+        Returns:
+            str: 最终的文件名后缀
+        """
+        key_fields, date_field, _ = plan
+        if date_field is not None and len(key_fields) == 1 and suffix.endswith('_NULL'):
+            prefix = suffix[:-len('_NULL')]
+            if prefix not in valid_prefixes:
+                return prefix
+        return suffix
+
+    def _close_partitions(self, writer, plan, valid_prefixes):
+        """
+        结束分区写入并记录统计
+
+        Args:
+            writer: PartitionWriter
+            plan: _plan_split 的结果，None 表示没有读到数据
+            valid_prefixes: 含有效日期的前缀集合
+
+        Returns:
+            list: [(file_name, row_count), ...]
+        """
+        if plan is not None:
+            for suffix in writer.suffixes():
+                final_suffix = self._final_suffix(suffix, plan, valid_prefixes)
+                if final_suffix != suffix:
+                    writer.relabel(suffix, final_suffix)
+
+        output_files = writer.close()
+        self.stats['output_file_list'].extend(output_files)
+        self.stats['output_files'] += len(output_files)
+        return output_files
+
+    def _make_scratch_dir(self, prefix):
+        """在 scratch_dir（默认输出目录）下创建临时目录"""
+        FileUtils.ensure_output_dir(self.output_dir)
+        parent = self.scratch_dir or self.output_dir
+        FileUtils.ensure_output_dir(parent)
+        return tempfile.mkdtemp(prefix=prefix, dir=parent)
+
+    def _split_single_file_spilled(self, file_path, split_fields, time_period):
+        """
+        外部溢写拆分：内存和打开的文件句柄数与拆分字段的取值个数无关
+
+        第一阶段逐块读取，按拆分字段值的哈希把行溢写到 spill_buckets 个临时桶文件
+        （同一取值的所有行落在同一个桶中）；第二阶段逐桶读入内存（日期字段读回为 datetime），
+        按组合键分组后以 _{safe_value} 命名写出最终文件。
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表
+            time_period: 时间周期
+
+        Returns:
+            list: [(file_name, row_count), ...]；None 表示没有有效字段
+        """
+        self._emit_progress(5, 100, "推断列类型...")
+        column_types = self._column_types(file_path, split_fields)
+        self._emit_progress(10, 100, "溢写分桶...")
+        chunksize = self.chunksize or SPILL_CHUNKSIZE
+        print(f"  读取模式: 外部溢写（{self.spill_buckets} 个桶，每块 {chunksize:,} 行）")
+        self._print_split_settings(time_period)
+
+        reader = FileUtils.read_csv_with_encoding(
+            file_path, encoding=self._resolve_encoding(file_path), chunksize=chunksize,
+            dtype=self._stream_dtypes(column_types, split_fields)
+        )
+        base_name = FileUtils.get_file_stem(file_path)
+        scratch_dir = self._make_scratch_dir('.spill_')
+        output_files = []
         try:
-            # 读取文件
-            self._emit_progress(10, 100, "读取文件...")
-            df = FileUtils.read_csv_with_encoding(file_path, encoding=self.encoding, low_memory=False)
-            total_rows = len(df)
+            buckets = PartitionWriter(scratch_dir, 'bucket', buffer_bytes=self.writer_buffer_bytes)
+            plan = None
+            total_rows = 0
+
+            # 第一阶段：按哈希溢写到桶文件
+            with reader:
+                for chunk in reader:
+                    self._restore_split_values(chunk, column_types, split_fields)
+                    if plan is None:
+                        print(f"  字段数: {len(chunk.columns)}")
+                        date_fields, non_date_fields = self._classify_fields(chunk, split_fields)
+                        if not date_fields and not non_date_fields:
+                            return None
+                        plan = self._plan_split(date_fields, non_date_fields, time_period)
+                        self.stats['total_files'] += 1
+                    key_fields, date_field, period = plan
+
+                    total_rows += len(chunk)
+                    self.stats['total_rows'] += len(chunk)
+                    if date_field is not None:
+                        chunk[SPILL_PERIOD_COLUMN] = self._compute_period_keys(chunk, date_field, period).fillna('NULL')
+                    # 任一拆分字段为空的行被丢弃（与一次性拆分一致）
+                    chunk = chunk[chunk[key_fields].notna().all(axis=1)]
+                    hash_fields = key_fields or [SPILL_PERIOD_COLUMN]
+                    bucket_ids = self._hash_buckets(chunk, hash_fields, self.spill_buckets)
+                    for bucket_id, positions in self._factorize_groups(pd.Series(bucket_ids)):
+                        buckets.write(f"_{bucket_id}", chunk.iloc[positions])
+                    print(f"     已溢写 {total_rows:,} 行")
+            bucket_files = buckets.close()
+            if plan is None:
+                return output_files
+
+            # 第二阶段：逐桶在内存中拆分
+            self._emit_progress(50, 100, "逐桶拆分...")
             print(f"  总行数: {total_rows:,}")
-            print(f"  字段数: {len(df.columns)}")
+            key_fields, date_field, _ = plan
+            group_fields = key_fields + ([SPILL_PERIOD_COLUMN] if date_field is not None else [])
+            for index, (bucket_file, _) in enumerate(bucket_files):
+                bucket_path = os.path.join(scratch_dir, bucket_file)
+                bucket = pd.read_csv(bucket_path, encoding='utf-8-sig', low_memory=False,
+                                     dtype=self._stream_dtypes(column_types, split_fields + group_fields))
+                os.remove(bucket_path)
+                if date_field is not None:
+                    # 'NULL' 按默认规则读回为空值，重新标记为日期无效的分区
+                    bucket[SPILL_PERIOD_COLUMN] = bucket[SPILL_PERIOD_COLUMN].fillna('NULL')
+                    # 桶文件中的日期文本按各块写出，精度不丢失；读回为 datetime 后按输出文件统一格式化
+                    bucket[date_field] = pd.to_datetime(bucket[date_field], format='ISO8601')
+                partitions = []
+                valid_prefixes = set()
+                for key_values, sub_df in bucket.groupby(group_fields, sort=False, dropna=True):
+                    if not isinstance(key_values, tuple):
+                        key_values = (key_values,)
+                    has_valid_date = date_field is not None and key_values[-1] != 'NULL'
+                    suffix = self._partition_suffix(key_values, has_valid_date, valid_prefixes)
+                    partitions.append((suffix, sub_df.drop(columns=SPILL_PERIOD_COLUMN, errors='ignore')))
+                for suffix, sub_df in partitions:
+                    suffix = self._final_suffix(suffix, plan, valid_prefixes)
+                    output_files.extend(self._split_by_size(sub_df, base_name, suffix))
+                self._emit_progress(50 + 40 * (index + 1) // len(bucket_files), 100,
+                                    f"已处理 {index + 1}/{len(bucket_files)} 个桶")
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
 
-            # 必须设置 max_rows
-            if self.max_rows is None:
-                print("  ❌ 错误: 按行数拆分模式必须设置 max_rows 参数")
-                self._emit_progress(100, 100, "处理失败：未设置 max_rows")
-                return
+        return output_files
 
-            print(f"  行数拆分: ✅ 单文件最大 {self.max_rows:,} 行")
+    @staticmethod
+    def _hash_buckets(df, fields, buckets):
+        """
+        按字段值的稳定哈希（向量化）计算每行所属的桶号
+
+        同一组字段值在各数据块、各次运行中总是落在同一个桶；字段应按原始文本读取，
+        避免不同数据块推断出不同类型导致哈希不一致。
+
+        Args:
+            df: DataFrame
+            fields: 参与哈希的字段列表
+            buckets: 桶数
+
+        Returns:
+            ndarray: 与 df 行对齐的桶号数组
+        """
+        return pd.util.hash_pandas_object(df[fields], index=False).to_numpy() % buckets
+
+    @staticmethod
+    def _bucket_suffix(bucket_id, buckets):
+        """哈希分桶的文件名后缀（桶号按桶数补零，至少 3 位，如 _bucket007）"""
+        return f"_bucket{bucket_id:0{max(len(str(buckets - 1)), 3)}d}"
+
+    def _split_single_file_hashed(self, file_path, hash_fields):
+        """
+        哈希分桶拆分：按拆分字段值的哈希把行分配到 hash_buckets 个文件（_bucket007.csv）
+
+        同一取值的所有行落在同一个文件中，输出文件数不超过桶数；不需要统计字段的唯一值，
+        设置 chunksize 时逐块流式处理。拆分字段为空的行同样参与分桶。
+
+        Args:
+            file_path: 文件路径
+            hash_fields: 参与哈希的字段列表
+
+        Returns:
+            list: [(file_name, row_count), ...]，按桶号排序；None 表示没有有效字段
+        """
+        self._emit_progress(10, 100, "读取文件...")
+        print(f"  拆分模式: 哈希分桶（{self.hash_buckets} 个桶）")
+        if self.chunksize:
+            print(f"  读取模式: 流式（每块 {self.chunksize:,} 行）")
+        self._print_size_limit()
+
+        encoding = self._resolve_encoding(file_path)
+        columns = FileUtils.read_csv_with_encoding(file_path, encoding=encoding, nrows=0).columns
+        fields = [field for field in hash_fields if field in columns]
+        for field in hash_fields:
+            if field not in columns:
+                print(f"  ⚠️  字段 '{field}' 不存在，跳过")
+        if not fields:
+            return None
+
+        read_kwargs = {'dtype': {field: str for field in fields}, 'low_memory': False}
+        if self.chunksize:
+            read_kwargs['dtype'] = self._stream_dtypes(self._column_types(file_path, fields), fields)
+            chunks = self._read_chunks(file_path, **read_kwargs)
+        else:
+            chunks = contextlib.nullcontext([FileUtils.read_csv_with_encoding(file_path, encoding=encoding, **read_kwargs)])
+
+        writer = PartitionWriter(self.output_dir, FileUtils.get_file_stem(file_path), self.max_rows,
+                                 buffer_bytes=self.writer_buffer_bytes, max_bytes=self.max_bytes)
+        self.stats['total_files'] += 1
+        self._emit_progress(30, 100, "开始拆分...")
+        total_rows = 0
+        with chunks as reader:
+            for chunk in reader:
+                total_rows += len(chunk)
+                self.stats['total_rows'] += len(chunk)
+                bucket_ids = self._hash_buckets(chunk, fields, self.hash_buckets)
+                for bucket_id, positions in self._factorize_groups(pd.Series(bucket_ids)):
+                    writer.write(self._bucket_suffix(bucket_id, self.hash_buckets), chunk.iloc[positions])
+                if self.chunksize:
+                    print(f"     已处理 {total_rows:,} 行")
+
+        print(f"  总行数: {total_rows:,}")
+        output_files = sorted(writer.close())
+        self.stats['output_file_list'].extend(output_files)
+        self.stats['output_files'] += len(output_files)
+        return output_files
+
+    @staticmethod
+    def _read_range(task, dtype, usecols=None):
+        """
+        解析一个字节区间（前面拼上表头）
+
+        Args:
+            task: dict，包含 file_path、encoding、header_end、start、end
+            dtype: 传给 read_csv 的 dtype
+            usecols: 只读取的列名列表，None 表示全部列
+
+        Returns:
+            DataFrame: 区间内的数据行
+        """
+        with open(task['file_path'], 'rb') as f:
+            header = f.read(task['header_end'])
+            f.seek(task['start'])
+            body = f.read(task['end'] - task['start'])
+        return pd.read_csv(io.BytesIO(header + body), encoding=task['encoding'], low_memory=False, dtype=dtype,
+                           usecols=usecols)
+
+    @staticmethod
+    def _range_types_worker(task):
+        """
+        并行推断列类型的工作进程：解析一个字节区间，返回各列的类型（拆分字段按文本规则归类）
+
+        Args:
+            task: dict，包含 file_path、encoding、header_end、start、end、split_fields
+
+        Returns:
+            dict: {列名: 类型}，见 FileUtils.column_types
+        """
+        chunk = CSVSplitter._read_range(task, {field: str for field in task['split_fields']})
+        return FileUtils.column_types(chunk, task['split_fields'])
+
+    @staticmethod
+    def _range_date_levels_worker(task):
+        """
+        并行统计日期精度的工作进程：只解析一个字节区间的拆分字段，返回各分区中各行日期的精度级别
+
+        Args:
+            task: dict，包含 file_path、encoding、header_end、start、end、split_fields、
+                  column_types、plan、date_formats
+
+        Returns:
+            dict: {key_values: 按原始行序的级别数组}，见 DateUtils.datetime_levels
+        """
+        key_fields, date_field, _ = task['plan']
+        chunk = CSVSplitter._read_range(task, {field: str for field in task['split_fields']},
+                                        usecols=key_fields + [date_field])
+        CSVSplitter._restore_split_values(chunk, task['column_types'], task['split_fields'])
+        splitter = CSVSplitter(output_dir=task['scratch_dir'], encoding=task['encoding'])
+        splitter.date_formats = task['date_formats']
+        return {
+            key_values: DateUtils.datetime_levels(sub_df[date_field])
+            for key_values, _, sub_df in splitter._chunk_partitions(chunk, *task['plan'])
+        }
+
+    @staticmethod
+    def _split_range_worker(task):
+        """
+        并行拆分的工作进程：解析一个字节区间并把各分区写为无表头的中间文件
+
+        Args:
+            task: dict，包含 file_path、encoding、header_end、start、end、split_fields、
+                  column_types、plan、date_formats、scratch_dir、index，
+                  以及 date_levels、date_offsets（本区间各分区之前已有的行数）、date_part_rows
+
+        Returns:
+            tuple: (row_count, [(key_values, has_valid_date, fragment_path, rows), ...])
+        """
+        column_types = task['column_types']
+        chunk = CSVSplitter._read_range(task, CSVSplitter._stream_dtypes(column_types, task['split_fields']))
+        CSVSplitter._restore_split_values(chunk, column_types, task['split_fields'])
+        splitter = CSVSplitter(output_dir=task['scratch_dir'], encoding=task['encoding'])
+        splitter.date_formats = task['date_formats']
+        date_field = task['plan'][1]
+        positions = dict(task['date_offsets'])
+
+        partitions = []
+        for n, (key_values, has_valid_date, sub_df) in enumerate(splitter._chunk_partitions(chunk, *task['plan'])):
+            if task['date_levels']:
+                sub_df = CSVSplitter._format_partition_dates(sub_df, date_field, task['date_levels'], positions,
+                                                             key_values, task['date_part_rows'])
+            fragment_path = os.path.join(task['scratch_dir'], f"{task['index']}_{n}.csv")
+            sub_df.to_csv(fragment_path, index=False, header=False, encoding='utf-8')
+            partitions.append((key_values, has_valid_date, fragment_path, len(sub_df)))
+        return len(chunk), partitions
+
+    def _split_single_file_parallel(self, file_path, split_fields, time_period):
+        """
+        多进程拆分单个文件：按记录边界（引号感知）把文件切分为字节区间，
+        各进程并行解析、分区后写出中间文件，最后按原始行序合并到各分区
+
+        先由各进程并行推断各区间的列类型并合并为整个文件的类型；拆分时拆分字段按原始文本读取后
+        还原为该类型，其余列按该类型固定，保证各区间生成的文件名和写出的格式与一次性读入时一致。
+        按日期拆分时再并行统计各输出文件的日期精度，各区间按该精度统一格式化日期列。
+        字段分类基于文件开头的采样行。
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表
+            time_period: 时间周期
+
+        Returns:
+            list: [(file_name, row_count), ...]；None 表示没有有效字段
+        """
+        self._emit_progress(10, 100, "切分文件...")
+        print(f"  读取模式: 并行（{self.workers} 个进程）")
+        self._print_split_settings(time_period)
+        encoding = self._resolve_encoding(file_path)
+
+        with open(file_path, 'rb') as src:
+            buffer = RecordUtils.map_file(src)
+            try:
+                if len(buffer) == 0:
+                    raise ValueError(f"文件为空: {file_path}")
+                header_end = int(next(RecordUtils.iter_record_ends(buffer))[0])
+                ranges = RecordUtils.split_ranges(buffer, header_end, self.workers)
+            finally:
+                if hasattr(buffer, 'close'):
+                    buffer.close()
+
+        scratch_dir = self._make_scratch_dir('.parallel_')
+        try:
+            tasks = [
+                {
+                    'file_path': file_path, 'encoding': encoding, 'header_end': header_end,
+                    'start': start, 'end': end, 'split_fields': split_fields,
+                    'scratch_dir': scratch_dir, 'index': index,
+                }
+                for index, (start, end) in enumerate(ranges)
+            ]
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                # 各区间独立推断类型，合并后得到整个文件一次性读入时的类型
+                self._emit_progress(15, 100, "推断列类型...")
+                column_types = {}
+                for range_types in executor.map(self._range_types_worker, tasks):
+                    for column, kind in range_types.items():
+                        column_types[column] = FileUtils.merge_column_type(column_types.get(column), kind)
+
+                # 用文件开头的采样行分类字段
+                self._emit_progress(20, 100, "分析字段...")
+                sample = FileUtils.read_csv_with_encoding(
+                    file_path, encoding=encoding, nrows=DATE_DETECTION_SAMPLE_SIZE,
+                    dtype={field: str for field in split_fields}
+                )
+                self._restore_split_values(sample, column_types, split_fields)
+                print(f"  字段数: {len(sample.columns)}")
+                date_fields, non_date_fields = self._classify_fields(sample, split_fields)
+                if not date_fields and not non_date_fields:
+                    return None
+                plan = self._plan_split(date_fields, non_date_fields, time_period)
+                header = sample.head(0).to_csv(index=False)
+
+                for task in tasks:
+                    task.update(column_types=column_types, plan=plan, date_formats=self.date_formats,
+                                date_levels={}, date_offsets={}, date_part_rows=self._date_part_rows())
+                if plan[1] is not None:
+                    # 统计各输出文件的日期精度，并记录各区间中每个分区之前已有的行数
+                    self._emit_progress(25, 100, "统计日期精度...")
+                    date_levels, counts = {}, {}
+                    for task, range_levels in zip(tasks, executor.map(self._range_date_levels_worker, tasks)):
+                        task['date_offsets'] = {key: counts.get(key, 0) for key in range_levels}
+                        for key_values, levels in range_levels.items():
+                            self._add_date_levels(date_levels, counts, key_values, levels, task['date_part_rows'])
+                    date_levels = {key: levels for key, levels in date_levels.items() if max(levels, default=0) > 0}
+                    for task in tasks:
+                        task['date_levels'] = date_levels
+
+                self.stats['total_files'] += 1
+                self._emit_progress(30, 100, "开始拆分...")
+                writer = PartitionWriter(self.output_dir, FileUtils.get_file_stem(file_path), self.max_rows,
+                                         buffer_bytes=self.writer_buffer_bytes, max_bytes=self.max_bytes)
+                valid_prefixes = set()
+                total_rows = 0
+                # map 按提交顺序返回结果，合并后各分区保持原始行序
+                for index, (rows, partitions) in enumerate(executor.map(self._split_range_worker, tasks)):
+                    total_rows += rows
+                    self.stats['total_rows'] += rows
+                    for key_values, has_valid_date, fragment_path, fragment_rows in partitions:
+                        suffix = self._partition_suffix(key_values, has_valid_date, valid_prefixes)
+                        writer.append_file(suffix, fragment_path, fragment_rows, header)
+                        os.remove(fragment_path)
+                    self._emit_progress(30 + 60 * (index + 1) // len(tasks), 100, f"已合并 {total_rows:,} 行")
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+        print(f"  总行数: {total_rows:,}")
+        return self._close_partitions(writer, plan, valid_prefixes)
+
+    def _split_by_rows_chunked(self, file_path):
+        """
+        流式按行数拆分：逐块读取并顺序写入 _partN 文件
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            list: [(file_name, row_count), ...]
+        """
+        print(f"  读取模式: 流式（每块 {self.chunksize:,} 行）")
+        self._print_size_limit()
+
+        bounds = None
+        if self.parts:
+            # 先快速统计行数，确定各文件的结束行号
+            self._emit_progress(10, 100, "统计行数...")
+            bounds = np.cumsum(RecordUtils.balanced_sizes(FileUtils.count_rows(file_path), self.parts))
+
+        reader = self._read_chunks(file_path, dtype=self._stream_dtypes(self._column_types(file_path)))
+        self.stats['total_files'] += 1
+        if bounds is None:
+            writer = PartitionWriter(self.output_dir, FileUtils.get_file_stem(file_path), self.max_rows,
+                                     buffer_bytes=self.writer_buffer_bytes, max_bytes=self.max_bytes)
+        else:
+            writer = PartitionWriter(self.output_dir, FileUtils.get_file_stem(file_path),
+                                     buffer_bytes=self.writer_buffer_bytes)
+        total_rows = 0
+
+        self._emit_progress(30, 100, "开始拆分...")
+        print("\n  拆分策略: 按行数拆分（不进行字段分类）")
+        with reader:
+            for chunk in reader:
+                if bounds is None:
+                    writer.write('', chunk)
+                else:
+                    self._write_balanced(writer, chunk, total_rows, bounds)
+                total_rows += len(chunk)
+                self.stats['total_rows'] += len(chunk)
+
+        print(f"  总行数: {total_rows:,}")
+        output_files = writer.close()
+        self.stats['output_file_list'].extend(output_files)
+        self.stats['output_files'] += len(output_files)
+        return output_files
+
+    @staticmethod
+    def _write_balanced(writer, chunk, offset, bounds):
+        """
+        按各文件的结束行号把一块数据写入对应的 _partN 文件
+
+        Args:
+            writer: PartitionWriter
+            chunk: 本块数据
+            offset: 本块第一行在文件中的行号
+            bounds: 各文件的结束行号（累计行数）；超出最后一个结束行号的行写入最后一个文件
+        """
+        start = 0
+        while start < len(chunk):
+            part = min(int(np.searchsorted(bounds, offset + start, side='right')), len(bounds) - 1)
+            stop = len(chunk) if part == len(bounds) - 1 else min(int(bounds[part]) - offset, len(chunk))
+            writer.write('' if len(bounds) == 1 else f'_part{part + 1}', chunk.iloc[start:stop])
+            start = stop
+
+    def _plan_raw_parts(self, buffer, sizes=None):
+        """
+        扫描记录边界，规划每个 _partN 文件对应的字节区间
+
+        Args:
+            buffer: 文件内容（mmap 或 bytes）
+            sizes: 各文件的行数（均分时使用），None 表示按 max_rows / max_bytes 切分；
+                最后一个文件包含其余全部记录
+
+        Returns:
+            tuple: (header_end, parts)
+                - header_end: 表头结束位置
+                - parts: [(start, end, row_count), ...]
+        """
+        header_end = None
+        parts = []
+        part_start = part_rows = last_end = 0
+        max_bytes = None if sizes else self.max_bytes
+
+        for ends in RecordUtils.iter_record_ends(buffer):
+            if header_end is None:
+                header_end = part_start = last_end = int(ends[0])
+                ends = ends[1:]
+            while len(ends):
+                if sizes:
+                    max_rows = sizes[len(parts)] if len(parts) < len(sizes) - 1 else None
+                else:
+                    max_rows = self.max_rows
+                need = len(ends)
+                if max_rows is not None:
+                    need = min(need, max_rows - part_rows)
+                if max_bytes is not None:
+                    # 加上表头后不超过 max_bytes 的记录数，每个文件至少一条记录
+                    fit = int(np.searchsorted(ends, part_start + max_bytes - header_end, side='right'))
+                    need = min(need, fit if fit or part_rows else 1)
+                if need == 0:
+                    parts.append((part_start, last_end, part_rows))
+                    part_start, part_rows = last_end, 0
+                    continue
+                last_end = int(ends[need - 1])
+                part_rows += need
+                ends = ends[need:]
+                if part_rows == max_rows:
+                    parts.append((part_start, last_end, part_rows))
+                    part_start, part_rows = last_end, 0
+
+        if part_rows or not parts:
+            parts.append((part_start, last_end, part_rows))
+        return header_end, parts
+
+    def _split_by_rows_raw(self, file_path):
+        """
+        按原始字节拆分：内存映射文件，按引号感知的换行扫描定位记录边界，
+        把表头和连续的记录字节区间直接复制到各 _partN 文件
+
+        不解析 CSV，输出与原文件逐字节一致（空行也按一条记录计数）。
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            list: [(file_name, row_count), ...]
+        """
+        print("  读取模式: 原始字节（不解析，保持原始编码和格式）")
+        self._print_size_limit()
+        base_name = FileUtils.get_file_stem(file_path)
+        FileUtils.ensure_output_dir(self.output_dir)
+
+        output_files = []
+        with open(file_path, 'rb') as src:
+            buffer = RecordUtils.map_file(src)
+            try:
+                if len(buffer) == 0:
+                    raise ValueError(f"文件为空: {file_path}")
+                if bytes(buffer[:2]) in (b'\xff\xfe', b'\xfe\xff'):
+                    # UTF-16 的换行和引号不是单字节，无法按字节扫描
+                    header_end = None
+                else:
+                    sizes = None
+                    if self.parts:
+                        # 原始字节模式下空行也按一条记录计数
+                        self._emit_progress(5, 100, "统计行数...")
+                        sizes = RecordUtils.balanced_sizes(
+                            FileUtils.count_rows(file_path, skip_blank_lines=False), self.parts
+                        )
+                    self._emit_progress(10, 100, "扫描记录边界...")
+                    header_end, parts = self._plan_raw_parts(buffer, sizes)
+                    header = bytes(buffer[:header_end])
+            finally:
+                if hasattr(buffer, 'close'):
+                    buffer.close()
+
+            if header_end is None:
+                print("  ⚠️  UTF-16 编码文件不支持按原始字节拆分，改为解析后拆分")
+                return self._split_by_rows_in_memory(file_path)
 
             self.stats['total_files'] += 1
+            total_rows = sum(rows for _, _, rows in parts)
             self.stats['total_rows'] += total_rows
+            print(f"  总行数: {total_rows:,}")
 
-            # 基础文件名
-            base_name = FileUtils.get_file_stem(file_path)
-
-            # 执行按行数拆分
             self._emit_progress(30, 100, "开始拆分...")
             print("\n  拆分策略: 按行数拆分（不进行字段分类）")
+            for i, (start, end, rows) in enumerate(parts):
+                if len(parts) == 1:
+                    file_name = f"{base_name}.csv"
+                else:
+                    file_name = f"{base_name}_part{i + 1}.csv"
+                with open(os.path.join(self.output_dir, file_name), 'wb') as dst:
+                    dst.write(header)
+                    dst.flush()
+                    FileUtils.copy_byte_range(src.fileno(), dst.fileno(), start, end - start)
+                output_files.append((file_name, rows))
+                self._emit_progress(30 + 60 * (i + 1) // len(parts), 100, f"已写出 {file_name}")
+
+        self.stats['output_file_list'].extend(output_files)
+        self.stats['output_files'] += len(output_files)
+        return output_files
+
+    def _write_raw_records(self, file_name, header, buffer, starts, ends):
+        """
+        把表头和若干记录的原始字节写入一个输出文件（分批拼接，内存占用有上限）
 
-            output_files = self._split_by_size(df, base_name, suffix='')
+        Args:
+            file_name: 输出文件名
+            header: 表头字节
+            buffer: 文件内容（mmap 或 bytes）
+            starts: 各记录起始位置数组（按原始顺序）
+            ends: 各记录结束位置数组
+        """
+        batch_ends = np.cumsum(ends - starts)
+        with open(os.path.join(self.output_dir, file_name), 'wb') as dst:
+            dst.write(header)
+            first = 0
+            while first < len(starts):
+                # 本批取到累计字节数超过 RAW_GATHER_BYTES 为止（至少一条）
+                limit = (batch_ends[first - 1] if first else 0) + RAW_GATHER_BYTES
+                last = max(int(np.searchsorted(batch_ends, limit, side='right')), first + 1)
+                dst.write(RecordUtils.gather_records(buffer, starts[first:last], ends[first:last]))
+                first = last
+
+    def _index_records(self, file_path, buffer, split_fields, time_period):
+        """
+        扫描记录边界并只解析拆分字段，计算每条记录所属的分区
+
+        Args:
+            file_path: 文件路径
+            buffer: 文件内容（mmap 或 bytes，不能是 UTF-16）
+            split_fields: 拆分字段列表
+            time_period: 时间周期
+
+        Returns:
+            PartitionIndex: 分区索引；None 表示没有有效字段
+        """
+        fingerprint = PartitionIndex.file_fingerprint(file_path)
+        encoding = self._resolve_encoding(file_path)
+        record_ends = RecordUtils.record_ends(buffer)
+        starts, ends = record_ends[:-1], record_ends[1:]
+
+        # 跳过空行（与 pandas 解析时的行为一致）
+        short = np.flatnonzero(ends - starts <= 2)
+        blank = [i for i in short if not bytes(buffer[starts[i]:ends[i]]).strip(b'\r\n')]
+        if blank:
+            keep = np.ones(len(starts), dtype=bool)
+            keep[blank] = False
+            starts, ends = starts[keep], ends[keep]
+
+        # 只解析拆分字段
+        self._emit_progress(20, 100, "解析拆分字段...")
+        columns = FileUtils.read_csv_with_encoding(file_path, encoding=encoding, nrows=0).columns
+        usecols = [field for field in split_fields if field in columns]
+        if usecols:
+            df = FileUtils.read_csv_with_encoding(
+                file_path, encoding=encoding, usecols=usecols, dtype=str, low_memory=False
+            )
+        else:
+            df = pd.DataFrame(index=pd.RangeIndex(len(starts)))
+        if len(df) != len(starts):
+            raise ValueError(f"解析出的行数 ({len(df):,}) 与扫描到的记录数 ({len(starts):,}) 不一致")
+        # 整列一次读入，按本身的类型还原拆分字段，文件名与一次性拆分一致
+        self._restore_split_values(df, FileUtils.column_types(df, usecols), usecols)
+
+        date_fields, non_date_fields = self._classify_fields(df, split_fields)
+        if not date_fields and not non_date_fields:
+            return None
+        plan = self._plan_split(date_fields, non_date_fields, time_period)
+        key_fields, date_field, period = plan
+        keys = [df[field] for field in key_fields]
+        if date_field is not None:
+            keys.append(self._compute_period_keys(df, date_field, period).fillna('NULL'))
+
+        # 按首次出现顺序给分区编号，拆分字段为空的行编号为 -1
+        groups = df.groupby(keys, sort=False, dropna=True).indices
+        codes = np.full(len(df), -1, dtype=np.int32)
+        suffixes = []
+        valid_prefixes = set()
+        for code, (key_values, positions) in enumerate(sorted(groups.items(), key=lambda item: item[1][0])):
+            if not isinstance(key_values, tuple):
+                key_values = (key_values,)
+            has_valid_date = date_field is not None and key_values[-1] != 'NULL'
+            suffixes.append(self._partition_suffix(key_values, has_valid_date, valid_prefixes))
+            codes[positions] = code
+        suffixes = [self._final_suffix(suffix, plan, valid_prefixes) for suffix in suffixes]
+
+        return PartitionIndex(
+            split_fields=split_fields,
+            time_period=time_period,
+            encoding=encoding,
+            fingerprint=fingerprint,
+            header_end=record_ends[0],
+            starts=starts,
+            ends=ends,
+            codes=codes,
+            suffixes=suffixes,
+            column_count=len(columns),
+        )
+
+    def build_index(self, file_path, split_fields, time_period=None):
+        """
+        只解析拆分字段构建分区索引，并保存到输入文件旁
+
+        之后以 raw=True、use_index=True 按相同字段和时间周期拆分该文件时，
+        即使 max_rows、输出目录不同，也会直接复用索引。
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表
+            time_period: 时间周期
+
+        Returns:
+            PartitionIndex: 分区索引；None 表示没有有效字段
+        """
+        with open(file_path, 'rb') as src:
+            buffer = RecordUtils.map_file(src)
+            try:
+                if len(buffer) == 0:
+                    raise ValueError(f"文件为空: {file_path}")
+                if bytes(buffer[:2]) in (b'\xff\xfe', b'\xfe\xff'):
+                    raise ValueError(f"UTF-16 编码文件不支持构建分区索引: {file_path}")
+                index = self._index_records(file_path, buffer, split_fields, time_period)
+            finally:
+                if hasattr(buffer, 'close'):
+                    buffer.close()
+        if index is not None:
+            self._save_index(index, file_path)
+        return index
+
+    @staticmethod
+    def _save_index(index, file_path):
+        """保存分区索引；输入目录不可写时只给出提示"""
+        try:
+            path = index.save(file_path)
+            print(f"  分区索引已保存: {os.path.basename(path)}")
+        except OSError as e:
+            print(f"  ⚠️  分区索引保存失败: {e}")
+
+    def _split_raw_records(self, file_path, buffer, split_fields, time_period):
+        """
+        在内存映射的文件上执行原始行直通拆分
+
+        Returns:
+            list: [(file_name, row_count), ...]；None 表示没有有效字段
+        """
+        index = None
+        if self.use_index:
+            index = PartitionIndex.load(file_path, split_fields, time_period, self._resolve_encoding(file_path))
+        if index is not None:
+            print("  复用分区索引，跳过解析和字段分类")
+        else:
+            index = self._index_records(file_path, buffer, split_fields, time_period)
+            if index is None:
+                return None
+            if self.use_index:
+                self._save_index(index, file_path)
+
+        print(f"  总行数: {index.total_rows:,}")
+        print(f"  字段数: {index.column_count}")
+        self.stats['total_files'] += 1
+        self.stats['total_rows'] += index.total_rows
+
+        self._emit_progress(30, 100, "开始拆分...")
+        header = bytes(buffer[:index.header_end])
+        base_name = FileUtils.get_file_stem(file_path)
+        partitions = index.partitions()
+        output_files = []
+        for number, (suffix, positions) in enumerate(partitions):
+            lengths = index.ends[positions] - index.starts[positions]
+            parts = RecordUtils.plan_parts(lengths, index.header_end, self.max_rows, self.max_bytes)
+            if len(parts) == 1:
+                pieces = [(f"{base_name}{suffix}.csv", positions)]
+            else:
+                pieces = [
+                    (f"{base_name}{suffix}_part{i + 1}.csv", positions[start:stop])
+                    for i, (start, stop) in enumerate(parts)
+                ]
+            for file_name, rows in pieces:
+                self._write_raw_records(file_name, header, buffer, index.starts[rows], index.ends[rows])
+                output_files.append((file_name, len(rows)))
+            self._emit_progress(30 + 60 * (number + 1) // len(partitions), 100,
+                                f"已写出 {number + 1}/{len(partitions)} 个分区")
+
+        self.stats['output_file_list'].extend(output_files)
+        self.stats['output_files'] += len(output_files)
+        return output_files
+
+    def _split_single_file_raw(self, file_path, split_fields, time_period):
+        """
+        原始行直通拆分：只解析拆分字段，各行按原始字节原样复制到所属分区文件
+
+        数据行与原文件逐字节一致（数值、日期的写法都不变），输出保持原文件编码。
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表
+            time_period: 时间周期
+
+        Returns:
+            list: [(file_name, row_count), ...]；None 表示没有有效字段
+        """
+        self._emit_progress(10, 100, "扫描记录边界...")
+        print("  读取模式: 原始行直通（只解析拆分字段，数据行按原始字节复制）")
+        self._print_split_settings(time_period)
+        FileUtils.ensure_output_dir(self.output_dir)
+
+        with open(file_path, 'rb') as src:
+            buffer = RecordUtils.map_file(src)
+            try:
+                if len(buffer) == 0:
+                    raise ValueError(f"文件为空: {file_path}")
+                if bytes(buffer[:2]) not in (b'\xff\xfe', b'\xfe\xff'):
+                    return self._split_raw_records(file_path, buffer, split_fields, time_period)
+            finally:
+                if hasattr(buffer, 'close'):
+                    buffer.close()
+
+        # UTF-16 的换行和引号不是单字节，无法按字节扫描
+        print("  ⚠️  UTF-16 编码文件不支持原始行直通，改为解析后拆分")
+        return self._split_single_file_in_memory(file_path, split_fields, time_period)
+
+    def _split_by_rows_in_memory(self, file_path):
+        """
+        一次性读入整个文件后按行数拆分
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            list: [(file_name, row_count), ...]
+        """
+        # 读取文件
+        self._emit_progress(10, 100, "读取文件...")
+        df = FileUtils.read_csv_with_encoding(file_path, encoding=self.encoding, low_memory=False)
+        total_rows = len(df)
+        print(f"  总行数: {total_rows:,}")
+        print(f"  字段数: {len(df.columns)}")
+        self._print_size_limit()
+
+        self.stats['total_files'] += 1
+        self.stats['total_rows'] += total_rows
+
+        # 基础文件名
+        base_name = FileUtils.get_file_stem(file_path)
+
+        # 执行按行数拆分
+        self._emit_progress(30, 100, "开始拆分...")
+        print("\n  拆分策略: 按行数拆分（不进行字段分类）")
+
+        if self.parts:
+            return self._split_into_parts(df, base_name)
+        return self._split_by_size(df, base_name, suffix='')
+
+    def _split_into_parts(self, df, base_name):
+        """
+        把 DataFrame 均分为 parts 个连续文件，各文件行数最多相差 1
+
+        Args:
+            df: DataFrame
+            base_name: 基础文件名
+
+        Returns:
+            list: [(file_name, row_count), ...]
+        """
+        sizes = RecordUtils.balanced_sizes(len(df), self.parts)
+        bounds = np.concatenate(([0], np.cumsum(sizes)))
+        output_files = []
+        for i in range(len(sizes)):
+            file_name = f"{base_name}.csv" if len(sizes) == 1 else f"{base_name}_part{i + 1}.csv"
+            FileUtils.write_csv(df.iloc[bounds[i]:bounds[i + 1]], os.path.join(self.output_dir, file_name))
+            output_files.append((file_name, sizes[i]))
+
+        self.stats['output_file_list'].extend(output_files)
+        self.stats['output_files'] += len(output_files)
+        return output_files
+
+    def split_by_rows_only(self, file_path):
+        """
+        只按行数拆分CSV文件（不按字段拆分）
+
+        Args:
+            file_path: 文件路径
+        """
+        print(f"\n{'=' * 60}")
+        print(f"处理文件: {file_path}")
+        print(f"{'=' * 60}")
+        print("  拆分模式: 按行数拆分")
+
+        # 发送进度：开始处理
+        self._emit_progress(0, 100, f"开始处理: {file_path}")
+
+        try:
+            # 必须设置 max_rows、max_bytes 或 parts
+            if self.max_rows is None and self.max_bytes is None and not self.parts:
+                print("  ❌ 错误: 按行数拆分模式必须设置 max_rows、max_bytes 或 parts 参数")
+                self._emit_progress(100, 100, "处理失败：未设置 max_rows、max_bytes 或 parts")
+                return
+
+            with self._memory_budget(file_path):
+                if self.raw:
+                    output_files = self._split_by_rows_raw(file_path)
+                elif self.chunksize:
+                    output_files = self._split_by_rows_chunked(file_path)
+                else:
+                    output_files = self._split_by_rows_in_memory(file_path)
 
             # 输出结果统计
             self._emit_progress(90, 100, "完成拆分")
@@ -418,6 +1779,146 @@ class CSVSplitter:
             import traceback
             traceback.print_exc()
 
+    def _budget_settings(self, file_path, split_fields=None):
+        """
+        按内存预算为单个文件选择读取策略
+
+        从文件开头采样估算每行的内存占用和磁盘字节数，据此估算整个文件读入后的内存峰值：
+        不超过预算时一次性读入；否则流式读取，块大小和写出缓冲按预算确定；
+        拆分字段取值极多时改用外部溢写，桶数保证每个桶读入后不超过预算。
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表，None 表示只按行数拆分
+
+        Returns:
+            dict: 需要临时覆盖的属性 {'chunksize', 'spill_buckets', 'writer_buffer_bytes'}
+        """
+        sample = FileUtils.read_csv_with_encoding(
+            file_path, encoding=self._resolve_encoding(file_path), nrows=PLAN_SAMPLE_ROWS
+        )
+        sample_rows = max(len(sample), 1)
+        row_memory = max(sample.memory_usage(index=False, deep=True).sum() / sample_rows, 1) * MEMORY_PEAK_FACTOR
+        row_bytes = max(len(sample.to_csv(index=False, header=False).encode('utf-8')) / sample_rows, 1)
+        estimated_memory = row_memory * os.path.getsize(file_path) / row_bytes
+
+        if estimated_memory + MEMORY_BASE_OVERHEAD <= self.memory_limit:
+            return {'chunksize': None, 'spill_buckets': None, 'writer_buffer_bytes': WRITER_BUFFER_BYTES}
+
+        writer_buffer = min(WRITER_BUFFER_BYTES, self.memory_limit // 4)
+        available = max(self.memory_limit - writer_buffer - MEMORY_BASE_OVERHEAD, 1)
+        settings = {
+            'chunksize': max(int(available / row_memory), MEMORY_MIN_CHUNKSIZE),
+            'spill_buckets': None,
+            'writer_buffer_bytes': writer_buffer,
+        }
+        key_fields = [field for field in split_fields or [] if field in sample.columns]
+        if key_fields and len(sample.drop_duplicates(key_fields)) / sample_rows > SPILL_CARDINALITY_RATIO:
+            # 桶数同时受句柄上限约束
+            settings['spill_buckets'] = min(max(int(np.ceil(estimated_memory / available)), 2), WRITER_MAX_OPEN_FILES)
+        return settings
+
+    @contextlib.contextmanager
+    def _memory_budget(self, file_path, split_fields=None):
+        """
+        在处理单个文件期间按内存预算临时调整读取策略，结束后恢复原设置
+
+        未设置 memory_limit，或已显式指定 chunksize / spill_buckets / workers / raw 时不做调整。
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表，None 表示只按行数拆分
+        """
+        if (not self.memory_limit or self.chunksize or self.spill_buckets or self.raw
+                or (self.workers and self.workers > 1)):
+            yield
+            return
+
+        settings = self._budget_settings(file_path, split_fields)
+        budget = FileUtils.format_file_size(self.memory_limit)
+        if settings['spill_buckets']:
+            print(f"  内存预算: {budget} → 外部溢写（{settings['spill_buckets']} 个桶，每块 {settings['chunksize']:,} 行）")
+        elif settings['chunksize']:
+            print(f"  内存预算: {budget} → 流式读取（每块 {settings['chunksize']:,} 行，"
+                  f"写出缓冲 {FileUtils.format_file_size(settings['writer_buffer_bytes'])}）")
+        else:
+            print(f"  内存预算: {budget} → 一次性读入")
+
+        saved = {name: getattr(self, name) for name in settings}
+        for name, value in settings.items():
+            setattr(self, name, value)
+        try:
+            yield
+        finally:
+            for name, value in saved.items():
+                setattr(self, name, value)
+
+    def _print_size_limit(self):
+        """打印单文件行数与大小限制"""
+        if self.parts:
+            print(f"  行数拆分: ✅ 均分为 {self.parts} 个文件")
+            return
+        if self.max_rows is None:
+            print("  行数拆分: ❌ 不拆分（保持完整）")
+        else:
+            print(f"  行数拆分: ✅ 单文件最大 {self.max_rows:,} 行")
+        if self.max_bytes is not None:
+            print(f"  大小拆分: ✅ 单文件最大 {FileUtils.format_file_size(self.max_bytes)}")
+
+    def _print_split_settings(self, time_period=None):
+        """打印行数拆分与时间周期设置"""
+        self._print_size_limit()
+
+        if time_period:
+            period_desc = TIME_PERIOD_DESCRIPTIONS.get(time_period, time_period)
+            print(f"  时间周期: {period_desc} ({time_period})")
+        else:
+            print("  时间周期: 未设置（日期字段将按唯一值拆分）")
+
+    def _split_single_file_in_memory(self, file_path, split_fields, time_period):
+        """
+        一次性读入整个文件后拆分
+
+        Returns:
+            list: [(file_name, row_count), ...]；None 表示没有有效字段
+        """
+        # 读取文件
+        self._emit_progress(10, 100, "读取文件...")
+        # 拆分字段以 category 类型读入，分组在整数编码上进行
+        df = FileUtils.read_csv_with_encoding(
+            file_path, encoding=self.encoding, low_memory=False,
+            dtype={field: 'category' for field in split_fields}
+        )
+        for field in split_fields:
+            if field in df.columns:
+                df[field] = self._infer_category_values(df[field])
+        total_rows = len(df)
+        print(f"  总行数: {total_rows:,}")
+        print(f"  字段数: {len(df.columns)}")
+        self._print_split_settings(time_period)
+
+        self.stats['total_files'] += 1
+        self.stats['total_rows'] += total_rows
+
+        # 分类字段
+        self._emit_progress(20, 100, "分析字段...")
+        date_fields, non_date_fields = self._classify_fields(df, split_fields)
+
+        if not date_fields and not non_date_fields:
+            return None
+
+        # 执行拆分逻辑
+        self._emit_progress(30, 100, "开始拆分...")
+        base_name = FileUtils.get_file_stem(file_path)
+        key_fields, date_field, period = self._plan_split(date_fields, non_date_fields, time_period)
+
+        # 日期字段只转换一次，周期分组键供各策略复用
+        period_keys = None
+        if date_field is not None:
+            period_keys = self._compute_period_keys(df, date_field, period)
+
+        return self._split_by_plan(df, base_name, key_fields, period_keys)
+
     def split_single_file(self, file_path, split_fields, time_period=None):
         """
         拆分单个CSV文件
@@ -435,96 +1936,25 @@ class CSVSplitter:
         self._emit_progress(0, 100, f"开始处理: {file_path}")
 
         try:
-            # 读取文件
-            self._emit_progress(10, 100, "读取文件...")
-            df = FileUtils.read_csv_with_encoding(file_path, encoding=self.encoding, low_memory=False)
-            total_rows = len(df)
-            print(f"  总行数: {total_rows:,}")
-            print(f"  字段数: {len(df.columns)}")
-
-            # 显示行数拆分策略
-            if self.max_rows is None:
-                print("  行数拆分: ❌ 不拆分（保持完整）")
-            else:
-                print(f"  行数拆分: ✅ 单文件最大 {self.max_rows:,} 行")
-
-            self.stats['total_files'] += 1
-            self.stats['total_rows'] += total_rows
-
-            # 分类字段
-            self._emit_progress(20, 100, "分析字段...")
-            date_fields, non_date_fields = self._classify_fields(df, split_fields)
+            with self._memory_budget(file_path, split_fields):
+                if self.hash_buckets:
+                    output_files = self._split_single_file_hashed(file_path, split_fields)
+                elif self.workers and self.workers > 1:
+                    output_files = self._split_single_file_parallel(file_path, split_fields, time_period)
+                elif self.raw:
+                    output_files = self._split_single_file_raw(file_path, split_fields, time_period)
+                elif self.spill_buckets:
+                    output_files = self._split_single_file_spilled(file_path, split_fields, time_period)
+                elif self.chunksize:
+                    output_files = self._split_single_file_chunked(file_path, split_fields, time_period)
+                else:
+                    output_files = self._split_single_file_in_memory(file_path, split_fields, time_period)
 
-            if not date_fields and not non_date_fields:
+            if output_files is None:
                 print("  ❌ 错误: 没有有效的拆分字段")
                 self._emit_progress(100, 100, "处理失败：没有有效字段")
                 return
 
-            # 基础文件名
-            base_name = FileUtils.get_file_stem(file_path)
-            output_files = []
-
-            # 执行拆分逻辑
-            self._emit_progress(30, 100, "开始拆分...")
-
-            # 输出时间周期设置信息
-            if time_period:
-                period_desc = TIME_PERIOD_DESCRIPTIONS.get(time_period, time_period)
-                print(f"  时间周期: {period_desc} ({time_period})")
-            else:
-                print("  时间周期: 未设置（日期字段将按唯一值拆分）")
-
-            if len(non_date_fields) >= 2:
-                # 多个非日期字段：级联拆分
-                print(f"\n  拆分策略: 级联拆分 {len(non_date_fields)} 个字段: {non_date_fields}")
-                if date_fields and time_period:
-                    # 有时间周期设置时，添加日期字段拆分
-                    print(f"  附加时间字段: '{date_fields[0]}' ({TIME_PERIOD_DESCRIPTIONS.get(time_period, time_period)})")
-                    output_files = self._split_multi_fields_with_date(
-                        df, base_name, non_date_fields, date_fields[0], time_period
-                    )
-                elif date_fields and not time_period:
-                    # 无时间周期设置时，将日期字段当作普通字段级联拆分
-                    all_fields = non_date_fields + date_fields
-                    print(f"  附加字段: {date_fields}（按唯一值拆分）")
-                    output_files = self._split_multi_non_date_fields(
-                        df, base_name, all_fields
-                    )
-                else:
-                    output_files = self._split_multi_non_date_fields(
-                        df, base_name, non_date_fields
-                    )
-
-            elif non_date_fields and date_fields:
-                # 1个非日期字段 + 1个日期字段
-                if time_period:
-                    # 有时间周期设置：组合拆分
-                    print(f"\n  拆分策略: 按 '{non_date_fields[0]}' + '{date_fields[0]}' ({TIME_PERIOD_DESCRIPTIONS.get(time_period, time_period)})")
-                    output_files = self._split_by_non_date_and_date(
-                        df, base_name, non_date_fields[0], date_fields[0], time_period
-                    )
-                else:
-                    # 无时间周期设置：级联按唯一值拆分
-                    print(f"\n  拆分策略: 级联拆分 '{non_date_fields[0]}' + '{date_fields[0]}'（按唯一值）")
-                    output_files = self._split_multi_non_date_fields(
-                        df, base_name, [non_date_fields[0], date_fields[0]]
-                    )
-
-            elif non_date_fields:
-                # 仅按非日期字段拆分
-                print(f"\n  拆分策略: 按 '{non_date_fields[0]}'")
-                output_files = self._split_by_non_date(df, base_name, non_date_fields[0])
-
-            elif date_fields:
-                # 仅按日期字段拆分
-                if time_period:
-                    print(f"\n  拆分策略: 按 '{date_fields[0]}' ({TIME_PERIOD_DESCRIPTIONS.get(time_period, time_period)})")
-                    output_files = self._split_by_date(df, base_name, date_fields[0], time_period)
-                else:
-                    # 无时间周期设置，按日期唯一值拆分
-                    print(f"\n  拆分策略: 按 '{date_fields[0]}'（按唯一值）")
-                    output_files = self._split_by_non_date(df, base_name, date_fields[0])
-
             # 输出结果统计
             self._emit_progress(90, 100, "完成拆分")
             # 确保统计正确：使用实际生成的文件列表长度
@@ -543,6 +1973,313 @@ class CSVSplitter:
             import traceback
             traceback.print_exc()
 
+    def _split_file(self, file_path, split_fields=None, time_period=None):
+        """按拆分模式处理单个文件（split_fields 为 None 时只按行数拆分）"""
+        if split_fields is None:
+            self.split_by_rows_only(file_path)
+        else:
+            self.split_single_file(file_path, split_fields, time_period)
+
+    def _merge_stats(self, stats):
+        """把另一个拆分器的统计信息合并到当前统计"""
+        for key in ('total_files', 'total_rows', 'output_files'):
+            self.stats[key] += stats[key]
+        self.stats['output_file_list'].extend(stats['output_file_list'])
+        self.stats['errors'].extend(stats['errors'])
+
+    @staticmethod
+    def _split_file_worker(config, file_path, split_fields, time_period, progress_queue=None):
+        """
+        多文件并行拆分的工作进程：用相同配置拆分一个文件
+
+        Args:
+            config: CSVSplitter 初始化参数
+            file_path: 文件路径
+            split_fields: 拆分字段列表，None 表示只按行数拆分
+            time_period: 时间周期
+            progress_queue: 转发进度的队列，None 表示不转发
+
+        Returns:
+            tuple: (控制台输出, stats)
+        """
+        callback = None
+        if progress_queue is not None:
+            def callback(current, total, message):
+                progress_queue.put((file_path, current, total, message))
+
+        splitter = CSVSplitter(progress_callback=callback, **config)
+        output = io.StringIO()
+        # 各文件的输出整体打印，避免多个进程的日志交错
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+            splitter._split_file(file_path, split_fields, time_period)
+        return output.getvalue(), splitter.stats
+
+    def _forward_progress(self, progress_queue):
+        """把工作进程发来的单文件进度转发给进度回调"""
+        while progress_queue is not None and not progress_queue.empty():
+            file_path, current, total, message = progress_queue.get_nowait()
+            self._emit_progress(current, total, f"{os.path.basename(file_path)}: {message}")
+
+    def split_files(self, file_paths, split_fields=None, time_period=None, jobs=None, should_stop=None):
+        """
+        拆分多个文件
+
+        Args:
+            file_paths: 文件路径列表
+            split_fields: 拆分字段列表，None 表示只按行数拆分
+            time_period: 时间周期 (Y/H/Q/M/HM/D)
+            jobs: 同时处理的文件数（进程数）
+                - None 或 1: 逐个处理
+                - 整数: 多进程并行处理，大文件优先调度，各进程的统计合并到 self.stats
+            should_stop: 无参可调用对象，返回 True 时不再开始处理剩余文件（正在处理的文件会完成），
+                         None 表示处理全部文件
+        """
+        file_paths = [str(path) for path in file_paths]
+        if not jobs or jobs <= 1 or len(file_paths) <= 1:
+            for file_path in file_paths:
+                if should_stop is not None and should_stop():
+                    break
+                self._split_file(file_path, split_fields, time_period)
+            return
+
+        config = {
+            'max_rows': self.max_rows,
+            'output_dir': self.output_dir,
+            'encoding': self.encoding,
+            'chunksize': self.chunksize,
+            'raw': self.raw,
+            'spill_buckets': self.spill_buckets,
+            'scratch_dir': self.scratch_dir,
+            'use_index': self.use_index,
+            # 多个文件同时处理时平分内存预算
+            'memory_limit': self.memory_limit // jobs if self.memory_limit else None,
+            'hash_buckets': self.hash_buckets,
+            'max_bytes': self.max_bytes,
+            'parts': self.parts,
+        }
+        # 大文件优先调度，缩短整体耗时
+        schedule = sorted(file_paths, key=os.path.getsize, reverse=True)
+        FileUtils.ensure_output_dir(self.output_dir)
+        print(f"并行处理: {jobs} 个进程（大文件优先）")
+
+        manager = multiprocessing.Manager() if self.progress_callback else None
+        progress_queue = manager.Queue() if manager else None
+        results = {}
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = {
+                    executor.submit(self._split_file_worker, config, file_path,
+                                    split_fields, time_period, progress_queue): file_path
+                    for file_path in schedule
+                }
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                    self._forward_progress(progress_queue)
+                    for future in done:
+                        if future.cancelled():
+                            continue
+                        file_path = futures[future]
+                        try:
+                            output, stats = future.result()
+                        except Exception as e:
+                            output = ''
+                            stats = {'total_files': 0, 'total_rows': 0, 'output_files': 0, 'output_file_list': [],
+                                     'errors': [f"处理文件 {file_path} 时出错: {str(e)}"]}
+                        print(output, end='')
+                        results[file_path] = stats
+                        self._emit_progress(len(results), len(file_paths),
+                                            f"已完成 {len(results)}/{len(file_paths)}: {os.path.basename(file_path)}")
+                    if should_stop is not None and should_stop():
+                        # 只能取消尚未开始的文件
+                        for future in pending:
+                            future.cancel()
+        finally:
+            if manager is not None:
+                manager.shutdown()
+
+        # 按输入顺序合并统计（已取消的文件没有结果）
+        for file_path in file_paths:
+            if file_path in results:
+                self._merge_stats(results[file_path])
+
+    def plan(self, file_path, split_fields=None, time_period=None):
+        """
+        生成拆分计划（不写出任何文件）
+
+        只流式读取拆分字段（每块 PLAN_CHUNKSIZE 行，字段分类基于第一个数据块），
+        拆分字段与流式拆分一样还原为整个文件的类型，按与实际拆分相同的规则统计各分区行数，并估算输出文件数、输出字节数、内存占用和磁盘空间是否足够。
+        设置 hash_buckets 时按拆分字段原始文本的哈希统计各桶行数（与哈希分桶拆分一致，不分类字段）；
+        只按行数拆分且设置 parts 时输出文件数为均分的份数。
+        chunksize 只用于估算流式读取的内存占用。
+
+        Args:
+            file_path: 文件路径
+            split_fields: 拆分字段列表，None 表示只按行数拆分
+            time_period: 时间周期
+
+        Returns:
+            dict: 拆分计划；None 表示没有有效字段
+                - partitions: [{'suffix', 'rows', 'bytes', 'files'}, ...]，按首次出现顺序（哈希分桶时按桶号）
+                - total_rows / output_files / output_bytes: 总行数、输出文件数、估算的输出字节数
+                - memory: 各读取模式估算的内存峰值字节数 {'in_memory', 'chunked', 'raw'}
+                - disk_required / disk_free / disk_ok: 所需与可用磁盘空间、是否足够
+                - warnings: 提示信息列表
+        """
+        print(f"\n📐 拆分计划: {os.path.basename(file_path)}")
+        self._print_split_settings(time_period)
+        encoding = self._resolve_encoding(file_path)
+        file_size = os.path.getsize(file_path)
+
+        # 采样整行，估算每行在内存中的字节数
+        sample = FileUtils.read_csv_with_encoding(file_path, encoding=encoding, nrows=PLAN_SAMPLE_ROWS)
+        columns = list(sample.columns)
+        header_bytes = len(sample.head(0).to_csv(index=False).encode('utf-8-sig'))
+        row_memory = sample.memory_usage(index=False, deep=True).sum() / max(len(sample), 1)
+
+        split_fields = split_fields or []
+        hashed = bool(self.hash_buckets and split_fields)
+        usecols = [field for field in split_fields if field in columns] or columns[:1]
+        if hashed and not set(usecols) & set(split_fields):
+            return None
+        column_types = {}
+        if split_fields and not hashed:
+            column_types = self._column_types(file_path, split_fields, columns=usecols)
+        reader = FileUtils.read_csv_with_encoding(
+            file_path, encoding=encoding, usecols=usecols, dtype=str, chunksize=PLAN_CHUNKSIZE
+        )
+        counts = {}
+        plan = ([], None, None)
+        total_rows = 0
+        key_memory = 0
+        with reader:
+            for n, chunk in enumerate(reader):
+                self._restore_split_values(chunk, column_types, split_fields)
+                if hashed:
+                    # 与哈希分桶拆分一致：按原始文本哈希，拆分字段为空的行同样参与分桶
+                    total_rows += len(chunk)
+                    key_memory += chunk.memory_usage(index=False, deep=True).sum()
+                    bucket_ids, rows = np.unique(self._hash_buckets(chunk, usecols, self.hash_buckets),
+                                                 return_counts=True)
+                    for bucket_id, bucket_rows in zip(bucket_ids.tolist(), rows.tolist()):
+                        counts[(bucket_id,)] = counts.get((bucket_id,), 0) + bucket_rows
+                    continue
+                if n == 0 and split_fields:
+                    date_fields, non_date_fields = self._classify_fields(chunk, split_fields)
+                    if not date_fields and not non_date_fields:
+                        return None
+                    plan = self._plan_split(date_fields, non_date_fields, time_period)
+                total_rows += len(chunk)
+                key_memory += chunk.memory_usage(index=False, deep=True).sum()
+
+                key_fields, date_field, period = plan
+                keys = [chunk[field] for field in key_fields]
+                if date_field is not None:
+                    keys.append(self._compute_period_keys(chunk, date_field, period).fillna('NULL'))
+                if not keys:
+                    counts[()] = counts.get((), 0) + len(chunk)
+                    continue
+                for key_values, rows in chunk.groupby(keys, sort=False, dropna=True).size().items():
+                    if not isinstance(key_values, tuple):
+                        key_values = (key_values,)
+                    counts[key_values] = counts.get(key_values, 0) + int(rows)
+
+        # 与实际拆分相同的文件名规则
+        date_field = plan[1]
+        valid_prefixes = set()
+        if hashed:
+            counts = dict(sorted(counts.items()))
+            suffixes = [self._bucket_suffix(bucket_id, self.hash_buckets) for bucket_id, in counts]
+        else:
+            suffixes = [
+                self._partition_suffix(key_values, date_field is not None and key_values[-1] != 'NULL',
+                                       valid_prefixes)
+                for key_values in counts
+            ]
+        row_bytes = (file_size - header_bytes) / max(total_rows, 1)
+        partitions = []
+        for suffix, rows in zip(suffixes, counts.values()):
+            data_bytes = int(rows * row_bytes)
+            if self.parts and not split_fields:
+                # 只按行数均分时忽略 max_rows 和 max_bytes
+                files = len(RecordUtils.balanced_sizes(rows, self.parts))
+            else:
+                files = 1 if self.max_rows is None else max(-(-rows // self.max_rows), 1)
+                if self.max_bytes is not None:
+                    files = max(files, -(-data_bytes // max(self.max_bytes - header_bytes, 1)))
+            partitions.append({
+                'suffix': self._final_suffix(suffix, plan, valid_prefixes),
+                'rows': rows,
+                'bytes': data_bytes + files * header_bytes,
+                'files': files,
+            })
+
+        output_files = sum(partition['files'] for partition in partitions)
+        output_bytes = sum(partition['bytes'] for partition in partitions)
+        memory = {
+            'in_memory': int(row_memory * total_rows),
+            'chunked': int(row_memory * (self.chunksize or SPILL_CHUNKSIZE)) + WRITER_BUFFER_BYTES,
+            # 原始行直通：拆分字段 + 每行的字节区间和分区编号
+            'raw': int(key_memory) + total_rows * 20,
+        }
+        # 外部溢写需要额外一份临时桶文件
+        disk_required = output_bytes + (file_size if self.spill_buckets else 0)
+        disk_free = FileUtils.get_free_space(self.scratch_dir or self.output_dir)
+        warnings = []
+        if disk_required > disk_free:
+            warnings.append(
+                f"磁盘空间不足: 需要约 {FileUtils.format_file_size(disk_required)}，"
+                f"可用 {FileUtils.format_file_size(disk_free)}"
+            )
+        if output_files > PLAN_MAX_OUTPUT_FILES:
+            warnings.append(
+                f"将生成 {output_files:,} 个文件，超过 {PLAN_MAX_OUTPUT_FILES:,} 个，"
+                f"请检查拆分字段是否取值过多"
+            )
+
+        result = {
+            'file_path': file_path,
+            'partitions': partitions,
+            'total_rows': total_rows,
+            'output_files': output_files,
+            'output_bytes': output_bytes,
+            'memory': memory,
+            'disk_required': disk_required,
+            'disk_free': disk_free,
+            'disk_ok': disk_required <= disk_free,
+            'warnings': warnings,
+        }
+        self._print_plan(result)
+        return result
+
+    @staticmethod
+    def _print_plan(result):
+        """打印拆分计划"""
+        partitions = result['partitions']
+        print(f"  总行数: {result['total_rows']:,}")
+        print(f"  分区数: {len(partitions):,}")
+        print(f"  输出文件数: {result['output_files']:,}")
+        print(f"  估算输出大小: {FileUtils.format_file_size(result['output_bytes'])}")
+
+        largest = sorted(partitions, key=lambda partition: partition['rows'], reverse=True)
+        if largest:
+            print(f"\n  {'分区':<30s} {'行数':>12s} {'估算大小':>12s} {'文件数':>6s}")
+            for partition in largest[:PLAN_REPORT_LIMIT]:
+                print(f"  {partition['suffix'] or '(全部)':<30s} {partition['rows']:>12,} "
+                      f"{FileUtils.format_file_size(partition['bytes']):>12s} {partition['files']:>6,}")
+            if len(largest) > PLAN_REPORT_LIMIT:
+                print(f"  ... 其余 {len(largest) - PLAN_REPORT_LIMIT:,} 个分区未列出")
+
+        memory = result['memory']
+        print("\n  估算内存峰值:")
+        print(f"    一次性读入: {FileUtils.format_file_size(memory['in_memory'])}")
+        print(f"    流式读取:   {FileUtils.format_file_size(memory['chunked'])}")
+        print(f"    原始行直通: {FileUtils.format_file_size(memory['raw'])}")
+        print(f"  磁盘空间: 需要约 {FileUtils.format_file_size(result['disk_required'])}，"
+              f"可用 {FileUtils.format_file_size(result['disk_free'])} {'✅' if result['disk_ok'] else '❌'}")
+        for warning in result['warnings']:
+            print(f"  ⚠️  {warning}")
+
     def print_summary(self):
         """打印处理摘要"""
         print(f"\n{'=' * 60}")
@@ -0,0 +1,157 @@
+"""
+分区索引
+记录每条数据记录的字节区间和所属分区，保存为输入文件旁的旁路文件
+
+按字段拆分时，解析拆分字段、识别日期字段、计算分组键只与输入文件和拆分条件有关，
+与 max_rows、输出目录等输出设置无关。把结果保存下来，之后改变输出设置再次拆分时可以直接复用。
+"""
+
+import json
+import os
+import numpy as np
+from ..utils.constants import PARTITION_INDEX_SUFFIX, PARTITION_INDEX_VERSION
+
+
+class PartitionIndex:
+    """分区索引"""
+
+    def __init__(self, split_fields, time_period, encoding, fingerprint, header_end, starts, ends, codes, suffixes,
+                 column_count):
+        """
+        初始化分区索引
+
+        Args:
+            split_fields: 拆分字段列表
+            time_period: 时间周期（None 表示未指定）
+            encoding: 解析拆分字段时使用的编码（'auto' 已解析为实际编码）
+            fingerprint: 输入文件指纹 [文件大小, 修改时间(ns)]
+            header_end: 表头结束的字节位置
+            starts: 各数据记录起始位置数组（int64）
+            ends: 各数据记录结束位置数组（int64）
+            codes: 各数据记录所属分区的编号数组（int32，-1 表示拆分字段为空、不输出）
+            suffixes: 各分区的文件名后缀列表，按编号排列（即按首次出现顺序）
+            column_count: 文件字段数
+        """
+        self.split_fields = list(split_fields)
+        self.time_period = time_period
+        self.encoding = encoding
+        self.fingerprint = list(fingerprint)
+        self.header_end = int(header_end)
+        self.starts = starts
+        self.ends = ends
+        self.codes = codes
+        self.suffixes = list(suffixes)
+        self.column_count = int(column_count)
+
+    @property
+    def total_rows(self):
+        """数据记录数"""
+        return len(self.codes)
+
+    @staticmethod
+    def sidecar_path(file_path):
+        """索引旁路文件路径"""
+        return f"{file_path}{PARTITION_INDEX_SUFFIX}"
+
+    @staticmethod
+    def file_fingerprint(file_path):
+        """
+        输入文件指纹，文件被修改后索引失效
+
+        Returns:
+            list: [文件大小, 修改时间(ns)]
+        """
+        stat = os.stat(file_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def partitions(self):
+        """
+        各分区的行位置
+
+        Returns:
+            list: [(suffix, positions), ...]，按首次出现顺序，positions 为升序的行号数组
+        """
+        order = np.argsort(self.codes, kind='stable')
+        counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.suffixes))
+        # 跳过编号为 -1 的行
+        offset = len(self.codes) - int(counts.sum())
+        partitions = []
+        for suffix, count in zip(self.suffixes, counts):
+            partitions.append((suffix, order[offset:offset + count]))
+            offset += count
+        return partitions
+
+    def save(self, file_path):
+        """
+        保存到输入文件旁的旁路文件（先写临时文件再替换）
+
+        Args:
+            file_path: 输入文件路径
+
+        Returns:
+            str: 旁路文件路径
+        """
+        path = self.sidecar_path(file_path)
+        meta = {
+            'version': PARTITION_INDEX_VERSION,
+            'split_fields': self.split_fields,
+            'time_period': self.time_period,
+            'encoding': self.encoding,
+            'fingerprint': self.fingerprint,
+            'header_end': self.header_end,
+            'column_count': self.column_count,
+        }
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta, ensure_ascii=False)),
+                starts=self.starts,
+                ends=self.ends,
+                codes=self.codes,
+                suffixes=np.array(self.suffixes, dtype=str),
+            )
+        os.replace(temp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, file_path, split_fields, time_period, encoding):
+        """
+        读取与输入文件和拆分条件匹配的索引
+
+        Args:
+            file_path: 输入文件路径
+            split_fields: 拆分字段列表
+            time_period: 时间周期
+            encoding: 本次解析使用的编码（编码不同时分区取值可能不同）
+
+        Returns:
+            PartitionIndex: 匹配的索引；旁路文件不存在、已过期或条件（含编码）不同时返回 None
+        """
+        path = cls.sidecar_path(file_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if (meta.get('version') != PARTITION_INDEX_VERSION
+                        or meta['split_fields'] != list(split_fields)
+                        or meta['time_period'] != time_period
+                        or meta['encoding'] != encoding
+                        or meta['fingerprint'] != cls.file_fingerprint(file_path)):
+                    return None
+                return cls(
+                    split_fields=meta['split_fields'],
+                    time_period=meta['time_period'],
+                    encoding=meta['encoding'],
+                    fingerprint=meta['fingerprint'],
+                    header_end=meta['header_end'],
+                    starts=data['starts'],
+                    ends=data['ends'],
+                    codes=data['codes'],
+                    suffixes=data['suffixes'].tolist(),
+                    column_count=meta['column_count'],
+                )
+        except (OSError, ValueError, KeyError):
+            # 损坏或格式不兼容的索引视为不存在
+            return None
@@ -0,0 +1,331 @@
+"""
+分区写入器
+流式拆分时按分区追加写入输出文件，并处理 max_rows / max_bytes 的 _partN 滚动
+
+各分区的数据先序列化到内存缓冲区，积累到一定大小后一次性写出；
+同时打开的文件句柄数有上限，超出时关闭最久未使用的句柄，之后需要时再重新打开续写。
+"""
+
+import os
+from collections import OrderedDict
+import numpy as np
+from ..utils.file_utils import FileUtils
+from ..utils.record_utils import RecordUtils
+from ..utils.constants import WRITER_MAX_OPEN_FILES, WRITER_BUFFER_BYTES, WRITER_FLUSH_BYTES
+
+
+class PartitionWriter:
+    """分区写入器"""
+
+    def __init__(self, output_dir, base_name, max_rows=None, encoding='utf-8-sig',
+                 max_open_files=WRITER_MAX_OPEN_FILES, buffer_bytes=WRITER_BUFFER_BYTES,
+                 flush_bytes=WRITER_FLUSH_BYTES, max_bytes=None):
+        """
+        初始化写入器
+
+        Args:
+            output_dir: 输出目录
+            base_name: 基础文件名
+            max_rows: 单文件最大行数，None 表示不按行数滚动
+            encoding: 输出文件编码
+            max_open_files: 同时打开的文件句柄上限
+            buffer_bytes: 所有分区缓冲区的总字节预算，超出时优先写出最大的缓冲区
+            flush_bytes: 单个分区缓冲区达到该字节数时写出
+            max_bytes: 单文件最大字节数（含表头），None 表示不按大小滚动
+        """
+        self.output_dir = output_dir
+        self.base_name = base_name
+        self.max_rows = max_rows
+        self.encoding = encoding
+        self.max_open_files = max_open_files
+        self.buffer_bytes = buffer_bytes
+        self.flush_bytes = flush_bytes
+        self.max_bytes = max_bytes
+        # 数据行不能带 BOM，BOM 只随表头写入文件开头
+        self._data_encoding = 'utf-8' if encoding.lower().replace('_', '-') == 'utf-8-sig' else encoding
+        # suffix -> {'part': 当前分片序号, 'rows': 当前分片行数, 'files': [[file_name, rows], ...],
+        #            'bytes': 当前分片字节数, 'header': 表头字节,
+        #            'buffer': 待写出的字节块列表, 'buffered': 待写出字节数}
+        self._partitions = {}
+        # file_name -> 打开的文件对象，按最近使用排序
+        self._handles = OrderedDict()
+        # 本次写入创建过的文件名：只有这些文件被关闭后才续写，其余同名旧文件直接覆盖
+        self._created = set()
+        self._buffered = 0
+        FileUtils.ensure_output_dir(output_dir)
+
+    def _file_name(self, suffix, part):
+        """生成分片文件名（part 为 0 表示未滚动的单文件）"""
+        if part == 0:
+            return f"{self.base_name}{suffix}.csv"
+        return f"{self.base_name}{suffix}_part{part}.csv"
+
+    def _path(self, file_name):
+        return os.path.join(self.output_dir, file_name)
+
+    def _handle(self, file_name):
+        """
+        获取文件句柄（LRU）：已打开则复用，否则打开并在超出上限时关闭最久未使用的句柄
+
+        不用追加模式打开：O_APPEND 的文件不能作为 copy_file_range 的目标，
+        重新打开本次创建过的文件时定位到末尾续写；输出目录中遗留的同名文件会被覆盖。
+        """
+        handle = self._handles.get(file_name)
+        if handle is not None:
+            self._handles.move_to_end(file_name)
+            return handle
+
+        path = self._path(file_name)
+        if file_name in self._created:
+            handle = open(path, 'r+b')
+            handle.seek(0, os.SEEK_END)
+        else:
+            handle = open(path, 'wb')
+            self._created.add(file_name)
+        self._handles[file_name] = handle
+        while len(self._handles) > self.max_open_files:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.close()
+        return handle
+
+    def _close_handle(self, file_name):
+        """关闭文件句柄（如果已打开）"""
+        handle = self._handles.pop(file_name, None)
+        if handle is not None:
+            handle.close()
+
+    def _state(self, suffix):
+        """获取分区状态，首次写入时创建"""
+        state = self._partitions.get(suffix)
+        if state is None:
+            state = {'part': 0, 'rows': 0, 'bytes': 0, 'files': [[self._file_name(suffix, 0), 0]],
+                     'header': None, 'buffer': [], 'buffered': 0}
+            self._partitions[suffix] = state
+        return state
+
+    def _flush_state(self, state):
+        """把分区缓冲区写出到当前分片文件"""
+        if not state['buffer']:
+            return
+        handle = self._handle(state['files'][-1][0])
+        handle.write(b''.join(state['buffer']))
+        self._buffered -= state['buffered']
+        state['buffer'] = []
+        state['buffered'] = 0
+
+    def _buffer(self, state, data):
+        """把字节追加到分区缓冲区，按单分区阈值和总预算写出"""
+        state['buffer'].append(data)
+        state['buffered'] += len(data)
+        self._buffered += len(data)
+        if state['buffered'] >= self.flush_bytes:
+            self._flush_state(state)
+        if self._buffered > self.buffer_bytes:
+            # 超出总预算：从最大的缓冲区开始写出，直到降到预算的一半
+            for other in sorted(self._partitions.values(), key=lambda s: s['buffered'], reverse=True):
+                if self._buffered <= self.buffer_bytes // 2:
+                    break
+                self._flush_state(other)
+
+    def _roll(self, state, suffix):
+        """滚动到下一个分片；首次滚动时把单文件重命名为 _part1"""
+        self._flush_state(state)
+        self._close_handle(state['files'][-1][0])
+        if state['part'] == 0:
+            old_name = self._file_name(suffix, 0)
+            new_name = self._file_name(suffix, 1)
+            os.replace(self._path(old_name), self._path(new_name))
+            self._created.discard(old_name)
+            self._created.add(new_name)
+            state['files'][0][0] = new_name
+            state['part'] = 1
+        state['part'] += 1
+        state['rows'] = 0
+        state['bytes'] = 0
+        state['files'].append([self._file_name(suffix, state['part']), 0])
+
+    def _room(self, state, suffix, pending):
+        """必要时滚动分片，返回当前分片还能写入的行数"""
+        if self.max_rows is None:
+            return pending
+        if state['rows'] >= self.max_rows:
+            self._roll(state, suffix)
+        return min(pending, self.max_rows - state['rows'])
+
+    def _start_file(self, state):
+        """当前分片文件还没有数据时，先写入表头"""
+        if state['files'][-1][1] == 0 and not state['buffer']:
+            self._buffer(state, state['header'])
+            state['bytes'] = len(state['header'])
+
+    def _pieces(self, state, suffix, ends):
+        """
+        按 max_rows 和 max_bytes 把一批已序列化的记录分配到分片文件，必要时滚动分片
+
+        每个分片至少写入一条记录，单条记录超过 max_bytes 时独占一个分片。
+        产出前已写入表头；调用方写出该字节区间后，由这里更新行数和字节数。
+
+        Args:
+            state: 分区状态
+            suffix: 分区文件名后缀
+            ends: 各记录在本批字节中的结束位置
+
+        Yields:
+            tuple: (start, end) 本批字节中写入当前分片的区间
+        """
+        offset = done = 0
+        while done < len(ends):
+            room = self._room(state, suffix, len(ends) - done)
+            if self.max_bytes is not None:
+                used = state['bytes'] if state['files'][-1][1] else len(state['header'])
+                fit = int(np.searchsorted(ends[done:done + room], offset + self.max_bytes - used, side='right'))
+                if fit == 0 and state['files'][-1][1]:
+                    self._roll(state, suffix)
+                    continue
+                room = max(fit, 1)
+            end = int(ends[done + room - 1])
+            self._start_file(state)
+            yield offset, end
+            state['files'][-1][1] += room
+            state['rows'] += room
+            state['bytes'] += end - offset
+            offset = end
+            done += room
+
+    def write(self, suffix, df):
+        """
+        写入一个分区的一批数据
+
+        Args:
+            suffix: 分区文件名后缀（如 '_广东_2024-01'）
+            df: 该分区本批次的数据
+        """
+        if len(df) == 0:
+            return
+
+        state = self._state(suffix)
+        if state['header'] is None:
+            state['header'] = df.head(0).to_csv(index=False).encode(self.encoding)
+        if self.max_bytes is not None:
+            # 整批只序列化一次，按记录边界切分字节
+            data = df.to_csv(index=False, header=False).encode(self._data_encoding)
+            ends, _ = RecordUtils.find_record_ends(data, 0, len(data))
+            for start, end in self._pieces(state, suffix, ends):
+                self._buffer(state, data[start:end])
+            return
+
+        start = 0
+        while start < len(df):
+            room = self._room(state, suffix, len(df) - start)
+            piece = df.iloc[start:start + room]
+            self._start_file(state)
+            self._buffer(state, piece.to_csv(index=False, header=False).encode(self._data_encoding))
+            state['files'][-1][1] += len(piece)
+            state['rows'] += len(piece)
+            start += len(piece)
+
+    def append_file(self, suffix, src_path, rows, header):
+        """
+        把一个已写好的无表头 CSV 片段按字节追加到分区（用于合并并行拆分的中间结果）
+
+        Args:
+            suffix: 分区文件名后缀
+            src_path: 片段文件路径（无表头，编码与输出文件一致但不含 BOM）
+            rows: 片段中的记录数
+            header: 表头行文本（含换行）
+        """
+        if rows == 0:
+            return
+
+        state = self._state(suffix)
+        if state['header'] is None:
+            state['header'] = header.encode(self.encoding)
+        if self.max_bytes is not None:
+            with open(src_path, 'rb') as src:
+                buffer = RecordUtils.map_file(src)
+                ends = RecordUtils.record_ends(buffer)
+                if hasattr(buffer, 'close'):
+                    buffer.close()
+                for start, end in self._pieces(state, suffix, ends):
+                    self._copy_range(state, src, start, end)
+            return
+
+        with open(src_path, 'rb') as src:
+            size = os.fstat(src.fileno()).st_size
+            ends = None
+            offset = done = 0
+            while done < rows:
+                room = self._room(state, suffix, rows - done)
+                if done + room == rows:
+                    end = size
+                else:
+                    # 需要在片段中间滚动分片时才扫描记录边界
+                    if ends is None:
+                        buffer = RecordUtils.map_file(src)
+                        ends = np.concatenate(list(RecordUtils.iter_record_ends(buffer)))
+                        buffer.close()
+                    end = int(ends[done + room - 1])
+
+                self._start_file(state)
+                self._copy_range(state, src, offset, end)
+                state['files'][-1][1] += room
+                state['rows'] += room
+                offset = end
+                done += room
+
+    def _copy_range(self, state, src, start, end):
+        """把源文件的字节区间复制到分区当前分片文件末尾"""
+        self._flush_state(state)
+        dst = self._handle(state['files'][-1][0])
+        dst.flush()
+        FileUtils.copy_byte_range(src.fileno(), dst.fileno(), start, end - start)
+        # copy_byte_range 直接写文件描述符，同步文件对象的位置
+        dst.seek(0, os.SEEK_END)
+
+    def relabel(self, suffix, new_suffix):
+        """
+        修改分区后缀并重命名已写出的文件
+
+        Args:
+            suffix: 原后缀
+            new_suffix: 新后缀
+        """
+        state = self._partitions[suffix]
+        self._flush_state(state)
+        for part, entry in enumerate(state['files'], start=0 if state['part'] == 0 else 1):
+            self._close_handle(entry[0])
+            new_name = self._file_name(new_suffix, part)
+            os.replace(self._path(entry[0]), self._path(new_name))
+            self._created.discard(entry[0])
+            self._created.add(new_name)
+            entry[0] = new_name
+        # 保持分区原有顺序
+        self._partitions = {
+            (new_suffix if key == suffix else key): value
+            for key, value in self._partitions.items()
+        }
+
+    def suffixes(self):
+        """已写入的分区后缀（按首次出现顺序）"""
+        return list(self._partitions)
+
+    def flush(self):
+        """写出所有分区的缓冲区"""
+        for state in self._partitions.values():
+            self._flush_state(state)
+
+    def close(self):
+        """
+        结束写入：写出所有缓冲区并关闭全部文件句柄
+
+        Returns:
+            list: [(file_name, row_count), ...]，按分区首次出现顺序
+        """
+        self.flush()
+        for file_name in list(self._handles):
+            self._close_handle(file_name)
+        return [
+            (file_name, rows)
+            for state in self._partitions.values()
+            for file_name, rows in state['files']
+        ]
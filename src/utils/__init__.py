@@ -4,5 +4,6 @@
 
 from .date_utils import DateUtils
 from .file_utils import FileUtils
+from .record_utils import RecordUtils
 
-__all__ = ['DateUtils', 'FileUtils']
+__all__ = ['DateUtils', 'FileUtils', 'RecordUtils']
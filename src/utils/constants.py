@@ -51,6 +51,40 @@ DATE_FORMAT_STRINGS = [
     '%Y/%m/%d %H:%M:%S',  # 日期时间（yyyy/MM/dd HH:mm:ss）
 ]
 
+# 日期格式名称对应的解析格式字符串（与 DATE_FORMATS 一一对应）
+DATE_FORMAT_PARSE_STRINGS = {
+    'yyyyMM': '%Y%m',
+    'yyyy-MM': '%Y-%m',
+    'yyyy/MM/dd HH:mm:ss': '%Y/%m/%d %H:%M:%S',
+    'yyyy-MM-dd HH:mm:ss': '%Y-%m-%d %H:%M:%S',
+    'yyyyMMdd HH:mm:ss': '%Y%m%d %H:%M:%S',
+    'yyyy/MM/dd HH:mm': '%Y/%m/%d %H:%M',
+    'yyyy-MM-dd HH:mm': '%Y-%m-%d %H:%M',
+    'yyyy/M/d HH:mm:ss': '%Y/%m/%d %H:%M:%S',
+    'yyyy-M-d HH:mm:ss': '%Y-%m-%d %H:%M:%S',
+    'yyyy/M/d HH:mm': '%Y/%m/%d %H:%M',
+    'yyyy-M-d HH:mm': '%Y-%m-%d %H:%M',
+    'yyyy/MM/dd': '%Y/%m/%d',
+    'yyyy-MM-dd': '%Y-%m-%d',
+    'yyyyMMdd': '%Y%m%d',
+    'yyyy/M/d': '%Y/%m/%d',
+    'yyyy-M-d': '%Y-%m-%d',
+}
+
+# 补零的定宽日期格式：年、月、日在字符串中的起始位置（无日的格式按每月1日处理）
+FIXED_WIDTH_DATE_FORMATS = {
+    'yyyyMM': (0, 4, None),
+    'yyyy-MM': (0, 5, None),
+    'yyyyMMdd': (0, 4, 6),
+    'yyyyMMdd HH:mm:ss': (0, 4, 6),
+    'yyyy-MM-dd': (0, 5, 8),
+    'yyyy-MM-dd HH:mm': (0, 5, 8),
+    'yyyy-MM-dd HH:mm:ss': (0, 5, 8),
+    'yyyy/MM/dd': (0, 5, 8),
+    'yyyy/MM/dd HH:mm': (0, 5, 8),
+    'yyyy/MM/dd HH:mm:ss': (0, 5, 8),
+}
+
 # 支持的时间周期类型
 TIME_PERIODS = {
     'Y': '年',
@@ -88,3 +122,92 @@ UNSAFE_FILENAME_CHARS = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
 
 # 日期字段检测阈值
 DATE_DETECTION_THRESHOLD = 0.8
+
+# 日期字段检测的最大采样行数（在整列上等距分层采样）
+DATE_DETECTION_SAMPLE_SIZE = 10000
+
+# 日期字段检测的分批大小（每批检测后判断是否已可提前得出结论）
+DATE_DETECTION_BATCH_SIZE = 1000
+
+# 按字节扫描记录边界时每块的字节数
+RECORD_SCAN_BLOCK_SIZE = 64 * 1024 * 1024
+
+# 流式分区写入：同时打开的文件句柄上限
+WRITER_MAX_OPEN_FILES = 256
+
+# 流式分区写入：所有分区缓冲区的总字节预算
+WRITER_BUFFER_BYTES = 64 * 1024 * 1024
+
+# 流式分区写入：单个分区缓冲区达到该字节数时写出
+WRITER_FLUSH_BYTES = 1024 * 1024
+
+# 外部溢写分区：未设置 chunksize 时第一阶段每块读取的行数
+SPILL_CHUNKSIZE = 200000
+
+# 外部溢写分区：暂存时间周期分组键的列名
+SPILL_PERIOD_COLUMN = '__period_key__'
+
+# 原始行直通写出时每批拼接的最大字节数
+RAW_GATHER_BYTES = 8 * 1024 * 1024
+
+# 分区索引旁路文件的后缀（保存在输入文件旁）
+PARTITION_INDEX_SUFFIX = '.partidx.npz'
+
+# 分区索引格式版本，格式变化时递增以使旧索引失效
+PARTITION_INDEX_VERSION = 3
+
+# 拆分计划：流式读取拆分字段时每块的行数（未设置 chunksize 时）
+PLAN_CHUNKSIZE = 500000
+
+# 拆分计划：估算内存占用时采样的行数
+PLAN_SAMPLE_ROWS = 10000
+
+# 拆分计划：输出文件数超过该值时提示文件数过多
+PLAN_MAX_OUTPUT_FILES = 1000
+
+# 拆分计划：报告中列出的最大分区数
+PLAN_REPORT_LIMIT = 20
+
+# 内存预算：峰值内存相对于 DataFrame 自身大小的倍数（解析缓冲、分组副本、序列化字符串）
+MEMORY_PEAK_FACTOR = 4
+
+# 内存预算：与数据量无关的固定开销（解析器缓冲、文件句柄、采样等）
+MEMORY_BASE_OVERHEAD = 32 * 1024 * 1024
+
+# 内存预算：流式读取时每块的最小行数
+MEMORY_MIN_CHUNKSIZE = 1000
+
+# 内存预算：采样中拆分字段不同取值的占比超过该值时改用外部溢写
+SPILL_CARDINALITY_RATIO = 0.5
+
+# 文件大小单位（用于解析 "512MB"、"2GB" 等写法）
+SIZE_UNITS = {
+    'B': 1,
+    'K': 1024, 'KB': 1024,
+    'M': 1024 ** 2, 'MB': 1024 ** 2,
+    'G': 1024 ** 3, 'GB': 1024 ** 3,
+    'T': 1024 ** 4, 'TB': 1024 ** 4,
+}
+
+# 行数统计：无法按字节扫描（UTF-16）时解码计数的块大小（行数）
+ROW_COUNT_CHUNKSIZE = 500000
+
+# 列类型推断：流式读取整个文件时每块的行数
+COLUMN_TYPE_CHUNKSIZE = 200000
+
+# 流式读取时按整个文件的列类型固定的 dtype（整数和布尔列各块推断结果一致，无需固定）
+STREAM_DTYPES = {
+    'float': 'float64',
+    'boolean': 'boolean',
+    'object': str,
+}
+
+# 编码检测：字节顺序标记及对应编码（较长的 BOM 在前）
+ENCODING_BOMS = [
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+]
+
+# 编码校验：流式解码时每次读取的字节数
+DECODE_CHECK_BLOCK_SIZE = 8 * 1024 * 1024
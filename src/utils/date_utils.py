@@ -4,14 +4,31 @@
 """
 
 import re
+import numpy as np
 import pandas as pd
 from ..utils.constants import (
     DATE_FORMATS,
     DATE_FORMAT_STRINGS,
+    DATE_FORMAT_PARSE_STRINGS,
     TIME_PERIODS,
     DATE_DETECTION_THRESHOLD,
+    DATE_DETECTION_SAMPLE_SIZE,
+    DATE_DETECTION_BATCH_SIZE,
+    FIXED_WIDTH_DATE_FORMATS,
 )
 
+# 预编译的日期格式正则
+COMPILED_DATE_FORMATS = {name: re.compile(pattern) for name, pattern in DATE_FORMATS.items()}
+
+# 任一日期格式的合并正则（用于向量化检测）
+ANY_DATE_PATTERN = re.compile('|'.join(f'(?:{pattern})' for pattern in DATE_FORMATS.values()))
+
+# 平年每月天数
+DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+# 所有日期格式共同的年份前缀（用于快速排除）
+YEAR_PREFIX_PATTERN = re.compile(r'(19\d{2}|2\d{3}|3000)')
+
 
 class DateUtils:
     """日期处理工具类"""
@@ -36,36 +53,228 @@ class DateUtils:
             str or None: 匹配的日期格式名称，不匹配返回 None
         """
         value_str = str(value).strip()
-        for format_name, pattern in DATE_FORMATS.items():
-            if re.match(pattern, value_str):
+        for format_name, pattern in COMPILED_DATE_FORMATS.items():
+            if pattern.match(value_str):
                 return format_name
         return None
 
     @staticmethod
-    def is_date_column(series, threshold=DATE_DETECTION_THRESHOLD):
+    def sample_values(series, sample_size=DATE_DETECTION_SAMPLE_SIZE):
+        """
+        在整列上等距分层采样，返回样本中的非空值
+
+        Args:
+            series: pandas Series
+            sample_size: 最大采样行数
+
+        Returns:
+            pandas Series: 采样后的非空值
+        """
+        if len(series) > sample_size:
+            positions = np.linspace(0, len(series) - 1, sample_size).astype(np.int64)
+            series = series.iloc[positions]
+        return series.dropna()
+
+    @staticmethod
+    def is_date_column(series, threshold=DATE_DETECTION_THRESHOLD, sample_size=DATE_DETECTION_SAMPLE_SIZE):
         """
         判断列是否为日期类型
 
+        在等距分层采样的非空值上，用预编译的合并正则做向量化匹配；
+        分批检测，一旦能确定结果（已达到阈值或已不可能达到）即提前返回。
+
         Args:
             series: pandas Series
             threshold: 至少多少比例的值符合日期格式 (默认: 0.8)
+            sample_size: 最大采样行数
 
         Returns:
             bool: 是否为日期字段
         """
-        non_null_series = series.dropna()
-        if len(non_null_series) == 0:
+        sample = DateUtils.sample_values(series, sample_size)
+        total = len(sample)
+        if total == 0:
+            return False
+
+        values = sample.astype(str).str.strip()
+        required = threshold * total
+
+        # 所有日期格式都以年份开头，先用年份前缀快速排除
+        if values.str.match(YEAR_PREFIX_PATTERN).sum() < required:
             return False
 
-        date_count = sum(1 for x in non_null_series if DateUtils.detect_date_format(x))
-        ratio = date_count / len(non_null_series)
-        return ratio >= threshold
+        date_count = 0
+        for start in range(0, total, DATE_DETECTION_BATCH_SIZE):
+            batch = values.iloc[start:start + DATE_DETECTION_BATCH_SIZE]
+            date_count += int(batch.str.match(ANY_DATE_PATTERN).sum())
+            remaining = total - start - len(batch)
+            if date_count >= required:
+                return True
+            if date_count + remaining < required:
+                return False
+        return date_count >= required
 
     @staticmethod
-    def convert_to_datetime(series):
+    def infer_date_formats(series, sample_size=DATE_DETECTION_SAMPLE_SIZE):
+        """
+        从采样值推断列中使用的日期格式
+
+        每个值按 DATE_FORMATS 的优先级归入第一个匹配的格式（与 detect_date_format 一致）。
+
+        Args:
+            series: pandas Series
+            sample_size: 最大采样行数
+
+        Returns:
+            list: 日期格式名称列表，按样本中出现次数降序；没有匹配时为空列表
+        """
+        remaining = DateUtils.sample_values(series, sample_size).astype(str).str.strip()
+        counts = {}
+        for format_name, pattern in COMPILED_DATE_FORMATS.items():
+            if remaining.empty:
+                break
+            matched = remaining.str.match(pattern)
+            count = int(matched.sum())
+            if count:
+                counts[format_name] = count
+                remaining = remaining[~matched]
+        return sorted(counts, key=counts.get, reverse=True)
+
+    @staticmethod
+    def convert_to_datetime(series, date_formats=None):
         """
         智能转换为 datetime 类型
 
+        按推断出的日期格式精确解析：单一格式的列只解析一遍；
+        混合格式的列每个格式解析一遍，且只处理尚未解析成功的行。
+        剩余无法按已知格式解析的文本值再交给 pandas 自动解析。
+
+        Args:
+            series: pandas Series
+            date_formats: 日期格式名称列表（见 infer_date_formats），None 表示从采样值推断
+
+        Returns:
+            pandas Series: 转换后的 datetime Series
+        """
+        if date_formats is None:
+            date_formats = DateUtils.infer_date_formats(series)
+        if not date_formats:
+            return DateUtils._convert_by_trying_formats(series)
+
+        result = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[us]')
+        pending = series.notna().to_numpy().copy()
+
+        for format_name in date_formats:
+            if not pending.any():
+                break
+            rows = np.flatnonzero(pending)
+            parsed = pd.to_datetime(
+                series.iloc[rows], format=DATE_FORMAT_PARSE_STRINGS[format_name], errors='coerce'
+            )
+            ok = parsed.notna().to_numpy()
+            result[rows[ok]] = parsed[ok].to_numpy().astype('datetime64[us]')
+            pending[rows[ok]] = False
+
+        # 数值列不做自动解析，避免把数字误认为时间戳
+        if pending.any() and not pd.api.types.is_numeric_dtype(series):
+            rows = np.flatnonzero(pending)
+            parsed = pd.to_datetime(series.iloc[rows], errors='coerce')
+            ok = parsed.notna().to_numpy()
+            if ok.any():
+                result[rows[ok]] = parsed[ok].to_numpy().astype('datetime64[us]')
+
+        return pd.Series(result, index=series.index, name=series.name)
+
+    @staticmethod
+    def convert_with_period_keys(series, period_type, date_formats=None):
+        """
+        按唯一值解析日期并计算时间周期分组键
+
+        先对原始列做 factorize，只对唯一值解析日期、生成周期标签，
+        再通过编码广播回每一行。日期列通常只有少量不同取值，可大幅减少解析与格式化的开销。
+
+        Args:
+            series: 原始日期列
+            period_type: 时间周期类型
+            date_formats: 日期格式名称列表（见 infer_date_formats），None 表示从采样值推断
+
+        Returns:
+            tuple: (dates, period_keys)
+                - dates: 转换后的 datetime Series
+                - period_keys: 周期分组键 Series，日期为空或无效的行为 NaN
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(series.cat.categories.dtype)
+        codes, uniques = pd.factorize(series, sort=False)
+        unique_dates = DateUtils.convert_to_datetime(pd.Series(uniques), date_formats)
+        unique_keys = pd.Series(np.nan, index=unique_dates.index, dtype=object)
+        valid = unique_dates.notna()
+        if valid.any():
+            if date_formats and len(date_formats) == 1 and date_formats[0] in FIXED_WIDTH_DATE_FORMATS:
+                # 单一定宽格式：直接从原始字符串切片生成标签
+                unique_values = pd.Series(uniques)[valid]
+                unique_keys[valid] = DateUtils.apply_period_filter(unique_values, period_type, date_formats[0])
+            else:
+                unique_keys[valid] = DateUtils.apply_period_filter(unique_dates[valid], period_type)
+
+        # 追加一个空值槽位，编码 -1（原始空值）正好取到它
+        date_values = np.append(unique_dates.to_numpy().astype('datetime64[us]'), np.datetime64('NaT'))
+        key_values = np.append(unique_keys.to_numpy(), np.nan)
+        dates = pd.Series(date_values[codes], index=series.index, name=series.name)
+        period_keys = pd.Series(key_values[codes], index=series.index, dtype=object)
+        return dates, period_keys
+
+    @staticmethod
+    def datetime_levels(dates):
+        """
+        计算每个日期时间值写出为文本时需要的精度级别
+
+        pandas 写出日期时间列时，按同一次写出的所有值中最高的级别统一选择格式：
+        0 只有日期（全部为零点）、1 精确到秒、2 毫秒、3 微秒、4 纳秒。
+
+        Args:
+            dates: datetime Series
+
+        Returns:
+            ndarray: 与 dates 对齐的级别数组（int8），空值为 0
+        """
+        values = dates.to_numpy()
+        unit, _ = np.datetime_data(values.dtype)
+        per_second = {'s': 1, 'ms': 10 ** 3, 'us': 10 ** 6, 'ns': 10 ** 9}[unit]
+        ticks = values.view('i8')
+        levels = np.zeros(len(ticks), dtype=np.int8)
+        for level, divisor in enumerate((86400 * per_second, per_second, per_second // 10 ** 3,
+                                         per_second // 10 ** 6), start=1):
+            if divisor > 1:
+                levels[ticks % divisor != 0] = level
+        levels[np.isnat(values)] = 0
+        return levels
+
+    @staticmethod
+    def format_datetimes(dates, level):
+        """
+        按给定精度级别把日期时间格式化为文本，与 pandas 一次写出最高级别为 level 的值时的文本一致
+
+        Args:
+            dates: datetime Series，各值的级别不超过 level
+            level: 精度级别，见 datetime_levels
+
+        Returns:
+            Series: 与 dates 对齐的文本，空值为 NaN
+        """
+        unit, _ = np.datetime_data(dates.dtype)
+        # 追加一个恰好为该级别的值，使 pandas 按该级别格式化，再去掉它
+        offset = np.timedelta64(int(level > 0), ('s', 's', 'ms', 'us', 'ns')[level])
+        witness = pd.Series([np.datetime64(0, unit) + offset])
+        text = pd.concat([dates, witness], ignore_index=True).astype(str).iloc[:-1]
+        text.index = dates.index
+        return text
+
+    @staticmethod
+    def _convert_by_trying_formats(series):
+        """
+        逐个尝试常见格式转换为 datetime（无法推断格式时的后备方案）
+
         Args:
             series: pandas Series
 
@@ -76,13 +285,9 @@ class DateUtils:
         for fmt in DATE_FORMAT_STRINGS:
             try:
                 result = pd.to_datetime(series, format=fmt, errors='coerce')
-                # 检查是否有成功解析的值
-                if result.notna().sum() > 0:
-                    # 检查是否全部值都解析成功
-                    if result.notna().sum() == len(series):
-                        return result
-                    # 如果只解析了部分，记录一下
-                    # 但仍然继续尝试其他格式
+                # 检查是否全部值都解析成功
+                if result.notna().sum() == len(series):
+                    return result
             except Exception:
                 continue
 
@@ -142,14 +347,17 @@ class DateUtils:
         return str(date)
 
     @staticmethod
-    def apply_period_filter(series, period_type):
+    def apply_period_filter(series, period_type, date_format=None):
         """
         应用时间周期过滤，返回周期分组键
         统一返回字符串格式的Series，确保groupby行为一致
 
         Args:
-            series: datetime Series 或 DatetimeIndex
+            series: datetime Series 或 DatetimeIndex；指定 date_format 时也可以是原始日期值
             period_type: 时间周期类型
+            date_format: 原始日期值的格式名称（见 detect_date_format）
+                - 补零的定宽格式（见 FIXED_WIDTH_DATE_FORMATS）: 直接按字符位置切片生成标签，无需日期转换
+                - 其他: 先转换为 datetime
 
         Returns:
             Series: 字符串格式的周期分组键 Series
@@ -158,41 +366,134 @@ class DateUtils:
         if isinstance(series, pd.DatetimeIndex):
             series = pd.Series(series)
 
+        if date_format in FIXED_WIDTH_DATE_FORMATS and not pd.api.types.is_datetime64_any_dtype(series):
+            return DateUtils._period_keys_by_slicing(series, period_type, date_format)
+
         # 确保series是datetime类型
         if not pd.api.types.is_datetime64_any_dtype(series):
             series = pd.to_datetime(series, errors='coerce')
 
-        if period_type == 'Y':
-            # 年: 返回 "2024"
-            return series.dt.strftime('%Y').astype(str)
+        codes = DateUtils.period_codes(series, period_type)
+        if codes is None:
+            # 默认返回原始series
+            return series
+
+        # 按整数编码分组，每组只生成一次标签
+        unique_codes, first_rows, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        labels = np.array([
+            DateUtils.get_period_label(series.iloc[row], period_type) if code >= 0 else np.nan
+            for code, row in zip(unique_codes, first_rows)
+        ], dtype=object)
+        return pd.Series(labels[inverse.ravel()], index=series.index, dtype=object).infer_objects()
+
+    @staticmethod
+    def period_codes(series, period_type):
+        """
+        计算整数周期编码（按时间先后递增）
+
+        Args:
+            series: datetime Series
+            period_type: 时间周期类型
 
+        Returns:
+            ndarray: int64 周期编码，无效日期为 -1；不支持的周期类型返回 None
+                - Y: year
+                - H: year*10 + 半年(1/2)
+                - Q: year*10 + 季度(1-4)
+                - M: year*100 + month
+                - HM: (year*100 + month)*10 + 半月(1/2)
+                - D: year*10000 + month*100 + day
+        """
+        if period_type not in ('Y', 'H', 'Q', 'M', 'HM', 'D'):
+            return None
+
+        valid = series.notna().to_numpy()
+        codes = np.full(len(series), -1, dtype=np.int64)
+        dates = series[valid].dt
+        year = dates.year.to_numpy(dtype=np.int64)
+        month = dates.month.to_numpy(dtype=np.int64)
+        day = dates.day.to_numpy(dtype=np.int64)
+
+        if period_type == 'Y':
+            codes[valid] = year
         elif period_type == 'H':
             # 半年: H1 = 1-6月, H2 = 7-12月
-            return series.apply(
-                lambda x: f"{x.year}-H1" if x.month <= 6 else f"{x.year}-H2" if pd.notna(x) else None
-            )
-
+            codes[valid] = year * 10 + np.where(month <= 6, 1, 2)
         elif period_type == 'Q':
-            # 季度: 返回 "2024-Q1"
-            quarter = (series.dt.month - 1) // 3 + 1
-            return series.dt.year.astype(str) + '-Q' + quarter.astype(str)
-
+            codes[valid] = year * 10 + (month - 1) // 3 + 1
         elif period_type == 'M':
-            # 月: 返回 "2024-01"
-            return series.dt.strftime('%Y-%m')
-
+            codes[valid] = year * 100 + month
         elif period_type == 'HM':
             # 半月: HM1 = 1-15日, HM2 = 16-月末
-            return series.apply(
-                lambda x: f"{x.year}-{x.month:02d}-HM1" if x.day <= 15 else f"{x.year}-{x.month:02d}-HM2" if pd.notna(x) else None
-            )
+            codes[valid] = (year * 100 + month) * 10 + np.where(day <= 15, 1, 2)
+        else:
+            codes[valid] = year * 10000 + month * 100 + day
+        return codes
 
-        elif period_type == 'D':
-            # 日: 返回 "2024-01-15"
-            return series.dt.strftime('%Y-%m-%d')
+    @staticmethod
+    def _period_keys_by_slicing(series, period_type, date_format):
+        """
+        按字符位置切片生成周期分组键（补零的定宽日期格式）
 
-        # 默认返回原始series
-        return series
+        通过格式正则和当月天数校验的值直接由年、月、日子串拼出标签；
+        其余非空值（如 2024-02-30 或格式不符的值）回退到完整的日期解析。
+
+        Args:
+            series: 原始日期值 Series
+            period_type: 时间周期类型
+            date_format: 日期格式名称
+
+        Returns:
+            Series: 周期分组键 Series，无效日期为 NaN
+        """
+        year_start, month_start, day_start = FIXED_WIDTH_DATE_FORMATS[date_format]
+        text = series.astype(str)
+        not_null = series.notna().to_numpy()
+        matched = text.str.match(COMPILED_DATE_FORMATS[date_format]).to_numpy(dtype=bool, na_value=False)
+        rows = np.flatnonzero(not_null & matched)
+
+        values = text.iloc[rows]
+        year_text = values.str.slice(year_start, year_start + 4)
+        month_text = values.str.slice(month_start, month_start + 2)
+        day_text = values.str.slice(day_start, day_start + 2) if day_start is not None else None
+        year = year_text.astype(int).to_numpy()
+        month = month_text.astype(int).to_numpy()
+        day = day_text.astype(int).to_numpy() if day_text is not None else np.ones(len(rows), dtype=int)
+
+        # 校验月份范围以及日期不超过当月天数
+        leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        month_days = DAYS_IN_MONTH[np.clip(month, 1, 12) - 1] + ((month == 2) & leap)
+        in_range = (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+
+        if period_type == 'Y':
+            labels = year_text
+        elif period_type == 'H':
+            labels = year_text + np.where(month <= 6, '-H1', '-H2')
+        elif period_type == 'Q':
+            labels = year_text + '-Q' + ((month - 1) // 3 + 1).astype(str)
+        elif period_type == 'M':
+            labels = year_text + '-' + month_text
+        elif period_type == 'HM':
+            labels = year_text + '-' + month_text + np.where(day <= 15, '-HM1', '-HM2')
+        else:
+            labels = year_text + '-' + month_text + '-' + (day_text if day_text is not None else '01')
+
+        keys = np.full(len(series), np.nan, dtype=object)
+        keys[rows[in_range]] = labels.to_numpy(dtype=object)[in_range]
+
+        # 未通过校验的非空值：完整解析
+        fallback = not_null.copy()
+        fallback[rows[in_range]] = False
+        if fallback.any():
+            fallback_rows = np.flatnonzero(fallback)
+            dates = DateUtils.convert_to_datetime(series.iloc[fallback_rows])
+            valid = dates.notna().to_numpy()
+            if valid.any():
+                keys[fallback_rows[valid]] = DateUtils.apply_period_filter(
+                    dates[valid], period_type
+                ).to_numpy(dtype=object)
+
+        return pd.Series(keys, index=series.index, dtype=object).infer_objects()
 
     @staticmethod
     def validate_time_period(period_type):
@@ -4,71 +4,343 @@
 """
 
 import os
+import codecs
+import shutil
 import chardet
 from pathlib import Path
 from ..utils.constants import (
     SUPPORTED_ENCODINGS,
     UNSAFE_FILENAME_CHARS,
     MAX_FILENAME_LENGTH,
+    SIZE_UNITS,
+    ROW_COUNT_CHUNKSIZE,
+    ENCODING_BOMS,
+    DECODE_CHECK_BLOCK_SIZE,
+    COLUMN_TYPE_CHUNKSIZE,
 )
+from ..utils.record_utils import RecordUtils
 
 
 class FileUtils:
     """文件处理工具类"""
 
+    # 行数缓存 {(绝对路径, skip_blank_lines): (文件大小, 修改时间, 行数)}
+    _row_count_cache = {}
+    # 编码缓存 {绝对路径: (文件大小, 修改时间, 样本字节数, 编码)}
+    _encoding_cache = {}
+    # 解码校验缓存 {(绝对路径, 编码): (文件大小, 修改时间, 第一个无法解码的字节位置)}
+    _decode_error_cache = {}
+    # 列类型缓存 {(绝对路径, 编码): (文件大小, 修改时间, {(列名, 是否按文本读取): 类型})}
+    _column_type_cache = {}
+
     @staticmethod
     def detect_encoding(file_path, sample_size=100000):
         """
         检测文件编码
 
+        按代价从低到高逐层判断：BOM → 严格 UTF-8 解码 → GB18030 解码 → chardet。
+        结果按文件路径、大小和修改时间缓存，同一文件在各页面和拆分过程中只检测一次。
+
         Args:
             file_path: 文件路径
             sample_size: 用于检测的字节数
 
         Returns:
-            str: 检测到的编码名称
+            str: 检测到的编码名称；无法读取时返回 None
         """
         try:
+            stat = os.stat(file_path)
+            key = os.path.abspath(file_path)
+            cached = FileUtils._encoding_cache.get(key)
+            if cached is not None and cached[:3] == (stat.st_size, stat.st_mtime_ns, sample_size):
+                return cached[3]
+
             with open(file_path, 'rb') as f:
                 raw_data = f.read(sample_size)
-                result = chardet.detect(raw_data)
-                return result['encoding']
+            # 样本截断时末尾可能是不完整的多字节字符
+            encoding = FileUtils._sniff_encoding(raw_data, truncated=stat.st_size > len(raw_data))
+            FileUtils._encoding_cache[key] = (stat.st_size, stat.st_mtime_ns, sample_size, encoding)
+            return encoding
         except Exception:
             return None
 
+    @staticmethod
+    def _sniff_encoding(raw_data, truncated=False):
+        """
+        根据文件开头的字节判断编码
+
+        Args:
+            raw_data: 文件开头的字节
+            truncated: 样本是否只是文件的一部分
+
+        Returns:
+            str: 编码名称；无法判断时返回 None
+        """
+        for bom, encoding in ENCODING_BOMS:
+            if raw_data.startswith(bom):
+                return encoding
+        if raw_data.isascii():
+            return 'utf-8'
+        for encoding in ('utf-8', 'gb18030'):
+            try:
+                codecs.getincrementaldecoder(encoding)().decode(raw_data, final=not truncated)
+                return encoding
+            except UnicodeDecodeError:
+                continue
+        return chardet.detect(raw_data)['encoding']
+
+    @staticmethod
+    def find_decode_error(file_path, encoding, block_size=DECODE_CHECK_BLOCK_SIZE):
+        """
+        按编码流式解码整个文件，查找第一个无法解码的字节
+
+        用增量解码器分块解码，不构造完整文本，内存占用只与块大小相关。
+        结果按文件路径、大小、修改时间和编码缓存。
+
+        Args:
+            file_path: 文件路径
+            encoding: 编码名称
+            block_size: 每次读取的字节数
+
+        Returns:
+            int: 第一个无法解码的字节位置；整个文件都能解码时返回 None
+
+        Raises:
+            LookupError: 未知的编码名称
+        """
+        codec = codecs.lookup(encoding).name
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), codec)
+        cached = FileUtils._decode_error_cache.get(key)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+
+        decoder = codecs.getincrementaldecoder(codec)()
+        offset = None
+        position = 0
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                # 解码器报告的错误位置相对于上一块遗留的不完整字节
+                pending = len(decoder.getstate()[0])
+                try:
+                    decoder.decode(block, final=not block)
+                except UnicodeDecodeError as e:
+                    offset = position - pending + e.start
+                    break
+                if not block:
+                    break
+                position += len(block)
+
+        FileUtils._decode_error_cache[key] = (stat.st_size, stat.st_mtime_ns, offset)
+        return offset
+
     @staticmethod
     def read_csv_with_encoding(file_path, encoding='auto', **kwargs):
         """
         智能读取CSV文件，自动检测或尝试多种编码
 
+        完整读取（包括 chunksize 流式读取）时，先按候选编码流式解码原始字节，
+        选出第一个能解码整个文件的编码后只解析一次；只读取前 nrows 行时直接尝试解析。
+
         Args:
             file_path: 文件路径
             encoding: 文件编码，'auto' 表示自动检测
             **kwargs: 传递给 pandas.read_csv 的其他参数
 
         Returns:
-            pandas.DataFrame: 读取的数据框
+            pandas.DataFrame: 读取的数据框（指定 chunksize 时为分块读取器）
+
+        Raises:
+            ValueError: 所有候选编码都无法解码，错误信息包含各编码出错的字节位置
         """
         import pandas as pd
 
         if encoding == 'auto':
             encoding = FileUtils.detect_encoding(file_path)
-
-        # 尝试指定编码
-        if encoding:
+        candidates = ([encoding] if encoding else []) + [enc for enc in SUPPORTED_ENCODINGS if enc != encoding]
+
+        # 只读取开头几行：解析代价小，直接逐个尝试
+        if kwargs.get('nrows') is not None and kwargs.get('chunksize') is None:
+            for enc in candidates:
+                try:
+                    return pd.read_csv(file_path, encoding=enc, **kwargs)
+                except Exception:
+                    continue
+            raise ValueError(f"无法读取文件: {file_path}，尝试了所有编码均失败")
+
+        failures = []
+        for enc in candidates:
             try:
-                return pd.read_csv(file_path, encoding=encoding, **kwargs)
-            except Exception:
-                pass
+                offset = FileUtils.find_decode_error(file_path, enc)
+            except LookupError:
+                failures.append(f"{enc}: 未知编码")
+                continue
+            if offset is None:
+                return pd.read_csv(file_path, encoding=enc, **kwargs)
+            failures.append(f"{enc}: 第 {offset:,} 字节无法解码")
 
-        # 依次尝试常见编码
-        for enc in SUPPORTED_ENCODINGS:
+        raise ValueError(f"无法读取文件: {file_path}，尝试了所有编码均失败（{'；'.join(failures)}）")
+
+    @staticmethod
+    def count_rows(file_path, skip_blank_lines=True):
+        """
+        统计 CSV 文件的数据行数（不含表头）
+
+        直接按引号感知的换行扫描原始字节，不用 pandas 解析；引号内的换行不计数。
+        结果按文件路径、大小和修改时间缓存，文件未变化时不重复扫描。
+
+        Args:
+            file_path: 文件路径
+            skip_blank_lines: 是否跳过空行（与 pandas 解析时的行为一致）
+
+        Returns:
+            int: 数据行数
+        """
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), skip_blank_lines)
+        cached = FileUtils._row_count_cache.get(key)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+
+        with open(file_path, 'rb') as f:
+            buffer = RecordUtils.map_file(f)
             try:
-                return pd.read_csv(file_path, encoding=enc, **kwargs)
-            except Exception:
-                continue
+                utf16 = bytes(buffer[:2]) in (b'\xff\xfe', b'\xfe\xff')
+                rows = None if utf16 else RecordUtils.count_records(buffer, skip_blank_lines)
+            finally:
+                if hasattr(buffer, 'close'):
+                    buffer.close()
+        if rows is None:
+            # UTF-16 的换行和引号不是单字节，只能解码后计数
+            reader = FileUtils.read_csv_with_encoding(
+                file_path, usecols=[0], dtype=str, chunksize=ROW_COUNT_CHUNKSIZE, skip_blank_lines=skip_blank_lines
+            )
+            with reader:
+                rows = sum(len(chunk) for chunk in reader)
+
+        FileUtils._row_count_cache[key] = (stat.st_size, stat.st_mtime_ns, rows)
+        return rows
+
+    @staticmethod
+    def column_types(df, text_columns=()):
+        """
+        归类一个数据块中各列的类型
 
-        raise ValueError(f"无法读取文件: {file_path}，尝试了所有编码均失败")
+        普通列按 read_csv 推断出的 dtype 归类：'int'、'float'、'bool'，
+        布尔值夹杂空值的列为 'boolean'，其余为 'object'；全部为空的列为 'empty'。
+        text_columns 中的列按原始文本读入，按类别值的还原规则（pd.to_numeric）归类为
+        'int'、'float' 或 'object'，含空值的整数为 'float'。
+
+        Args:
+            df: DataFrame
+            text_columns: 按原始文本读入的列名集合
+
+        Returns:
+            dict: {列名: 类型}
+        """
+        import pandas as pd
+
+        types = {}
+        for column in df.columns:
+            series = df[column]
+            if column in text_columns:
+                codes, uniques = pd.factorize(series)
+                if len(uniques) == 0:
+                    types[column] = 'empty'
+                    continue
+                try:
+                    values = pd.to_numeric(uniques)
+                except (ValueError, TypeError):
+                    types[column] = 'object'
+                    continue
+                has_na = bool((codes < 0).any())
+                types[column] = 'int' if pd.api.types.is_integer_dtype(values) and not has_na else 'float'
+            elif pd.api.types.is_bool_dtype(series.dtype):
+                types[column] = 'bool'
+            elif pd.api.types.is_integer_dtype(series.dtype):
+                types[column] = 'int'
+            elif pd.api.types.is_float_dtype(series.dtype):
+                # read_csv 把全部为空的列推断为浮点
+                types[column] = 'empty' if series.isna().all() else 'float'
+            elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == 'boolean':
+                types[column] = 'boolean'
+            else:
+                types[column] = 'object'
+        return types
+
+    @staticmethod
+    def merge_column_type(first, second):
+        """
+        合并同一列在两个数据块中的类型，得到两块合在一起读入时的类型
+
+        Args:
+            first: 前面各块合并后的类型，None 表示尚无
+            second: 当前块的类型
+
+        Returns:
+            str: 合并后的类型
+        """
+        if first is None or first == second:
+            return second
+        if 'empty' in (first, second):
+            other = second if first == 'empty' else first
+            # 整数列出现空值变为浮点，布尔列出现空值变为布尔对象列
+            return {'int': 'float', 'bool': 'boolean'}.get(other, other)
+        pair = {first, second}
+        if pair == {'int', 'float'}:
+            return 'float'
+        if pair == {'bool', 'boolean'}:
+            return 'boolean'
+        return 'object'
+
+    @staticmethod
+    def infer_column_types(file_path, encoding='auto', columns=None, text_columns=(),
+                           chunksize=COLUMN_TYPE_CHUNKSIZE):
+        """
+        流式读取一遍文件，得到各列在整个文件一次性读入时的类型
+
+        分块读取时每块独立推断类型，同一列可能在一块中是整数、另一块中因含空值变为浮点，
+        写出的格式随之不同；合并各块的类型后即可固定流式读取时的 dtype。
+        结果按文件路径、大小和修改时间缓存，已统计过的列不重复读取。
+
+        Args:
+            file_path: 文件路径
+            encoding: 文件编码，'auto' 表示自动检测
+            columns: 要统计的列名列表，None 表示全部列
+            text_columns: 按原始文本读入的列名集合（见 column_types）
+            chunksize: 每块读取的行数
+
+        Returns:
+            dict: {列名: 类型}，类型取值见 column_types
+        """
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), encoding)
+        cached = FileUtils._column_type_cache.get(key)
+        known = dict(cached[2]) if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns) else {}
+
+        all_columns = columns is None
+        if all_columns:
+            columns = list(FileUtils.read_csv_with_encoding(file_path, encoding=encoding, nrows=0).columns)
+        wanted = [(column, column in text_columns) for column in columns]
+        missing = [item for item in wanted if item not in known]
+        if missing:
+            usecols = [column for column, _ in missing]
+            found = {}
+            reader = FileUtils.read_csv_with_encoding(
+                file_path, encoding=encoding, chunksize=chunksize,
+                usecols=None if all_columns and len(usecols) == len(columns) else usecols,
+                dtype={column: str for column, text in missing if text},
+            )
+            with reader:
+                for chunk in reader:
+                    for column, kind in FileUtils.column_types(chunk, text_columns).items():
+                        found[column] = FileUtils.merge_column_type(found.get(column), kind)
+            for column, text in missing:
+                known[(column, text)] = found.get(column, 'empty')
+            FileUtils._column_type_cache[key] = (stat.st_size, stat.st_mtime_ns, known)
+
+        return {column: known[item] for column, item in zip(columns, wanted)}
 
     @staticmethod
     def safe_filename(name, max_length=None):
@@ -170,6 +442,63 @@ class FileUtils:
 
         df.to_csv(file_path, index=False, encoding=encoding)
 
+    @staticmethod
+    def copy_byte_range(src_fd, dst_fd, offset, count):
+        """
+        把源文件 [offset, offset + count) 的字节追加到目标文件
+
+        优先使用 os.copy_file_range / os.sendfile 在内核中完成复制，
+        不支持时退回普通的读写。
+
+        Args:
+            src_fd: 源文件描述符
+            dst_fd: 目标文件描述符（写入其当前位置）
+            offset: 源文件起始字节位置
+            count: 字节数
+        """
+        for copy in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+            if copy is None:
+                continue
+            try:
+                while count > 0:
+                    if copy is os.sendfile:
+                        copied = os.sendfile(dst_fd, src_fd, offset, count)
+                    else:
+                        copied = os.copy_file_range(src_fd, dst_fd, count, offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+                    count -= copied
+                if count == 0:
+                    return
+            except OSError:
+                # 文件系统或平台不支持，换下一种方式
+                continue
+
+        os.lseek(src_fd, offset, os.SEEK_SET)
+        while count > 0:
+            data = os.read(src_fd, min(count, 1024 * 1024))
+            if not data:
+                break
+            os.write(dst_fd, data)
+            count -= len(data)
+
+    @staticmethod
+    def get_free_space(path):
+        """
+        获取路径所在磁盘的可用空间（路径不存在时取最近的已存在上级目录）
+
+        Args:
+            path: 文件或目录路径
+
+        Returns:
+            int: 可用字节数
+        """
+        path = os.path.abspath(path)
+        while not os.path.exists(path):
+            path = os.path.dirname(path)
+        return shutil.disk_usage(path).free
+
     @staticmethod
     def get_file_stem(file_path):
         """
@@ -199,3 +528,29 @@ class FileUtils:
                 return f"{size_bytes:.2f} {unit}"
             size_bytes /= 1024.0
         return f"{size_bytes:.2f} TB"
+
+    @staticmethod
+    def parse_size(size):
+        """
+        解析文件大小（format_file_size 的逆操作）
+
+        Args:
+            size: 字节数，或带单位的字符串 (如: "512MB"、"2GB"、"1.5 G")
+
+        Returns:
+            int: 字节数
+
+        Raises:
+            ValueError: 无法解析时
+        """
+        if isinstance(size, (int, float)):
+            return int(size)
+        text = str(size).strip().upper()
+        number = text.rstrip('KMGTB').strip()
+        unit = text[len(number):].strip() or 'B'
+        if unit not in SIZE_UNITS:
+            raise ValueError(f"无法识别的大小单位: {size}")
+        try:
+            return int(float(number) * SIZE_UNITS[unit])
+        except ValueError:
+            raise ValueError(f"无法解析的大小: {size}") from None
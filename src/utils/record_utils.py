@@ -0,0 +1,256 @@
+"""
+记录边界工具类
+在原始字节上定位 CSV 记录边界（引号内的换行不算记录结束）
+"""
+
+import os
+import mmap
+import numpy as np
+from ..utils.constants import RECORD_SCAN_BLOCK_SIZE
+
+QUOTE = 0x22
+NEWLINE = 0x0A
+
+
+class RecordUtils:
+    """记录边界工具类"""
+
+    @staticmethod
+    def find_record_ends(buffer, start, end, in_quotes=False):
+        """
+        在 buffer[start:end] 中查找引号外的换行，返回各记录的结束位置
+
+        用引号位置的奇偶性判断换行是否位于引号内（转义的 "" 成对出现，不影响奇偶性）。
+
+        Args:
+            buffer: 支持缓冲区协议的字节对象（bytes、mmap 等）
+            start: 起始字节位置
+            end: 结束字节位置（不含）
+            in_quotes: start 处是否位于引号内
+
+        Returns:
+            tuple: (ends, in_quotes)
+                - ends: int64 数组，记录结束位置（换行符之后的位置）
+                - in_quotes: end 处是否位于引号内
+        """
+        block = np.frombuffer(buffer, dtype=np.uint8, count=end - start, offset=start)
+        newlines = np.flatnonzero(block == NEWLINE)
+        quotes = np.flatnonzero(block == QUOTE)
+        if len(quotes) or in_quotes:
+            # 每个换行之前的引号个数为奇数时位于引号内
+            parity = (np.searchsorted(quotes, newlines) + int(in_quotes)) & 1
+            newlines = newlines[parity == 0]
+            in_quotes = bool((len(quotes) + int(in_quotes)) & 1)
+        return newlines.astype(np.int64) + start + 1, in_quotes
+
+    @staticmethod
+    def iter_record_ends(buffer, block_size=RECORD_SCAN_BLOCK_SIZE):
+        """
+        分块扫描整个 buffer，逐块产出记录结束位置
+
+        最后一条记录没有换行结尾时，以 buffer 末尾作为其结束位置。
+
+        Args:
+            buffer: 支持缓冲区协议的字节对象（bytes、mmap 等）
+            block_size: 每块字节数
+
+        Yields:
+            ndarray: 本块内的记录结束位置
+        """
+        size = len(buffer)
+        in_quotes = False
+        last_end = 0
+        for start in range(0, size, block_size):
+            ends, in_quotes = RecordUtils.find_record_ends(
+                buffer, start, min(start + block_size, size), in_quotes
+            )
+            if len(ends):
+                last_end = int(ends[-1])
+                yield ends
+        if last_end < size:
+            yield np.array([size], dtype=np.int64)
+
+    @staticmethod
+    def record_ends(buffer, block_size=RECORD_SCAN_BLOCK_SIZE):
+        """
+        扫描整个 buffer，返回全部记录结束位置
+
+        Args:
+            buffer: 支持缓冲区协议的字节对象
+            block_size: 每块字节数
+
+        Returns:
+            ndarray: int64 记录结束位置，第一个元素是表头的结束位置
+        """
+        blocks = list(RecordUtils.iter_record_ends(buffer, block_size))
+        return np.concatenate(blocks) if blocks else np.array([], dtype=np.int64)
+
+    @staticmethod
+    def count_records(buffer, skip_blank_lines=True, block_size=RECORD_SCAN_BLOCK_SIZE):
+        """
+        分块扫描整个 buffer，统计数据记录数（不含表头）
+
+        Args:
+            buffer: 支持缓冲区协议的字节对象
+            skip_blank_lines: 是否跳过空行（与 pandas 解析时的行为一致）
+            block_size: 每块字节数
+
+        Returns:
+            int: 数据记录数
+        """
+        count = blank = previous = 0
+        for ends in RecordUtils.iter_record_ends(buffer, block_size):
+            count += len(ends)
+            if skip_blank_lines:
+                lengths = np.diff(ends, prepend=previous)
+                for i in np.flatnonzero(lengths <= 2):
+                    if not bytes(buffer[ends[i] - lengths[i]:ends[i]]).strip(b'\r\n'):
+                        blank += 1
+            previous = int(ends[-1])
+        return max(count - blank - 1, 0)
+
+    @staticmethod
+    def balanced_sizes(total, parts):
+        """
+        把 total 行尽量均匀地分成 parts 份，各份行数最多相差 1
+
+        Args:
+            total: 总行数
+            parts: 份数
+
+        Returns:
+            list: 各份行数（前 total % parts 份多一行）；行数少于份数时只返回非空的份，没有行时返回 [0]
+        """
+        size, extra = divmod(total, parts)
+        sizes = [size + 1] * extra + [size] * (parts - extra)
+        return [rows for rows in sizes if rows] or [0]
+
+    @staticmethod
+    def gather_records(buffer, starts, ends):
+        """
+        按顺序拼接多条记录的原始字节（向量化，不逐条切片）
+
+        Args:
+            buffer: 支持缓冲区协议的字节对象
+            starts: 各记录起始位置数组
+            ends: 各记录结束位置数组
+
+        Returns:
+            bytes: 拼接后的字节
+        """
+        lengths = ends - starts
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        # 每个输出字节在 buffer 中的位置 = 所在记录的起始位置 + 记录内偏移
+        shift = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return data[shift + np.arange(int(lengths.sum()))].tobytes()
+
+    @staticmethod
+    def plan_parts(lengths, header_bytes=0, max_rows=None, max_bytes=None):
+        """
+        按单文件最大行数和字节数把连续的记录划分为若干分片
+
+        每个分片至少包含一条记录，单条记录超过 max_bytes 时独占一个分片。
+
+        Args:
+            lengths: 各记录字节数数组
+            header_bytes: 每个分片文件表头的字节数（计入 max_bytes）
+            max_rows: 单文件最大行数，None 表示不限制
+            max_bytes: 单文件最大字节数，None 表示不限制
+
+        Returns:
+            list: [(start, stop), ...] 各分片的记录下标区间；没有记录时返回 [(0, 0)]
+        """
+        total = len(lengths)
+        if max_bytes is None:
+            step = max_rows or max(total, 1)
+            return [(start, min(start + step, total)) for start in range(0, total, step)] or [(0, 0)]
+
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        parts = []
+        start = 0
+        while start < total:
+            # 累计字节数不超过预算的最后一条记录
+            stop = int(np.searchsorted(offsets, offsets[start] + max_bytes - header_bytes, side='right')) - 1
+            if max_rows:
+                stop = min(stop, start + max_rows)
+            stop = min(max(stop, start + 1), total)
+            parts.append((start, stop))
+            start = stop
+        return parts or [(0, 0)]
+
+    @staticmethod
+    def count_quotes(buffer, start, end, block_size=RECORD_SCAN_BLOCK_SIZE):
+        """
+        统计 buffer[start:end] 中的引号个数
+
+        Args:
+            buffer: 支持缓冲区协议的字节对象
+            start: 起始字节位置
+            end: 结束字节位置（不含）
+            block_size: 每块字节数
+
+        Returns:
+            int: 引号个数
+        """
+        count = 0
+        for block_start in range(start, end, block_size):
+            block_end = min(block_start + block_size, end)
+            block = np.frombuffer(buffer, dtype=np.uint8, count=block_end - block_start, offset=block_start)
+            count += int(np.count_nonzero(block == QUOTE))
+        return count
+
+    @staticmethod
+    def split_ranges(buffer, start, parts, window=64 * 1024):
+        """
+        把 buffer[start:] 划分为约 parts 个按记录边界对齐的字节区间
+
+        在等分点处用此前引号个数的奇偶性判断是否位于引号内，
+        再向后查找第一个引号外的换行作为区间边界。
+
+        Args:
+            buffer: 支持缓冲区协议的字节对象
+            start: 第一条记录的起始位置（表头之后）
+            parts: 期望的区间个数
+            window: 向后查找记录边界时每次扫描的字节数
+
+        Returns:
+            list: [(start, end), ...]，按位置顺序排列且首尾相接
+        """
+        size = len(buffer)
+        bounds = [start]
+        position, quotes = start, 0
+        for i in range(1, parts):
+            target = max(start + (size - start) * i // parts, bounds[-1])
+            quotes += RecordUtils.count_quotes(buffer, position, target)
+            position = target
+            # 从等分点向后查找第一个记录结束位置
+            scan_start, in_quotes = target, bool(quotes & 1)
+            boundary = None
+            while scan_start < size and boundary is None:
+                scan_end = min(scan_start + window, size)
+                ends, in_quotes = RecordUtils.find_record_ends(buffer, scan_start, scan_end, in_quotes)
+                if len(ends):
+                    boundary = int(ends[0])
+                scan_start = scan_end
+            if boundary is None or boundary >= size:
+                break
+            if boundary > bounds[-1]:
+                bounds.append(boundary)
+        bounds.append(size)
+        return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+    @staticmethod
+    def map_file(file_obj):
+        """
+        以只读方式内存映射文件
+
+        Args:
+            file_obj: 以二进制模式打开的文件对象
+
+        Returns:
+            mmap.mmap: 只读映射；空文件返回 b''
+        """
+        size = os.fstat(file_obj.fileno()).st_size
+        if size == 0:
+            return b''
+        return mmap.mmap(file_obj.fileno(), size, access=mmap.ACCESS_READ)
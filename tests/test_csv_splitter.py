@@ -9,6 +9,7 @@ import shutil
 import pandas as pd
 from pathlib import Path
 import sys
+from unittest.mock import patch
 
 # 添加src目录到路径
 src_dir = Path(__file__).parent.parent / 'src'
@@ -38,6 +39,25 @@ class TestCSVSplitter(unittest.TestCase):
         df.to_csv(filepath, index=False, encoding='utf-8')
         return filepath
 
+    def _create_mixed_date_csv(self, filename):
+        """创建日期列混合日期和日期时间的测试CSV文件（最后 6 行带时间）"""
+        lines = ['省份,订单日期,金额']
+        for i in range(24):
+            time = ' 10:30:00' if i >= 18 else ''
+            lines.append(f"{['广东', '浙江'][i % 2]},2024-0{1 + i % 3}-{1 + i:02d}{time},{i}")
+        filepath = os.path.join(self.test_dir, filename)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return filepath
+
+    def _assert_same_output(self, actual_dir, expected_dir):
+        """断言两个输出目录的文件名和文件内容（字节）完全相同"""
+        self.assertEqual(sorted(os.listdir(actual_dir)), sorted(os.listdir(expected_dir)))
+        for name in os.listdir(expected_dir):
+            with open(os.path.join(actual_dir, name), 'rb') as actual, \
+                    open(os.path.join(expected_dir, name), 'rb') as expected:
+                self.assertEqual(actual.read(), expected.read(), name)
+
     def test_classify_fields_all_normal(self):
         """测试分类：全是普通字段"""
         splitter = CSVSplitter(output_dir=self.output_dir)
@@ -264,5 +284,621 @@ class TestCSVSplitter(unittest.TestCase):
         self.assertEqual(len(splitter.stats['errors']), 0)
 
 
+    def test_factorize_groups(self):
+        """测试一次性分组：按首次出现顺序，组内保持原始行序，丢弃空值"""
+        series = pd.Series(['浙江', '广东', None, '浙江', '江苏', '广东'])
+        groups = CSVSplitter._factorize_groups(series)
+
+        self.assertEqual([value for value, _ in groups], ['浙江', '广东', '江苏'])
+        self.assertEqual([list(positions) for _, positions in groups], [[0, 3], [1, 5], [4]])
+
+    def test_infer_category_values(self):
+        """测试分类字段按默认类型推断还原类别值"""
+        ints = CSVSplitter._infer_category_values(pd.Series(['007', '1', '7']).astype('category'))
+        self.assertEqual(list(ints), [7, 1, 7])
+        self.assertEqual(len(ints.cat.categories), 2)
+
+        with_null = CSVSplitter._infer_category_values(pd.Series(['1', None]).astype('category'))
+        self.assertEqual(with_null[0], 1.0)
+        self.assertTrue(pd.api.types.is_float_dtype(with_null.cat.categories))
+
+        text = CSVSplitter._infer_category_values(pd.Series(['广东', '1']).astype('category'))
+        self.assertEqual(list(text), ['广东', '1'])
+
+    def test_split_numeric_field_read_as_category(self):
+        """测试数值拆分字段以分类类型读入后文件名与内容不变"""
+        splitter = CSVSplitter(max_rows=None, output_dir=self.output_dir)
+        data = {
+            '区号': [20, 10, None, 20],
+            '金额': [100, 200, 300, 400]
+        }
+        filepath = self._create_test_csv('test.csv', data)
+        splitter.split_single_file(filepath, ['区号'])
+
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ['test_10.0.csv', 'test_20.0.csv'])
+        df = pd.read_csv(os.path.join(self.output_dir, 'test_20.0.csv'))
+        self.assertEqual(df['金额'].tolist(), [100, 400])
+
+    def test_split_by_non_date_output_order(self):
+        """测试按普通字段拆分的输出顺序与首次出现顺序一致"""
+        splitter = CSVSplitter(max_rows=None, output_dir=self.output_dir)
+        data = {
+            '城市': ['杭州', '深圳', None, '杭州', '南京'],
+            '金额': [100, 200, 300, 400, 500]
+        }
+        filepath = self._create_test_csv('test.csv', data)
+
+        splitter.split_single_file(filepath, ['城市'])
+
+        self.assertEqual(splitter.stats['output_file_list'], [
+            ('test_杭州.csv', 2),
+            ('test_深圳.csv', 1),
+            ('test_南京.csv', 1),
+        ])
+
+    def test_composite_key_cascade_order(self):
+        """测试组合键级联拆分：输出顺序与逐层拆分一致"""
+        splitter = CSVSplitter(max_rows=None, output_dir=self.output_dir)
+        data = {
+            '省份': ['浙江', '广东', '广东', '浙江', '广东', '浙江'],
+            '城市': ['杭州', '广州', '深圳', None, '广州', '宁波'],
+            '订单日期': ['2024-02-01', '2024-03-01', '2024-01-01', '2024-01-01', None, '2024-01-05'],
+        }
+        filepath = self._create_test_csv('test.csv', data)
+
+        splitter.split_single_file(filepath, ['省份', '城市', '订单日期'], 'M')
+
+        self.assertEqual(splitter.stats['output_file_list'], [
+            ('test_浙江_杭州_2024-02.csv', 1),
+            ('test_浙江_宁波_2024-01.csv', 1),
+            ('test_广东_广州_2024-03.csv', 1),
+            ('test_广东_广州_NULL.csv', 1),
+            ('test_广东_深圳_2024-01.csv', 1),
+        ])
+
+    def test_date_converted_once_per_file(self):
+        """测试日期字段每个文件只转换一次"""
+        from unittest.mock import patch
+        from src.utils.date_utils import DateUtils
+
+        splitter = CSVSplitter(max_rows=None, output_dir=self.output_dir)
+        data = {
+            '省份': ['广东', '浙江', '江苏', '广东', '四川'],
+            '订单日期': ['2024-01-15', '2024-02-01', '2024-01-16', None, '2024-03-01'],
+        }
+        filepath = self._create_test_csv('test.csv', data)
+
+        with patch.object(DateUtils, 'convert_to_datetime', wraps=DateUtils.convert_to_datetime) as convert:
+            splitter.split_single_file(filepath, ['省份', '订单日期'], 'M')
+
+        self.assertEqual(convert.call_count, 1)
+        self.assertEqual(len(splitter.stats['output_file_list']), 5)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'test_广东_NULL.csv')))
+
+    def test_chunked_split_matches_in_memory(self):
+        """测试流式拆分与一次性拆分结果一致"""
+        data = {
+            '省份': ['广东', '浙江', '广东', '江苏', '浙江', '广东', '江苏'],
+            '订单日期': ['2024-01-15', '2024-02-01', '2024-01-16', '2024-03-01', None, '2024-02-02', '2024-03-02'],
+            '金额': [100, 200, 300, 400, 500, 600, 700]
+        }
+        filepath = self._create_test_csv('test.csv', data)
+
+        in_memory_dir = os.path.join(self.test_dir, 'in_memory')
+        CSVSplitter(output_dir=in_memory_dir).split_single_file(filepath, ['省份', '订单日期'], 'M')
+        splitter = CSVSplitter(output_dir=self.output_dir, chunksize=2)
+        splitter.split_single_file(filepath, ['省份', '订单日期'], 'M')
+
+        self._assert_same_output(self.output_dir, in_memory_dir)
+        self.assertIn('test_浙江_NULL.csv', os.listdir(self.output_dir))
+        self.assertEqual(splitter.stats['total_rows'], 7)
+        self.assertEqual(splitter.stats['output_files'], len(os.listdir(self.output_dir)))
+
+        # 日期列只有后面的行带时间：同一输出文件的各块须按整个文件选择日期格式
+        mixed_path = self._create_mixed_date_csv('mixed.csv')
+        for name, options in [('mixed', {}), ('mixed_rows', {'max_rows': 3})]:
+            expected_dir = os.path.join(self.test_dir, f'{name}_expected')
+            actual_dir = os.path.join(self.test_dir, name)
+            CSVSplitter(output_dir=expected_dir, **options).split_single_file(mixed_path, ['省份', '订单日期'], 'M')
+            CSVSplitter(output_dir=actual_dir, chunksize=2, **options).split_single_file(
+                mixed_path, ['省份', '订单日期'], 'M')
+            self._assert_same_output(actual_dir, expected_dir)
+
+    def test_streaming_split_keeps_column_types(self):
+        """测试只有一个数据块含空值的数值列，流式拆分写出的格式与一次性拆分一致"""
+        # 只有第 3 个数据块（每块 10 行）含空值：整数列、布尔列为空，文本列出现非数值
+        lines = ['省份,数量,标记,编号']
+        for i in range(30):
+            quantity = '' if i == 25 else str(i)
+            flag = '' if i == 27 else str(i % 2 == 0)
+            code = 'A01' if i == 28 else f'{i:02d}'
+            lines.append(f"{['广东', '浙江', '江苏'][i % 3]},{quantity},{flag},{code}")
+        filepath = os.path.join(self.test_dir, 'test.csv')
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        for name, options in [('chunked', {'chunksize': 10}), ('spill', {'chunksize': 10, 'spill_buckets': 2}),
+                              ('hash', {'chunksize': 10, 'hash_buckets': 2})]:
+            expected_dir = os.path.join(self.test_dir, f'{name}_expected')
+            actual_dir = os.path.join(self.test_dir, name)
+            in_memory = {key: value for key, value in options.items() if key != 'chunksize'}
+            CSVSplitter(output_dir=expected_dir, **in_memory).split_single_file(filepath, ['省份'])
+            CSVSplitter(output_dir=actual_dir, **options).split_single_file(filepath, ['省份'])
+            self._assert_same_output(actual_dir, expected_dir)
+
+        expected_dir = os.path.join(self.test_dir, 'rows_expected')
+        actual_dir = os.path.join(self.test_dir, 'rows')
+        CSVSplitter(output_dir=expected_dir, max_rows=12).split_by_rows_only(filepath)
+        CSVSplitter(output_dir=actual_dir, max_rows=12, chunksize=10).split_by_rows_only(filepath)
+        self._assert_same_output(actual_dir, expected_dir)
+        with open(os.path.join(actual_dir, 'test_part1.csv'), encoding='utf-8-sig') as f:
+            self.assertIn('广东,0.0,True,00', f.read())
+
+    def test_streaming_split_restores_numeric_keys(self):
+        """测试数值拆分字段只在一个数据块中为空时，流式拆分和拆分计划的文件名与一次性拆分一致"""
+        lines = ['编码,金额'] + [f"{'' if i == 25 else 14 + i % 2},{i}" for i in range(30)]
+        filepath = os.path.join(self.test_dir, 'test.csv')
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        expected_dir = os.path.join(self.test_dir, 'expected')
+        CSVSplitter(output_dir=expected_dir).split_single_file(filepath, ['编码'])
+        self.assertEqual(sorted(os.listdir(expected_dir)), ['test_14.0.csv', 'test_15.0.csv'])
+
+        for name, options in [('chunked', {'chunksize': 10}), ('spill', {'chunksize': 10, 'spill_buckets': 2}),
+                              ('workers', {'workers': 3})]:
+            actual_dir = os.path.join(self.test_dir, name)
+            CSVSplitter(output_dir=actual_dir, **options).split_single_file(filepath, ['编码'])
+            self._assert_same_output(actual_dir, expected_dir)
+
+        plan = CSVSplitter(output_dir=self.output_dir).plan(filepath, ['编码'])
+        self.assertEqual([partition['suffix'] for partition in plan['partitions']], ['_14.0', '_15.0'])
+
+    def test_repeated_split_overwrites_output(self):
+        """测试同一输出目录重复拆分时覆盖上次的结果（流式、并行、哈希分桶、按大小拆分）"""
+        filepath = self._create_test_csv('test.csv', {
+            '省份': ['广东', '浙江', '江苏'] * 20,
+            '金额': list(range(60)),
+        })
+
+        for name, options in [('chunked', {'chunksize': 7}), ('workers', {'workers': 2}),
+                              ('hash', {'hash_buckets': 2}), ('max_bytes', {'chunksize': 7, 'max_bytes': 100})]:
+            output_dir = os.path.join(self.test_dir, name)
+            for _ in range(2):
+                splitter = CSVSplitter(output_dir=output_dir, max_rows=15, **options)
+                splitter.split_single_file(filepath, ['省份'])
+            for file_name, rows in splitter.stats['output_file_list']:
+                with open(os.path.join(output_dir, file_name), 'rb') as f:
+                    content = f.read()
+                self.assertEqual(content.count('省份'.encode('utf-8')), 1, (name, file_name))
+                self.assertEqual(len(pd.read_csv(os.path.join(output_dir, file_name))), rows)
+            self.assertEqual(sum(rows for _, rows in splitter.stats['output_file_list']), 60)
+
+    def test_chunked_split_max_rows_rollover(self):
+        """测试流式拆分跨块滚动生成 _partN 文件"""
+        data = {
+            '省份': ['广东'] * 5 + ['浙江'] * 2,
+            '金额': list(range(7))
+        }
+        filepath = self._create_test_csv('test.csv', data)
+
+        splitter = CSVSplitter(max_rows=2, output_dir=self.output_dir, chunksize=3)
+        splitter.split_single_file(filepath, ['省份'])
+
+        self.assertEqual(splitter.stats['output_file_list'], [
+            ('test_广东_part1.csv', 2),
+            ('test_广东_part2.csv', 2),
+            ('test_广东_part3.csv', 1),
+            ('test_浙江.csv', 2),
+        ])
+        part3 = pd.read_csv(os.path.join(self.output_dir, 'test_广东_part3.csv'))
+        self.assertEqual(part3['金额'].tolist(), [4])
+
+    def test_chunked_split_by_rows_only(self):
+        """测试流式按行数拆分"""
+        filepath = self._create_test_csv('test.csv', {'id': list(range(10))})
+
+        splitter = CSVSplitter(max_rows=4, output_dir=self.output_dir, chunksize=3)
+        splitter.split_by_rows_only(filepath)
+
+        self.assertEqual(splitter.stats['output_file_list'], [
+            ('test_part1.csv', 4),
+            ('test_part2.csv', 4),
+            ('test_part3.csv', 2),
+        ])
+        self.assertEqual(splitter.stats['total_rows'], 10)
+
+    def test_parallel_split_matches_in_memory(self):
+        """测试多进程拆分与一次性拆分结果一致（含引号内换行）"""
+        data = {
+            '省份': ['广东', '浙江', None, '广东', '江苏', '浙江', '广东', '江苏'] * 5,
+            '订单日期': ['2024-01-15', '2024-02-01', '2024-01-20', 'bad', '2024-03-05',
+                     '2024-02-11', '2024-03-15', None] * 5,
+            '备注': ['多行\n备注', 'a', 'b,"c"', 'd', 'e', 'f', 'g', 'h'] * 5,
+            # 整数列只在最后一个区间中为空
+            '数量': [None if i == 38 else str(i) for i in range(40)],
+        }
+        filepath = self._create_test_csv('test.csv', data)
+
+        expected_dir = os.path.join(self.test_dir, 'expected')
+        expected = CSVSplitter(max_rows=3, output_dir=expected_dir)
+        expected.split_single_file(filepath, ['省份', '订单日期'], 'M')
+
+        splitter = CSVSplitter(max_rows=3, output_dir=self.output_dir, workers=3)
+        splitter.split_single_file(filepath, ['省份', '订单日期'], 'M')
+
+        self.assertEqual(sorted(splitter.stats['output_file_list']),
+                         sorted(expected.stats['output_file_list']))
+        self.assertEqual(splitter.stats['total_rows'], 40)
+        self._assert_same_output(self.output_dir, expected_dir)
+
+        # 日期列只有最后一个区间带时间：各区间须按整个输出文件选择日期格式
+        mixed_path = self._create_mixed_date_csv('mixed.csv')
+        for name, options in [('mixed', {}), ('mixed_rows', {'max_rows': 3})]:
+            expected_dir = os.path.join(self.test_dir, f'{name}_expected')
+            actual_dir = os.path.join(self.test_dir, name)
+            CSVSplitter(output_dir=expected_dir, **options).split_single_file(mixed_path, ['省份', '订单日期'], 'M')
+            CSVSplitter(output_dir=actual_dir, workers=3, **options).split_single_file(
+                mixed_path, ['省份', '订单日期'], 'M')
+            self._assert_same_output(actual_dir, expected_dir)
+
+    def test_split_files_with_jobs(self):
+        """测试多文件并行拆分：统计按输入顺序合并，进度按文件转发"""
+        paths = [
+            self._create_test_csv('small.csv', {'省份': ['广东', '浙江'], '金额': [1, 2]}),
+            self._create_test_csv('large.csv', {'省份': ['江苏'] * 50, '金额': list(range(50))}),
+        ]
+        messages = []
+        splitter = CSVSplitter(output_dir=self.output_dir,
+                               progress_callback=lambda current, total, message: messages.append(message))
+        splitter.split_files(paths, ['省份'], jobs=2)
+
+        self.assertEqual(splitter.stats['total_files'], 2)
+        self.assertEqual(splitter.stats['total_rows'], 52)
+        self.assertEqual(splitter.stats['output_files'], 3)
+        self.assertEqual(splitter.stats['output_file_list'], [
+            ('small_广东.csv', 1), ('small_浙江.csv', 1), ('large_江苏.csv', 50),
+        ])
+        self.assertTrue(any(message.startswith('已完成 2/2') for message in messages))
+        self.assertTrue(any(message.startswith('large.csv: ') for message in messages))
+
+    def test_split_files_should_stop(self):
+        """测试多文件拆分的取消：不再开始剩余文件，已取消的文件不计入统计"""
+        paths = [self._create_test_csv(f'f{i}.csv', {'省份': ['广东', '浙江'], '金额': [i, i]}) for i in range(8)]
+
+        splitter = CSVSplitter(output_dir=self.output_dir)
+        splitter.split_files(paths, ['省份'], should_stop=lambda: splitter.stats['total_files'] >= 2)
+        self.assertEqual(splitter.stats['total_files'], 2)
+
+        # 并行时只能取消尚未开始的文件
+        splitter = CSVSplitter(output_dir=self.output_dir)
+        splitter.split_files(paths, ['省份'], jobs=2, should_stop=lambda: True)
+        self.assertLess(splitter.stats['total_files'], len(paths))
+        self.assertEqual(splitter.stats['output_files'], 2 * splitter.stats['total_files'])
+
+    def test_spilled_split_matches_in_memory(self):
+        """测试外部溢写拆分与一次性拆分的文件和行数一致，临时文件被清理"""
+        data = {
+            '省份': ['广东', '浙江', None, '广东', '江苏', '浙江', '空日期', '江苏'] * 5,
+            '订单日期': ['2024-01-15', '2024-02-01', '2024-01-20', 'bad', '2024-03-05',
+                     '2024-02-11', None, None] * 5,
+            '金额': list(range(40)),
+        }
+        filepath = self._create_test_csv('test.csv', data)
+
+        expected_dir = os.path.join(self.test_dir, 'expected')
+        expected = CSVSplitter(max_rows=4, output_dir=expected_dir)
+        expected.split_single_file(filepath, ['省份', '订单日期'], 'M')
+
+        scratch_dir = os.path.join(self.test_dir, 'scratch')
+        splitter = CSVSplitter(max_rows=4, output_dir=self.output_dir, chunksize=7,
+                               spill_buckets=3, scratch_dir=scratch_dir)
+        splitter.split_single_file(filepath, ['省份', '订单日期'], 'M')
+
+        self.assertEqual(sorted(splitter.stats['output_file_list']),
+                         sorted(expected.stats['output_file_list']))
+        self.assertEqual(splitter.stats['total_rows'], 40)
+        self.assertIn(('test_空日期_part2.csv', 1), splitter.stats['output_file_list'])
+        self.assertEqual(os.listdir(scratch_dir), [])
+        self._assert_same_output(self.output_dir, expected_dir)
+
+        # 日期列只有后面的数据块带时间：按日拆分时各桶须按输出文件选择日期格式
+        mixed_path = self._create_mixed_date_csv('mixed.csv')
+        for name, period, options in [('mixed', 'D', {}), ('mixed_rows', 'M', {'max_rows': 3})]:
+            expected_dir = os.path.join(self.test_dir, f'{name}_expected')
+            actual_dir = os.path.join(self.test_dir, name)
+            CSVSplitter(output_dir=expected_dir, **options).split_single_file(
+                mixed_path, ['省份', '订单日期'], period)
+            CSVSplitter(output_dir=actual_dir, chunksize=5, spill_buckets=2, **options).split_single_file(
+                mixed_path, ['省份', '订单日期'], period)
+            self._assert_same_output(actual_dir, expected_dir)
+
+    def test_raw_split_by_rows_only(self):
+        """测试按原始字节拆分：输出与原文件逐字节一致，引号内换行不拆开"""
+        header = '\ufeffid,备注\n'.encode('utf-8')
+        records = [f'{i},"第{i}行\n续行",1.50\n'.encode('utf-8') for i in range(5)]
+        filepath = os.path.join(self.test_dir, 'test.csv')
+        with open(filepath, 'wb') as f:
+            f.write(header + b''.join(records))
+
+        splitter = CSVSplitter(max_rows=2, output_dir=self.output_dir, raw=True)
+        splitter.split_by_rows_only(filepath)
+
+        self.assertEqual(splitter.stats['output_file_list'], [
+            ('test_part1.csv', 2),
+            ('test_part2.csv', 2),
+            ('test_part3.csv', 1),
+        ])
+        self.assertEqual(splitter.stats['total_rows'], 5)
+        for i, chunk in enumerate([records[0:2], records[2:4], records[4:]]):
+            with open(os.path.join(self.output_dir, f'test_part{i + 1}.csv'), 'rb') as f:
+                self.assertEqual(f.read(), header + b''.join(chunk))
+
+    def test_raw_split_single_part(self):
+        """测试按原始字节拆分：行数未超过上限时不加 _part 后缀"""
+        filepath = os.path.join(self.test_dir, 'test.csv')
+        with open(filepath, 'wb') as f:
+            f.write(b'id\n1\n2')
+
+        splitter = CSVSplitter(max_rows=2, output_dir=self.output_dir, raw=True)
+        splitter.split_by_rows_only(filepath)
+
+        self.assertEqual(splitter.stats['output_file_list'], [('test.csv', 2)])
+        with open(os.path.join(self.output_dir, 'test.csv'), 'rb') as f:
+            self.assertEqual(f.read(), b'id\n1\n2')
+
+
+    def test_raw_field_split_passthrough(self):
+        """测试按字段原始行直通拆分：文件和行数与一次性拆分一致，数据行逐字节保留"""
+        header = b'id,\xe7\x9c\x81\xe4\xbb\xbd,date,amount\r\n'
+        records = [
+            b'1,GD,2024-01-15,1.50\r\n',
+            b'2,ZJ,2024-02-01,"a\r\nb"\r\n',
+            b'3,,2024-01-20,3\r\n',
+            b'\r\n',
+            b'4,GD,bad,007\r\n',
+            b'5,GD,2024-01-31,1e3\r\n',
+            b'6,ZJ,,x',
+        ]
+        filepath = os.path.join(self.test_dir, 'test.csv')
+        with open(filepath, 'wb') as f:
+            f.write(header + b''.join(records))
+
+        expected = CSVSplitter(max_rows=1, output_dir=os.path.join(self.test_dir, 'expected'))
+        expected.split_single_file(filepath, ['省份', 'date'], 'M')
+
+        splitter = CSVSplitter(max_rows=1, output_dir=self.output_dir, raw=True)
+        splitter.split_single_file(filepath, ['省份', 'date'], 'M')
+
+        self.assertEqual(sorted(splitter.stats['output_file_list']),
+                         sorted(expected.stats['output_file_list']))
+        self.assertEqual(splitter.stats['total_rows'], 6)
+        with open(os.path.join(self.output_dir, 'test_GD_2024-01_part2.csv'), 'rb') as f:
+            self.assertEqual(f.read(), header + records[5])
+        with open(os.path.join(self.output_dir, 'test_GD_NULL.csv'), 'rb') as f:
+            self.assertEqual(f.read(), header + records[4])
+        with open(os.path.join(self.output_dir, 'test_ZJ_2024-02.csv'), 'rb') as f:
+            self.assertEqual(f.read(), header + records[1])
+
+        # 含空值的数值拆分字段按还原后的值命名，与一次性拆分一致
+        numeric = os.path.join(self.test_dir, 'numeric.csv')
+        with open(numeric, 'wb') as f:
+            f.write(b'code,v\n14,a\n,b\n15,c\n')
+        numeric_dir = os.path.join(self.test_dir, 'numeric')
+        CSVSplitter(output_dir=numeric_dir, raw=True).split_single_file(numeric, ['code'])
+        self.assertEqual(sorted(os.listdir(numeric_dir)), ['numeric_14.0.csv', 'numeric_15.0.csv'])
+
+
+    def test_raw_field_split_reuses_index(self):
+        """测试分区索引：改变 max_rows 再次拆分时复用索引，不再解析拆分字段"""
+        filepath = self._create_test_csv('test.csv', {
+            '省份': ['广东', '浙江', '广东', None, '广东'],
+            '订单日期': ['2024-01-15', '2024-02-01', 'bad', '2024-01-20', '2024-01-31'],
+        })
+
+        first = CSVSplitter(output_dir=self.output_dir, raw=True, use_index=True)
+        first.split_single_file(filepath, ['省份', '订单日期'], 'M')
+        self.assertTrue(os.path.exists(filepath + '.partidx.npz'))
+
+        second_dir = os.path.join(self.test_dir, 'second')
+        second = CSVSplitter(max_rows=1, output_dir=second_dir, raw=True, use_index=True)
+        with patch.object(CSVSplitter, '_index_records', side_effect=AssertionError('索引未被复用')):
+            second.split_single_file(filepath, ['省份', '订单日期'], 'M')
+
+        self.assertEqual(first.stats['output_file_list'], [
+            ('test_广东_2024-01.csv', 2), ('test_浙江_2024-02.csv', 1), ('test_广东_NULL.csv', 1),
+        ])
+        self.assertEqual(second.stats['output_file_list'], [
+            ('test_广东_2024-01_part1.csv', 1), ('test_广东_2024-01_part2.csv', 1),
+            ('test_浙江_2024-02.csv', 1), ('test_广东_NULL.csv', 1),
+        ])
+        self.assertEqual(second.stats['total_rows'], 5)
+
+        # 编码不同时重新构建索引
+        third = CSVSplitter(output_dir=os.path.join(self.test_dir, 'third'), encoding='utf-8-sig',
+                            raw=True, use_index=True)
+        with patch.object(CSVSplitter, '_index_records', autospec=True,
+                          side_effect=CSVSplitter._index_records) as index_records:
+            third.split_single_file(filepath, ['省份', '订单日期'], 'M')
+        index_records.assert_called_once()
+        self.assertEqual(third.stats['output_file_list'], first.stats['output_file_list'])
+
+    def test_plan_matches_split(self):
+        """测试拆分计划的分区和文件数与实际拆分一致，且不写出文件"""
+        data = {
+            '省份': ['广东', '浙江', None, '广东', '空日期', '浙江', '广东'] * 3,
+            '订单日期': ['2024-01-15', '2024-02-01', '2024-01-20', 'bad', None, '2024-02-11', '2024-01-31'] * 3,
+            '金额': list(range(21)),
+        }
+        filepath = self._create_test_csv('test.csv', data)
+
+        splitter = CSVSplitter(max_rows=4, output_dir=self.output_dir, chunksize=5)
+        result = splitter.plan(filepath, ['省份', '订单日期'], 'M')
+        self.assertFalse(os.path.exists(self.output_dir))
+
+        expected = CSVSplitter(max_rows=4, output_dir=self.output_dir)
+        expected.split_single_file(filepath, ['省份', '订单日期'], 'M')
+
+        self.assertEqual(result['total_rows'], 21)
+        self.assertEqual(result['output_files'], expected.stats['output_files'])
+        self.assertEqual(
+            {partition['suffix']: partition['rows'] for partition in result['partitions']},
+            {'_广东_2024-01': 6, '_浙江_2024-02': 6, '_广东_NULL': 3, '_空日期': 3},
+        )
+        self.assertEqual([partition['files'] for partition in result['partitions']], [2, 2, 1, 1])
+        self.assertTrue(result['disk_ok'])
+        self.assertEqual(result['warnings'], [])
+
+    def test_plan_hash_buckets_matches_split(self):
+        """测试哈希分桶的拆分计划：各桶行数和文件数与实际拆分一致"""
+        filepath = self._create_test_csv('test.csv', {
+            '客户ID': [None if i % 7 == 0 else f'C{i % 9}' for i in range(40)],
+            '金额': list(range(40)),
+        })
+
+        result = CSVSplitter(max_rows=4, output_dir=self.output_dir, hash_buckets=5).plan(filepath, ['客户ID'])
+        self.assertFalse(os.path.exists(self.output_dir))
+
+        expected = CSVSplitter(max_rows=4, output_dir=self.output_dir, hash_buckets=5)
+        expected.split_single_file(filepath, ['客户ID'])
+        bucket_rows = {}
+        for file_name, rows in expected.stats['output_file_list']:
+            suffix = file_name[len('test'):-len('.csv')].split('_part')[0]
+            bucket_rows[suffix] = bucket_rows.get(suffix, 0) + rows
+
+        self.assertEqual(result['total_rows'], 40)
+        self.assertEqual(result['output_files'], expected.stats['output_files'])
+        self.assertEqual({partition['suffix']: partition['rows'] for partition in result['partitions']}, bucket_rows)
+        self.assertEqual([partition['suffix'] for partition in result['partitions']], sorted(bucket_rows))
+        self.assertIsNone(CSVSplitter(hash_buckets=5).plan(filepath, ['不存在的字段']))
+
+    def test_plan_parts_matches_split(self):
+        """测试均分的拆分计划：文件数与实际均分一致，忽略 max_rows"""
+        filepath = self._create_test_csv('test.csv', {'金额': list(range(10))})
+
+        for parts in (3, 50):
+            result = CSVSplitter(max_rows=2, output_dir=self.output_dir, parts=parts).plan(filepath)
+            output_dir = os.path.join(self.test_dir, f'parts_{parts}')
+            expected = CSVSplitter(max_rows=2, output_dir=output_dir, parts=parts)
+            expected.split_by_rows_only(filepath)
+
+            self.assertEqual(result['total_rows'], 10)
+            self.assertEqual(result['output_files'], expected.stats['output_files'])
+            self.assertEqual(result['output_files'], min(parts, 10))
+
+    def test_memory_budget_settings(self):
+        """测试按内存预算选择一次性读入、流式读取或外部溢写"""
+        filepath = self._create_test_csv('test.csv', {
+            '用户ID': [f'U{i:05d}' for i in range(2000)],
+            '省份': ['广东', '浙江'] * 1000,
+            '金额': list(range(2000)),
+        })
+
+        splitter = CSVSplitter(output_dir=self.output_dir, memory_limit=1024 ** 3)
+        self.assertEqual(splitter._budget_settings(filepath, ['省份'])['chunksize'], None)
+
+        splitter.memory_limit = 33 * 1024 * 1024
+        settings = splitter._budget_settings(filepath, ['省份'])
+        self.assertEqual(settings['spill_buckets'], None)
+        self.assertEqual(settings['chunksize'], 1000)
+        self.assertEqual(settings['writer_buffer_bytes'], splitter.memory_limit // 4)
+
+        self.assertGreaterEqual(splitter._budget_settings(filepath, ['用户ID'])['spill_buckets'], 2)
+
+    def test_split_with_memory_limit(self):
+        """测试内存预算下的拆分结果与一次性拆分一致，处理后恢复原设置"""
+        filepath = self._create_test_csv('test.csv', {
+            '省份': ['广东', '浙江', '江苏'] * 1000,
+            '金额': list(range(3000)),
+        })
+
+        splitter = CSVSplitter(output_dir=self.output_dir, memory_limit=1)
+        splitter.split_single_file(filepath, ['省份'])
+
+        self.assertEqual(splitter.stats['output_file_list'], [
+            ('test_广东.csv', 1000), ('test_浙江.csv', 1000), ('test_江苏.csv', 1000),
+        ])
+        self.assertIsNone(splitter.chunksize)
+        self.assertEqual(splitter.stats['errors'], [])
+
+
+    def test_hash_bucket_split(self):
+        """测试哈希分桶：同一取值在同一文件中，流式与一次性结果一致，空值也参与分桶"""
+        filepath = self._create_test_csv('test.csv', {
+            '客户ID': [f'C{i % 37}' for i in range(300)] + [None] * 5,
+            '金额': list(range(305)),
+        })
+
+        splitter = CSVSplitter(output_dir=self.output_dir, hash_buckets=8)
+        splitter.split_single_file(filepath, ['客户ID'])
+        streaming_dir = os.path.join(self.test_dir, 'streaming')
+        streaming = CSVSplitter(output_dir=streaming_dir, hash_buckets=8, chunksize=13)
+        streaming.split_single_file(filepath, ['客户ID'])
+
+        output_files = splitter.stats['output_file_list']
+        self.assertEqual(output_files, streaming.stats['output_file_list'])
+        self.assertLessEqual(len(output_files), 8)
+        self.assertEqual(sum(rows for _, rows in output_files), 305)
+        self.assertTrue(all(name.startswith('test_bucket00') for name, _ in output_files))
+
+        owners = {}
+        for file_name, _ in output_files:
+            df = pd.read_csv(os.path.join(self.output_dir, file_name))
+            for customer in df['客户ID'].fillna('<空>').unique():
+                self.assertNotIn(customer, owners)
+                owners[customer] = file_name
+        self.assertEqual(len(owners), 38)
+
+    def test_split_by_max_bytes(self):
+        """测试按单文件最大字节数拆分：各读取模式结果一致，文件大小不超过限制"""
+        filepath = self._create_test_csv('test.csv', {
+            'id': list(range(200)),
+            '备注': ['含,逗号\n换行' if i % 9 == 0 else 'x' * (i % 30) for i in range(200)],
+        })
+
+        results = []
+        for name, options in [('memory', {}), ('chunked', {'chunksize': 17}), ('raw', {'raw': True})]:
+            output_dir = os.path.join(self.test_dir, name)
+            splitter = CSVSplitter(output_dir=output_dir, max_bytes=1000, **options)
+            splitter.split_by_rows_only(filepath)
+            output_files = splitter.stats['output_file_list']
+            contents = []
+            for file_name, rows in output_files:
+                path = os.path.join(output_dir, file_name)
+                self.assertLessEqual(os.path.getsize(path), 1000)
+                self.assertEqual(len(pd.read_csv(path)), rows)
+                with open(path, 'rb') as f:
+                    contents.append(f.read())
+            results.append((output_files, contents))
+
+        output_files = results[0][0]
+        self.assertGreater(len(output_files), 1)
+        self.assertTrue(output_files[0][0].endswith('_part1.csv'))
+        self.assertEqual(sum(rows for _, rows in output_files), 200)
+        self.assertEqual(results[1], results[0])
+        # 原始字节模式保持输入文件的编码（不加 BOM），文件划分相同
+        self.assertEqual(results[2][0], output_files)
+
+    def test_split_into_parts(self):
+        """测试均分为 N 个文件：各读取模式结果一致，行数最多相差 1，引号内换行不影响计数"""
+        filepath = self._create_test_csv('test.csv', {
+            'id': list(range(103)),
+            '备注': ['多行\n文本' if i % 10 == 0 else '' for i in range(103)],
+        })
+
+        results = []
+        for name, options in [('memory', {}), ('chunked', {'chunksize': 9}), ('raw', {'raw': True})]:
+            splitter = CSVSplitter(output_dir=os.path.join(self.test_dir, name), parts=4, max_rows=10, **options)
+            splitter.split_by_rows_only(filepath)
+            results.append(splitter.stats['output_file_list'])
+
+        self.assertEqual(results[0], [('test_part1.csv', 26), ('test_part2.csv', 26),
+                                      ('test_part3.csv', 26), ('test_part4.csv', 25)])
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(results[2], results[0])
+        part = pd.read_csv(os.path.join(self.test_dir, 'chunked', 'test_part2.csv'))
+        self.assertEqual(part['id'].tolist(), list(range(26, 52)))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -92,6 +92,25 @@ class TestDateUtils(unittest.TestCase):
         series = pd.Series([np.nan, np.nan, np.nan])
         self.assertFalse(DateUtils.is_date_column(series))
 
+    def test_is_date_column_large_sampled(self):
+        """测试大列采样检测"""
+        dates = pd.Series(['2024-01-15'] * 50000 + ['invalid'] * 10000)
+        self.assertTrue(DateUtils.is_date_column(dates))
+
+        mostly_text = pd.Series(['广东'] * 50000 + ['2024-01-15'] * 10000)
+        self.assertFalse(DateUtils.is_date_column(mostly_text))
+
+    def test_is_date_column_sample_is_stratified(self):
+        """测试采样覆盖整列（不只取开头）"""
+        series = pd.Series(['2024-01-15'] * 30000 + ['invalid'] * 70000)
+        self.assertFalse(DateUtils.is_date_column(series, sample_size=1000))
+        self.assertEqual(len(DateUtils.sample_values(series, sample_size=1000)), 1000)
+
+    def test_is_date_column_numeric_dates(self):
+        """测试数值类型的 yyyyMMdd 日期列"""
+        series = pd.Series([20240115, 20240116, 20240117])
+        self.assertTrue(DateUtils.is_date_column(series))
+
     def test_convert_to_datetime_auto(self):
         """测试自动转换日期 - 每种格式单独测试"""
         # 测试yyyyMMdd格式
@@ -117,6 +136,88 @@ class TestDateUtils(unittest.TestCase):
         self.assertTrue(pd.isna(result[2]))  # 无效值应该变成NaT
         self.assertFalse(pd.isna(result[0]))  # 有效值应该转换成功
 
+    def test_infer_date_formats(self):
+        """测试从采样值推断日期格式"""
+        series = pd.Series(['2024-01-15', '2024-01-16', '2024/1/5', None])
+        self.assertEqual(DateUtils.infer_date_formats(series), ['yyyy-MM-dd', 'yyyy/M/d'])
+        self.assertEqual(DateUtils.infer_date_formats(pd.Series(['abc'])), [])
+
+    def test_convert_to_datetime_mixed_formats(self):
+        """测试混合格式列按各自格式解析"""
+        series = pd.Series(['2024-01-15', '20240201', '2024/3/5 14:30', None])
+        result = DateUtils.convert_to_datetime(series)
+        self.assertEqual(result[0], pd.Timestamp('2024-01-15'))
+        self.assertEqual(result[1], pd.Timestamp('2024-02-01'))
+        self.assertEqual(result[2], pd.Timestamp('2024-03-05 14:30'))
+        self.assertTrue(pd.isna(result[3]))
+
+    def test_convert_to_datetime_with_known_formats(self):
+        """测试使用已推断的日期格式解析"""
+        series = pd.Series([20240115, 20240230, 20240301])
+        result = DateUtils.convert_to_datetime(series, ['yyyyMMdd'])
+        self.assertEqual(result[0], pd.Timestamp('2024-01-15'))
+        self.assertTrue(pd.isna(result[1]))  # 无效日期不应被当作时间戳
+        self.assertEqual(result[2], pd.Timestamp('2024-03-01'))
+
+    def test_convert_with_period_keys(self):
+        """测试按唯一值解析并广播周期分组键"""
+        series = pd.Series(['2024-01-15', '2024-07-01', None, '2024-01-15', 'invalid'])
+        dates, keys = DateUtils.convert_with_period_keys(series, 'H')
+
+        self.assertEqual(dates[0], pd.Timestamp('2024-01-15'))
+        self.assertEqual(dates[3], pd.Timestamp('2024-01-15'))
+        self.assertTrue(pd.isna(dates[2]))
+        self.assertTrue(pd.isna(dates[4]))
+        self.assertEqual(keys.tolist()[:2], ['2024-H1', '2024-H2'])
+        self.assertTrue(pd.isna(keys[2]))
+        self.assertEqual(keys[3], '2024-H1')
+        self.assertTrue(pd.isna(keys[4]))
+
+    def test_datetime_levels_and_format(self):
+        """测试日期精度级别，以及按级别格式化的文本与 pandas 一次写出时一致"""
+        dates = pd.Series(pd.to_datetime(['2024-01-15', '2024-01-15 10:30:00', None, '2024-01-15 10:30:00.5'],
+                                         format='ISO8601'))
+        self.assertEqual(DateUtils.datetime_levels(dates).tolist(), [0, 1, 0, 2])
+
+        self.assertEqual(DateUtils.format_datetimes(dates[[0, 2]], 0).tolist()[0], '2024-01-15')
+        self.assertEqual(DateUtils.format_datetimes(dates[[0]], 1).tolist(), ['2024-01-15 00:00:00'])
+        text = DateUtils.format_datetimes(dates, 2)
+        self.assertEqual(text.tolist()[:2], ['2024-01-15 00:00:00.000', '2024-01-15 10:30:00.000'])
+        self.assertTrue(pd.isna(text[2]))
+        self.assertEqual(text.fillna('').tolist(), dates.astype(str).fillna('').tolist())
+
+    def test_period_codes(self):
+        """测试整数周期编码"""
+        dates = pd.Series(pd.to_datetime(['2024-03-15', '2024-09-16', None]))
+        self.assertEqual(DateUtils.period_codes(dates, 'H').tolist(), [20241, 20242, -1])
+        self.assertEqual(DateUtils.period_codes(dates, 'Q').tolist(), [20241, 20243, -1])
+        self.assertEqual(DateUtils.period_codes(dates, 'HM').tolist(), [2024031, 2024092, -1])
+        self.assertEqual(DateUtils.period_codes(dates, 'D').tolist(), [20240315, 20240916, -1])
+        self.assertIsNone(DateUtils.period_codes(dates, 'X'))
+
+    def test_apply_period_filter_with_nat(self):
+        """测试含无效日期时的周期过滤"""
+        dates = pd.Series(pd.to_datetime(['2024-03-15', None, '2024-03-20']))
+        for period, label in [('H', '2024-H1'), ('Q', '2024-Q1'), ('HM', '2024-03-HM2')]:
+            result = DateUtils.apply_period_filter(dates, period)
+            self.assertTrue(pd.isna(result[1]))
+            self.assertEqual(result[2], label)
+
+    def test_apply_period_filter_fixed_width(self):
+        """测试定宽格式按切片生成周期分组键，与日期解析结果一致"""
+        series = pd.Series(['2024-01-15', '2024-02-30', '2024-12-31', None, '2023-06-16', '2000-02-29'])
+        dates = DateUtils.convert_to_datetime(series)
+        for period in ['Y', 'H', 'Q', 'M', 'HM', 'D']:
+            fast = DateUtils.apply_period_filter(series, period, 'yyyy-MM-dd')
+            expected = pd.Series(np.nan, index=series.index, dtype=object)
+            valid = dates.notna()
+            expected[valid] = DateUtils.apply_period_filter(dates[valid], period)
+            self.assertEqual(fast.fillna('NULL').tolist(), expected.fillna('NULL').tolist())
+            self.assertTrue(pd.isna(fast[1]))
+
+        keys = DateUtils.apply_period_filter(pd.Series(['202401', '202411']), 'Q', 'yyyyMM')
+        self.assertEqual(keys.tolist(), ['2024-Q1', '2024-Q4'])
+
     def test_get_period_label_year(self):
         """测试年份周期标签"""
         date = pd.Timestamp('2024-01-15')
@@ -7,6 +7,7 @@ import os
 import tempfile
 import shutil
 from pathlib import Path
+from unittest.mock import patch
 import sys
 
 # 添加src目录到路径
@@ -146,6 +147,108 @@ class TestFileUtils(unittest.TestCase):
         result = FileUtils.format_file_size(size)
         self.assertEqual(result, '1.50 GB')
 
+    def test_get_free_space(self):
+        """测试获取可用磁盘空间（路径不存在时取已存在的上级目录）"""
+        missing = os.path.join(self.test_dir, 'a', 'b')
+        self.assertGreater(FileUtils.get_free_space(missing), 0)
+        self.assertFalse(os.path.exists(missing))
+
+    def test_parse_size(self):
+        """测试解析带单位的大小"""
+        self.assertEqual(FileUtils.parse_size('512MB'), 512 * 1024 ** 2)
+        self.assertEqual(FileUtils.parse_size('1.5 g'), int(1.5 * 1024 ** 3))
+        self.assertEqual(FileUtils.parse_size(4096), 4096)
+        with self.assertRaises(ValueError):
+            FileUtils.parse_size('2XB')
+
+    def test_detect_encoding(self):
+        """测试分层编码检测：BOM、UTF-8（样本截断在多字节字符中间）、GBK，结果按文件缓存"""
+        cases = {
+            'bom.csv': '\ufeff省份,城市\n广东,深圳\n'.encode('utf-8'),
+            'utf8.csv': ('省份,城市\n' + '广东,深圳\n' * 20).encode('utf-8'),
+            'gbk.csv': ('省份,城市\n' + '广东,深圳\n' * 20).encode('gbk'),
+            'ascii.csv': b'a,b\n1,2\n',
+        }
+        for name, content in cases.items():
+            with open(os.path.join(self.test_dir, name), 'wb') as f:
+                f.write(content)
+
+        self.assertEqual(FileUtils.detect_encoding(os.path.join(self.test_dir, 'bom.csv')), 'utf-8-sig')
+        # 16 字节处截断在一个三字节汉字中间
+        self.assertEqual(FileUtils.detect_encoding(os.path.join(self.test_dir, 'utf8.csv'), sample_size=16), 'utf-8')
+        self.assertEqual(FileUtils.detect_encoding(os.path.join(self.test_dir, 'gbk.csv')), 'gb18030')
+        self.assertEqual(FileUtils.detect_encoding(os.path.join(self.test_dir, 'ascii.csv')), 'utf-8')
+        self.assertIsNone(FileUtils.detect_encoding(os.path.join(self.test_dir, 'missing.csv')))
+
+        with patch.object(FileUtils, '_sniff_encoding') as sniff:
+            self.assertEqual(FileUtils.detect_encoding(os.path.join(self.test_dir, 'gbk.csv')), 'gb18030')
+            sniff.assert_not_called()
+
+    def test_find_decode_error(self):
+        """测试流式解码定位第一个无法解码的字节（跨块的多字节字符不算错误）"""
+        file_path = os.path.join(self.test_dir, 'test.csv')
+        content = ('省份,城市\n' + '广东,深圳\n' * 100).encode('utf-8')
+        with open(file_path, 'wb') as f:
+            f.write(content + b'\xff\n')
+
+        self.assertEqual(FileUtils.find_decode_error(file_path, 'utf-8', block_size=7), len(content))
+        self.assertIsNone(FileUtils.find_decode_error(file_path, 'latin1'))
+        with self.assertRaises(LookupError):
+            FileUtils.find_decode_error(file_path, 'no-such-encoding')
+
+    def test_read_csv_with_encoding_parses_once(self):
+        """测试指定编码解码失败时先流式校验候选编码，只解析一次；全部失败时报告字节位置"""
+        import pandas as pd
+
+        file_path = os.path.join(self.test_dir, 'gbk.csv')
+        with open(file_path, 'wb') as f:
+            f.write(('省份,城市\n' + '广东,深圳\n' * 100).encode('gbk'))
+
+        with patch('pandas.read_csv', wraps=pd.read_csv) as read_csv:
+            df = FileUtils.read_csv_with_encoding(file_path, encoding='utf-8')
+        self.assertEqual(read_csv.call_count, 1)
+        self.assertEqual(read_csv.call_args.kwargs['encoding'], 'gbk')
+        self.assertEqual(df['省份'].iloc[0], '广东')
+
+        with patch('src.utils.file_utils.SUPPORTED_ENCODINGS', ['utf-8']):
+            with self.assertRaisesRegex(ValueError, 'utf-8: 第 2 字节无法解码'):
+                FileUtils.read_csv_with_encoding(file_path, encoding='utf-8')
+
+    def test_count_rows(self):
+        """测试按原始字节统计行数：引号内换行不计数，空行可选跳过，结果按文件缓存"""
+        file_path = os.path.join(self.test_dir, 'test.csv')
+        with open(file_path, 'wb') as f:
+            f.write(b'id,text\n1,"a\nb"\n\n2,c\r\n3,d')
+
+        self.assertEqual(FileUtils.count_rows(file_path), 3)
+        self.assertEqual(FileUtils.count_rows(file_path, skip_blank_lines=False), 4)
+
+        # 文件未变化时使用缓存
+        with patch('src.utils.file_utils.RecordUtils.count_records') as count_records:
+            self.assertEqual(FileUtils.count_rows(file_path), 3)
+            count_records.assert_not_called()
+
+        with open(file_path, 'ab') as f:
+            f.write(b'\n4,e\n')
+        self.assertEqual(FileUtils.count_rows(file_path), 4)
+
+    def test_infer_column_types(self):
+        """测试合并各数据块的类型：得到整个文件一次性读入时的类型，已统计的列使用缓存"""
+        file_path = os.path.join(self.test_dir, 'test.csv')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write('n,flag,code,key,empty\n1,True,01,7,\n2,False,02,8,\n,True,x,,\n')
+
+        types = FileUtils.infer_column_types(file_path, 'utf-8', text_columns=['key'], chunksize=2)
+        self.assertEqual(types, {'n': 'float', 'flag': 'bool', 'code': 'object', 'key': 'float', 'empty': 'empty'})
+
+        self.assertEqual(FileUtils.merge_column_type('bool', 'empty'), 'boolean')
+        self.assertEqual(FileUtils.merge_column_type('int', 'bool'), 'object')
+
+        with patch.object(FileUtils, 'read_csv_with_encoding') as read_csv:
+            self.assertEqual(FileUtils.infer_column_types(file_path, 'utf-8', columns=['n', 'key'],
+                                                          text_columns=['key']), {'n': 'float', 'key': 'float'})
+            read_csv.assert_not_called()
+
     def test_write_csv(self):
         """测试写入CSV文件"""
         import pandas as pd
@@ -0,0 +1,87 @@
+"""
+分区索引测试
+"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import numpy as np
+from pathlib import Path
+import sys
+
+# 添加src目录到路径
+src_dir = Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(src_dir))
+
+from src.splitter.partition_index import PartitionIndex  # noqa: E402
+
+
+class TestPartitionIndex(unittest.TestCase):
+    """测试PartitionIndex类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.test_dir, 'test.csv')
+        with open(self.file_path, 'wb') as f:
+            f.write(b'a\nx\ny\n\nx\n')
+
+    def tearDown(self):
+        """测试后清理"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _index(self, split_fields=('a',), time_period=None):
+        return PartitionIndex(
+            split_fields=split_fields,
+            time_period=time_period,
+            encoding='utf-8',
+            fingerprint=PartitionIndex.file_fingerprint(self.file_path),
+            header_end=2,
+            starts=np.array([2, 4, 7], dtype=np.int64),
+            ends=np.array([4, 6, 9], dtype=np.int64),
+            codes=np.array([0, -1, 0], dtype=np.int32),
+            suffixes=['_x'],
+            column_count=1,
+        )
+
+    def test_partitions(self):
+        """测试按编号分组的行位置，编号为 -1 的行不输出"""
+        partitions = self._index().partitions()
+        self.assertEqual([(suffix, list(rows)) for suffix, rows in partitions], [('_x', [0, 2])])
+
+    def test_save_and_load(self):
+        """测试保存后按相同条件读取"""
+        path = self._index(time_period='M').save(self.file_path)
+        self.assertEqual(path, self.file_path + '.partidx.npz')
+
+        loaded = PartitionIndex.load(self.file_path, ['a'], 'M', 'utf-8')
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.encoding, 'utf-8')
+        self.assertEqual(loaded.suffixes, ['_x'])
+        self.assertEqual(loaded.header_end, 2)
+        self.assertEqual(list(loaded.codes), [0, -1, 0])
+        self.assertEqual(loaded.total_rows, 3)
+
+    def test_load_rejects_mismatch(self):
+        """测试拆分条件、编码不同或文件被修改时索引失效"""
+        self._index().save(self.file_path)
+        self.assertIsNotNone(PartitionIndex.load(self.file_path, ['a'], None, 'utf-8'))
+        self.assertIsNone(PartitionIndex.load(self.file_path, ['b'], None, 'utf-8'))
+        self.assertIsNone(PartitionIndex.load(self.file_path, ['a'], 'M', 'utf-8'))
+        self.assertIsNone(PartitionIndex.load(self.file_path, ['a'], None, 'gbk'))
+
+        with open(self.file_path, 'ab') as f:
+            f.write(b'y\n')
+        self.assertIsNone(PartitionIndex.load(self.file_path, ['a'], None, 'utf-8'))
+
+    def test_load_corrupt_sidecar(self):
+        """测试损坏的旁路文件视为不存在"""
+        with open(PartitionIndex.sidecar_path(self.file_path), 'wb') as f:
+            f.write(b'not an index')
+        self.assertIsNone(PartitionIndex.load(self.file_path, ['a'], None, 'utf-8'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+分区写入器测试
+"""
+
+import unittest
+import os
+import tempfile
+import shutil
+import pandas as pd
+from pathlib import Path
+import sys
+
+# 添加src目录到路径
+src_dir = Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(src_dir))
+
+from src.splitter.partition_writer import PartitionWriter  # noqa: E402
+
+
+class TestPartitionWriter(unittest.TestCase):
+    """测试PartitionWriter类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """测试后清理"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _read(self, file_name):
+        return pd.read_csv(os.path.join(self.test_dir, file_name))
+
+    def test_lru_handles_bounded(self):
+        """测试句柄数不超过上限，被关闭的文件重新打开后继续追加"""
+        writer = PartitionWriter(self.test_dir, 'test', max_open_files=2, flush_bytes=1)
+        for round_ in range(3):
+            for city in ['杭州', '深圳', '南京', '成都']:
+                writer.write(f'_{city}', pd.DataFrame({'城市': [city], '轮次': [round_]}))
+                self.assertLessEqual(len(writer._handles), 2)
+        output_files = writer.close()
+
+        self.assertEqual(len(writer._handles), 0)
+        self.assertEqual(output_files, [
+            ('test_杭州.csv', 3), ('test_深圳.csv', 3), ('test_南京.csv', 3), ('test_成都.csv', 3),
+        ])
+        self.assertEqual(self._read('test_南京.csv')['轮次'].tolist(), [0, 1, 2])
+
+    def test_buffer_budget(self):
+        """测试缓冲区总字节数不超过预算，关闭前数据留在缓冲区"""
+        writer = PartitionWriter(self.test_dir, 'test', buffer_bytes=200, flush_bytes=10 ** 6)
+        for i in range(50):
+            writer.write(f'_{i % 5}', pd.DataFrame({'id': [i], 'text': ['x' * 20]}))
+            self.assertLessEqual(writer._buffered, 200)
+        writer.close()
+
+        self.assertEqual(self._read('test_0.csv')['id'].tolist(), list(range(0, 50, 5)))
+
+    def test_rollover_with_buffering(self):
+        """测试缓冲写入时按 max_rows 滚动为 _partN 文件，并只有第一个文件带 BOM"""
+        writer = PartitionWriter(self.test_dir, 'test', max_rows=3)
+        writer.write('_a', pd.DataFrame({'id': [1, 2]}))
+        writer.write('_a', pd.DataFrame({'id': [3, 4, 5, 6, 7]}))
+        output_files = writer.close()
+
+        self.assertEqual(output_files, [('test_a_part1.csv', 3), ('test_a_part2.csv', 3), ('test_a_part3.csv', 1)])
+        self.assertEqual(self._read('test_a_part2.csv')['id'].tolist(), [4, 5, 6])
+        with open(os.path.join(self.test_dir, 'test_a_part1.csv'), 'rb') as f:
+            content = f.read()
+        self.assertTrue(content.startswith(b'\xef\xbb\xbfid'))
+        self.assertEqual(content.count(b'\xef\xbb\xbf'), 1)
+
+    def test_existing_files_overwritten(self):
+        """测试输出目录中已有同名文件时覆盖而不是追加，被关闭的句柄仍然续写"""
+        for _ in range(2):
+            writer = PartitionWriter(self.test_dir, 'test', max_rows=2, max_open_files=1, flush_bytes=1)
+            for i in range(3):
+                writer.write('_a', pd.DataFrame({'id': [i]}))
+                writer.write('_b', pd.DataFrame({'id': [i]}))
+            output_files = writer.close()
+
+        self.assertEqual(output_files, [
+            ('test_a_part1.csv', 2), ('test_a_part2.csv', 1), ('test_b_part1.csv', 2), ('test_b_part2.csv', 1),
+        ])
+        self.assertEqual(self._read('test_a_part1.csv')['id'].tolist(), [0, 1])
+        self.assertEqual(self._read('test_b_part2.csv')['id'].tolist(), [2])
+
+    def test_rollover_by_bytes(self):
+        """测试按 max_bytes 滚动：每个文件（含表头）不超过限制，超长记录独占一个文件"""
+        writer = PartitionWriter(self.test_dir, 'test', max_bytes=40)
+        writer.write('_a', pd.DataFrame({'text': ['x' * 8] * 5}))
+        writer.write('_a', pd.DataFrame({'text': ['y' * 50, 'z' * 8]}))
+        output_files = writer.close()
+
+        # 表头 3 + 4 字节，每行 9 字节：每个文件最多 3 行
+        self.assertEqual(output_files, [
+            ('test_a_part1.csv', 3), ('test_a_part2.csv', 2), ('test_a_part3.csv', 1), ('test_a_part4.csv', 1),
+        ])
+        for file_name, _ in output_files[:2] + output_files[3:]:
+            self.assertLessEqual(os.path.getsize(os.path.join(self.test_dir, file_name)), 40)
+        self.assertEqual(self._read('test_a_part3.csv')['text'].tolist(), ['y' * 50])
+
+
+if __name__ == '__main__':
+    unittest.main()
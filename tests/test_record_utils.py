@@ -0,0 +1,100 @@
+"""
+记录边界工具类测试
+"""
+
+import unittest
+import os
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+
+# 添加src目录到路径
+src_dir = Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(src_dir))
+
+from src.utils.record_utils import RecordUtils  # noqa: E402
+
+
+class TestRecordUtils(unittest.TestCase):
+    """测试RecordUtils类"""
+
+    DATA = b'a,b\n1,"x\ny"\n2,"q""\n"\n3,z'
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """测试后清理"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _all_ends(self, buffer, block_size):
+        return [int(end) for ends in RecordUtils.iter_record_ends(buffer, block_size) for end in ends]
+
+    def test_find_record_ends_skips_quoted_newlines(self):
+        """测试引号内的换行不算记录结束"""
+        ends, in_quotes = RecordUtils.find_record_ends(self.DATA, 0, len(self.DATA))
+        self.assertEqual(list(ends), [4, 12, 21])
+        self.assertFalse(in_quotes)
+
+    def test_iter_record_ends_across_blocks(self):
+        """测试跨块扫描时引号状态正确传递，末尾无换行的记录也被计入"""
+        expected = [4, 12, 21, len(self.DATA)]
+        for block_size in (1, 5, 7, 1024):
+            self.assertEqual(self._all_ends(self.DATA, block_size), expected)
+
+    def test_split_ranges_aligned_to_records(self):
+        """测试切分区间对齐到记录边界且首尾相接"""
+        for parts in range(1, 6):
+            ranges = RecordUtils.split_ranges(self.DATA, 4, parts, window=3)
+            self.assertEqual(ranges[0][0], 4)
+            self.assertEqual(ranges[-1][1], len(self.DATA))
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, start)
+                self.assertIn(end, [12, 21])
+
+    def test_gather_records(self):
+        """测试按位置拼接多条记录的原始字节"""
+        ends = RecordUtils.record_ends(self.DATA)
+        self.assertEqual(list(ends), [4, 12, 21, len(self.DATA)])
+        starts = ends[:-1][[2, 0]]
+        stops = ends[1:][[2, 0]]
+        self.assertEqual(RecordUtils.gather_records(self.DATA, starts, stops),
+                         self.DATA[21:] + self.DATA[4:12])
+
+    def test_plan_parts(self):
+        """测试按行数和字节数规划分片"""
+        lengths = [10, 10, 10, 50, 10]
+        self.assertEqual(RecordUtils.plan_parts(lengths, max_rows=2), [(0, 2), (2, 4), (4, 5)])
+        self.assertEqual(RecordUtils.plan_parts(lengths, header_bytes=5, max_bytes=25),
+                         [(0, 2), (2, 3), (3, 4), (4, 5)])
+        self.assertEqual(RecordUtils.plan_parts(lengths, header_bytes=5, max_rows=1, max_bytes=100),
+                         [(i, i + 1) for i in range(5)])
+        self.assertEqual(RecordUtils.plan_parts([], max_bytes=10), [(0, 0)])
+
+    def test_balanced_sizes(self):
+        """测试均分行数：各份最多相差 1，行数少于份数时不产生空文件"""
+        self.assertEqual(RecordUtils.balanced_sizes(10, 4), [3, 3, 2, 2])
+        self.assertEqual(RecordUtils.balanced_sizes(2, 4), [1, 1])
+        self.assertEqual(RecordUtils.balanced_sizes(0, 4), [0])
+
+    def test_map_file(self):
+        """测试内存映射文件"""
+        file_path = os.path.join(self.test_dir, 'test.csv')
+        with open(file_path, 'wb') as f:
+            f.write(self.DATA)
+        with open(file_path, 'rb') as f:
+            buffer = RecordUtils.map_file(f)
+            self.assertEqual(bytes(buffer[:4]), b'a,b\n')
+            buffer.close()
+
+        empty_path = os.path.join(self.test_dir, 'empty.csv')
+        open(empty_path, 'wb').close()
+        with open(empty_path, 'rb') as f:
+            self.assertEqual(len(RecordUtils.map_file(f)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()